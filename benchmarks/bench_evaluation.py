@@ -0,0 +1,115 @@
+"""離線評估（judge.evaluation）讀取與彙整大量封存紀錄的耗時。
+
+於暫存目錄產生兩個設定各 N 份合成的 Session 串流快照（辯論回合、證據、陪審結果、
+pipeline_timing 與 instrumentation），量測解析成 DataFrame 與計算比較表的時間：
+
+    python benchmarks/bench_evaluation.py --logs 20000 --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from judge.evaluation.loader import load_runs  # noqa: E402
+from judge.evaluation.metrics import agreement, score_distribution, stage_table, summary  # noqa: E402
+
+
+STAGES = ("init_session", "curator", "triage", "historian", "debate_referee_loop", "jury", "synthesizer")
+AGENTS = ("curator_tool_runner", "moderator_decider", "advocate_tool_runner", "skeptic_tool_runner", "jury")
+VERDICTS = ("正方較有說服力", "反方較有說服力", "證據不足")
+
+
+def synthetic_snapshot(rng: random.Random, index: int, drift: float) -> dict:
+    turns = [
+        {
+            "speaker": rng.choice(("advocate", "skeptic", "devil")),
+            "content": f"turn {t}",
+            "data": {
+                "evidence": [
+                    {"source": f"https://example{rng.randint(0, 40)}.com/a?utm_source=x", "claim": "c", "warrant": "w"}
+                    for _ in range(rng.randint(0, 3))
+                ]
+            },
+        }
+        for t in range(rng.randint(2, 8))
+    ]
+    total = max(0, min(100, int(rng.gauss(60, 15) + drift)))
+    verdict = VERDICTS[index % len(VERDICTS)] if rng.random() > abs(drift) / 50 else rng.choice(VERDICTS)
+    return {
+        "session": {"id": f"s{index}"},
+        "state": {
+            "shared": {
+                "debate_messages": turns,
+                "evidence_unique_count": rng.randint(1, 20),
+                "final_report_json": {"topic": f"主張 {index}", "jury_score": total},
+                "jury_result": {"verdict": verdict, "scores": {"total": total, "evidence_quality": total // 4}},
+                "debate_budget": {"iterations": len(turns), "stop_reason": "low_gain", "spent": {"tokens": 3000}},
+                "pipeline_timing": {
+                    "stages": {s: {"duration": rng.random()} for s in STAGES},
+                    "wall_seconds": rng.random() * 5,
+                },
+                "instrumentation": {
+                    "wall_seconds": rng.random() * 5,
+                    "input_tokens": rng.randint(5000, 20000),
+                    "output_tokens": rng.randint(500, 2000),
+                    "agents": {
+                        a: {"model_calls": 1, "input_tokens": rng.randint(100, 3000), "output_tokens": 50}
+                        for a in AGENTS
+                    },
+                },
+            }
+        },
+    }
+
+
+def write_logs(root: str, count: int, seed: int) -> dict[str, str]:
+    rng = random.Random(seed)
+    sources = {}
+    for config, drift in (("base", 0.0), ("fast", 2.0)):
+        directory = os.path.join(root, config)
+        os.makedirs(directory)
+        for i in range(count):
+            with open(os.path.join(directory, f"{i:06d}.json"), "w", encoding="utf-8") as f:
+                json.dump(synthetic_snapshot(rng, i, drift), f, ensure_ascii=False)
+        sources[config] = directory
+    return sources
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logs", type=int, default=20000, help="每個設定的紀錄數")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = write_logs(tmp, args.logs, args.seed)
+        size = sum(f.stat().st_size for f in Path(tmp).rglob("*.json"))
+        t0 = time.perf_counter()
+        frame = load_runs(sources, workers=args.workers)
+        load_seconds = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    summary(frame)
+    agree = agreement(frame, "base")
+    score_distribution(frame)
+    stage_table(frame)
+    report_seconds = time.perf_counter() - t0
+    print(
+        f"{len(frame)} logs ({size / 1e6:.1f} MB): load {load_seconds:.2f}s "
+        f"({len(frame) / load_seconds:,.0f} logs/s), tables {report_seconds:.3f}s, "
+        f"agreement {agree.loc['fast', 'agreement']:.3f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
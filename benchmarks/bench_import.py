@@ -0,0 +1,109 @@
+"""套件匯入時間基準測試。
+
+每個目標模組在全新的 Python 程序中匯入，重複數次取中位數；並記錄該次匯入
+是否載入了 google.adk。以 --compare 指定 git 版本（如 HEAD~1）時，會將該版本
+解壓到暫存目錄並以相同方式量測，輸出前後對照：
+
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --compare HEAD~1 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+from io import BytesIO
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+TARGETS = [
+    "judge",
+    "judge.agents",
+    "judge.tools",
+    "judge.tools.debate_log",
+    "judge.agents.social.noise.agent",
+    "judge.agents.adjudication.jury.agent",
+    "judge.agent",
+]
+
+_PROBE = """
+import sys, time, json, warnings
+warnings.simplefilter("ignore")
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "adk": "google.adk" in sys.modules}}))
+"""
+
+
+def measure(module: str, root: Path, repeat: int) -> dict:
+    samples, adk = [], False
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module)],
+            cwd=root,
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr else "failed"}
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        samples.append(result["seconds"])
+        adk = result["adk"]
+    return {"median": statistics.median(samples), "min": min(samples), "adk": adk}
+
+
+def extract_revision(rev: str, target: Path) -> None:
+    archive = subprocess.run(
+        ["git", "archive", "--format=tar", rev], cwd=ROOT, capture_output=True, check=True
+    ).stdout
+    with tarfile.open(fileobj=BytesIO(archive)) as tar:
+        tar.extractall(target)
+
+
+def _cell(result: dict | None) -> str:
+    if result is None:
+        return ""
+    if "error" in result:
+        return "error"
+    return f"{result['median'] * 1000:9.1f}ms{' (adk)' if result['adk'] else '      '}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="judge 套件匯入時間基準測試")
+    parser.add_argument("modules", nargs="*", default=TARGETS, help="要量測的模組")
+    parser.add_argument("--repeat", type=int, default=3, help="每個模組的量測次數（取中位數）")
+    parser.add_argument("--compare", metavar="REV", help="與指定 git 版本比較（before）")
+    args = parser.parse_args()
+
+    before: dict[str, dict] = {}
+    if args.compare:
+        with tempfile.TemporaryDirectory() as tmp:
+            extract_revision(args.compare, Path(tmp))
+            before = {m: measure(m, Path(tmp), args.repeat) for m in args.modules}
+    after = {m: measure(m, ROOT, args.repeat) for m in args.modules}
+
+    width = max(len(m) for m in args.modules)
+    header = f"{'module':<{width}}  {'after':>17}"
+    if before:
+        header = f"{'module':<{width}}  {'before (' + args.compare + ')':>17}  {'after':>17}  speedup"
+    print(header)
+    for module in args.modules:
+        row = f"{module:<{width}}  "
+        if before:
+            row += f"{_cell(before.get(module)):>17}  "
+        row += f"{_cell(after[module]):>17}"
+        b, a = before.get(module, {}), after[module]
+        if before and "median" in b and "median" in a and a["median"] > 0:
+            row += f"  {b['median'] / a['median']:6.1f}x"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""近似重複索引（MinHash + LSH）的加入、查詢與載入耗時。
+
+以隨機中文主張填滿索引，再以改寫過的主張查詢：
+
+    python benchmarks/bench_near_duplicate.py --entries 10000 100000 300000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from judge.tools.near_duplicate import NearDuplicateIndex  # noqa: E402
+
+
+CLAIM = "網傳某品牌飲料含有致癌物質，喝一瓶就會致癌。"
+PARAPHRASE = "網路流傳某品牌的飲料含致癌物質，只要喝一瓶就會致癌"
+CHARS = [chr(0x4E00 + i) for i in range(3000)]
+
+
+def run(entries: int, queries: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    index = NearDuplicateIndex()
+    index.add("target", CLAIM)
+    texts = ["".join(rng.choice(CHARS) for _ in range(rng.randint(15, 40))) for _ in range(entries)]
+    start = time.perf_counter()
+    for i, text in enumerate(texts):
+        index.add(f"s{i}", text)
+    add_seconds = time.perf_counter() - start
+
+    timings = []
+    match = None
+    for _ in range(queries):
+        t0 = time.perf_counter()
+        match = index.query(PARAPHRASE)
+        timings.append(time.perf_counter() - t0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "index.npz")
+        t0 = time.perf_counter()
+        index.save(path)
+        save_seconds = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        NearDuplicateIndex(path=path)
+        load_seconds = time.perf_counter() - t0
+
+    timings.sort()
+    return {
+        "entries": len(index),
+        "add_us": add_seconds / entries * 1e6,
+        "query_mean_us": statistics.fmean(timings) * 1e6,
+        "query_p95_us": timings[int(0.95 * (len(timings) - 1))] * 1e6,
+        "save_seconds": save_seconds,
+        "load_seconds": load_seconds,
+        "match": match.to_dict() if match else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    for entries in args.entries:
+        r = run(entries, args.queries, args.seed)
+        print(
+            f"{r['entries']:>8} entries: add {r['add_us']:7.1f}us, query mean {r['query_mean_us']:7.1f}us "
+            f"p95 {r['query_p95_us']:7.1f}us, save {r['save_seconds']:.3f}s, load {r['load_seconds']:.3f}s, "
+            f"match {r['match']['session_id'] if r['match'] else None} ({r['match']['score'] if r['match'] else '-'})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""root_agent 端到端延遲基準測試（離線 FakeLlm，不需網路）。
+
+以 FakeLlm 取代所有模型、以空的 fixture 取代搜尋後端，於 1/10/100 個並行
+Session 下量測：
+
+- 端到端：每個 Session 的完成時間（mean/p50/p95）與整體吞吐量
+- 各階段：DagPipelineAgent 寫入的 pipeline_timing
+- 各回呼：before/after agent、model、tool 回呼與 SessionService.append_event
+- 匯出：export_debate_log / export_session，以及寫檔（write_json_file 整份重寫 vs.
+  export_session_stream 以 JSONL 附加新事件）
+
+預設不注入模型延遲，量得的時間即為框架本身的開銷。以 --output 保存結果，
+之後以 --baseline 比對，任一並行度的平均端到端時間超出容許範圍即以非零碼結束：
+
+    python benchmarks/bench_pipeline.py --sessions 1 10 100 --output bench.json
+    python benchmarks/bench_pipeline.py --baseline bench.json --tolerance 0.25
+
+以 --replay 指定 JUDGE_REPLAY=record 錄製的檔案時，改為重播實際模型與搜尋的回應
+（不呼叫模型、不需網路），--claim 需與錄製時的主張相同：
+
+    python benchmarks/bench_pipeline.py --replay .cache/replay.sqlite --claim "<主張>" --sessions 1 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import inspect
+import json
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from google.adk.runners import Runner  # noqa: E402
+from google.genai import types  # noqa: E402
+
+from judge.agent import root_agent  # noqa: E402
+from judge.agents.cache import result_cache_gate, result_cache_store  # noqa: E402
+from judge.agents.knowledge.triage import triage_agent  # noqa: E402
+from judge.batch import APP_NAME, _prepare_agents  # noqa: E402
+from judge.tools import export_debate_log, export_session, export_session_stream, write_json_file  # noqa: E402
+from judge.tools.instrumentation import install_instrumentation  # noqa: E402
+from judge.tools.models import install_fake_llm  # noqa: E402
+from judge.tools.replay import ReplayStore, install_replay  # noqa: E402
+from judge.tools.result_cache import result_cache  # noqa: E402
+from judge.tools.search import FixtureSearchBackend, search_service  # noqa: E402
+from judge.tools.session_service import create_session_service  # noqa: E402
+
+
+CLAIM = "網傳某品牌飲料含有致癌物質，喝一瓶就會致癌。"
+
+# 讓主持人輪流指派三方發言、停止判斷的 LLM 備援一律續行，辯論由規則（max_turns）結束
+CANNED = {
+    "moderator_decider": [
+        {"next_speaker": "advocate", "rationale": "benchmark"},
+        {"next_speaker": "skeptic", "rationale": "benchmark"},
+        {"next_speaker": "devil", "rationale": "benchmark"},
+    ],
+    "stop_checker_llm": ["continue"],
+}
+
+CALLBACK_ATTRS = (
+    "before_agent_callback",
+    "after_agent_callback",
+    "before_model_callback",
+    "after_model_callback",
+    "before_tool_callback",
+    "after_tool_callback",
+)
+
+
+def summarize(values: list[float]) -> dict:
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "total": sum(ordered),
+        "mean": statistics.fmean(ordered),
+        "p50": ordered[len(ordered) // 2],
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max": ordered[-1],
+    }
+
+
+class Timings:
+    def __init__(self) -> None:
+        self.samples: dict[str, list[float]] = defaultdict(list)
+
+    def add(self, key: str, seconds: float) -> None:
+        self.samples[key].append(seconds)
+
+    def reset(self) -> None:
+        self.samples.clear()
+
+    def report(self, prefix: str) -> dict:
+        return {
+            key[len(prefix):]: summarize(values)
+            for key, values in sorted(self.samples.items())
+            if key.startswith(prefix)
+        }
+
+
+TIMINGS = Timings()
+EXPORT_DIR = tempfile.TemporaryDirectory(prefix="bench-export-")
+
+
+def _timed(key: str, callback):
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        result = callback(*args, **kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        TIMINGS.add(key, time.perf_counter() - start)
+        return result
+
+    return wrapper
+
+
+def instrument_callbacks(agent) -> None:
+    """以計時包裝取代代理樹中所有已設定的回呼"""
+    from google.adk.tools.agent_tool import AgentTool
+
+    stack, seen = [agent], set()
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        for attr in CALLBACK_ATTRS:
+            callback = getattr(current, attr, None)
+            if callback is None:
+                continue
+            key = f"callback:{current.name}.{attr}"
+            if isinstance(callback, list):
+                setattr(current, attr, [_timed(key, cb) for cb in callback])
+            else:
+                setattr(current, attr, _timed(key, callback))
+        stack.extend(t.agent for t in getattr(current, "tools", None) or [] if isinstance(t, AgentTool))
+        stack.extend(current.sub_agents)
+
+
+def instrument_service(service) -> None:
+    append_event = service.append_event
+
+    async def timed_append(session, event):
+        start = time.perf_counter()
+        result = await append_event(session, event)
+        TIMINGS.add("session:append_event", time.perf_counter() - start)
+        return result
+
+    service.append_event = timed_append
+
+
+async def run_session(runner: Runner, service, index: int, claim: str = CLAIM) -> dict:
+    session = await service.create_session(
+        app_name=APP_NAME, user_id=f"bench-{index}", state={"debate_messages": [], "agents": []}
+    )
+    message = types.Content(role="user", parts=[types.Part(text=claim)])
+    start = time.perf_counter()
+    async for _ in runner.run_async(user_id=session.user_id, session_id=session.id, new_message=message):
+        pass
+    elapsed = time.perf_counter() - start
+
+    final = await service.get_session(app_name=APP_NAME, user_id=session.user_id, session_id=session.id)
+    t0 = time.perf_counter()
+    export_debate_log(final)
+    TIMINGS.add("export:export_debate_log", time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    data = export_session(final)
+    TIMINGS.add("export:export_session", time.perf_counter() - t0)
+    path = str(Path(EXPORT_DIR.name) / f"{session.user_id}.json")
+    t0 = time.perf_counter()
+    write_json_file(path, data)
+    TIMINGS.add("export:write_json_file", time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    export_session_stream(final, path.replace(".json", ".stream.json"))
+    TIMINGS.add("export:export_session_stream", time.perf_counter() - t0)
+
+    for name, span in (final.state.get("pipeline_timing") or {}).get("stages", {}).items():
+        TIMINGS.add(f"stage:{name}", span["duration"])
+    return {"elapsed": elapsed, "events": len(final.events), "turns": len(final.state.get("debate_messages", []))}
+
+
+async def run_level(runner: Runner, service, concurrency: int, claim: str = CLAIM) -> dict:
+    TIMINGS.reset()
+    search_service.cache.clear()
+    result_cache.invalidate()
+    start = time.perf_counter()
+    results = await asyncio.gather(*(run_session(runner, service, i, claim) for i in range(concurrency)))
+    wall = time.perf_counter() - start
+    return {
+        "sessions": concurrency,
+        "wall_seconds": wall,
+        "sessions_per_second": concurrency / wall if wall else 0.0,
+        "end_to_end": summarize([r["elapsed"] for r in results]),
+        "events_per_session": statistics.fmean(r["events"] for r in results),
+        "turns_per_session": statistics.fmean(r["turns"] for r in results),
+        "stages": TIMINGS.report("stage:"),
+        "callbacks": TIMINGS.report("callback:"),
+        "session": TIMINGS.report("session:"),
+        "export": TIMINGS.report("export:"),
+    }
+
+
+def check_regression(results: list[dict], baseline_path: str, tolerance: float) -> list[str]:
+    baseline = {r["sessions"]: r for r in json.loads(Path(baseline_path).read_text())["levels"]}
+    failures = []
+    for level in results:
+        base = baseline.get(level["sessions"])
+        if base is None:
+            continue
+        current, previous = level["end_to_end"]["mean"], base["end_to_end"]["mean"]
+        if current > previous * (1 + tolerance):
+            failures.append(
+                f"{level['sessions']} sessions: mean {current:.4f}s > baseline {previous:.4f}s (+{tolerance:.0%})"
+            )
+    return failures
+
+
+def print_level(level: dict) -> None:
+    e2e = level["end_to_end"]
+    print(
+        f"\n== {level['sessions']} concurrent sessions: wall {level['wall_seconds']:.3f}s, "
+        f"{level['sessions_per_second']:.2f} sessions/s, "
+        f"e2e mean {e2e['mean']:.4f}s p95 {e2e['p95']:.4f}s, "
+        f"{level['events_per_session']:.0f} events, {level['turns_per_session']:.1f} turns"
+    )
+    for section in ("stages", "callbacks", "session", "export"):
+        rows = sorted(level[section].items(), key=lambda kv: -kv[1].get("total", 0.0))
+        if not rows:
+            continue
+        print(f"  [{section}]")
+        for name, stats in rows:
+            print(
+                f"    {name:<55} n={stats['count']:<5} mean={stats['mean'] * 1000:8.3f}ms "
+                f"p95={stats['p95'] * 1000:8.3f}ms total={stats['total']:.3f}s"
+            )
+
+
+async def main_async(args) -> int:
+    search_service.backend = FixtureSearchBackend({})
+    store = None
+    if args.replay:
+        store = ReplayStore(args.replay)
+        models = install_replay(root_agent, "replay", store)
+    else:
+        models = install_fake_llm(root_agent, latency=args.latency, jitter=args.jitter, responses=CANNED)
+    _prepare_agents()
+    # 所有 Session 查核同一主張；預設停用結果快取與近似重複沿用，以量測完整 pipeline
+    result_cache_gate.enabled = result_cache_store.enabled = args.result_cache
+    result_cache_store.index_enabled = triage_agent.near_duplicates = args.result_cache
+    if args.instrument:
+        install_instrumentation(root_agent)
+    instrument_callbacks(root_agent)
+    service = create_session_service(args.session_backend, args.session_db)
+    instrument_service(service)
+    runner = Runner(app_name=APP_NAME, agent=root_agent, session_service=service)
+
+    levels = []
+    for concurrency in args.sessions:
+        level = await run_level(runner, service, concurrency, args.claim)
+        levels.append(level)
+        print_level(level)
+    if store is not None:
+        print(f"\nreplay: {store.stats}")
+    else:
+        print(f"\nmodel calls: {sum(m.stats['calls'] for m in models.values())}")
+
+    if args.output:
+        Path(args.output).write_text(
+            json.dumps({"latency": args.latency, "levels": levels}, ensure_ascii=False, indent=2)
+        )
+    if args.baseline:
+        failures = check_regression(levels, args.baseline, args.tolerance)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        return 1 if failures else 0
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="root_agent 端到端延遲基準測試（FakeLlm）")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 100], help="並行 Session 數")
+    parser.add_argument("--latency", type=float, default=0.0, help="每次模型呼叫注入的延遲秒數")
+    parser.add_argument("--jitter", type=float, default=0.0, help="延遲抖動秒數")
+    parser.add_argument("--session-backend", default="memory", choices=["memory", "sqlite"])
+    parser.add_argument("--session-db", default=None, help="sqlite 後端的資料庫路徑")
+    parser.add_argument("--result-cache", action="store_true", help="啟用主張結果快取與近似重複沿用（同一層級內第二次起命中）")
+    parser.add_argument("--instrument", action="store_true", help="安裝 judge.tools.instrumentation 以量測其開銷")
+    parser.add_argument("--replay", metavar="DB", help="重播 JUDGE_REPLAY=record 錄製的回應，取代 FakeLlm")
+    parser.add_argument("--claim", default=CLAIM, help="查核的主張（重播時需與錄製時相同）")
+    parser.add_argument("--output", help="將結果寫入 JSON 檔（可作為之後的 baseline）")
+    parser.add_argument("--baseline", help="比對的 baseline JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="允許的平均端到端時間增幅")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
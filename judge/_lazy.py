@@ -0,0 +1,41 @@
+"""模組層級延遲載入（PEP 562）：屬性第一次被存取時才匯入對應模組。
+
+google.adk 的匯入成本遠高於建立代理本身，因此套件的 ``__init__`` 只宣告名稱與
+來源模組，實際匯入（與代理建構）延後到第一次存取時。
+"""
+
+from __future__ import annotations
+
+import sys
+from importlib import import_module
+from typing import Callable
+
+
+def lazy_exports(package: str, exports: dict[str, str]) -> tuple[Callable, Callable]:
+    """建立套件的 ``__getattr__`` 與 ``__dir__``
+
+    Args:
+        package: 套件名稱（通常為 ``__name__``）
+        exports: 名稱 → ``"模組:屬性"``；省略 ``:屬性`` 時回傳模組本身。
+                 以 ``.`` 開頭的模組路徑相對於 package。
+    """
+
+    def __getattr__(name: str):
+        target = exports.get(name)
+        if target is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        module_name, _, attr = target.partition(":")
+        value = import_module(module_name, package)
+        if attr:
+            value = getattr(value, attr)
+        # 快取於模組，之後的存取不再經過 __getattr__
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__
+
+
+__all__ = ["lazy_exports"]
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 from functools import partial
 
-from google.adk.agents import LlmAgent, SequentialAgent
+from google.adk.agents import LlmAgent
+from google.adk.sessions.base_session_service import BaseSessionService
 from google.adk.sessions.session import Session
 
 from judge.tools.session_service import session_service
@@ -11,10 +12,13 @@ from judge.agents.moderator.advocate.agent import advocate_agent
 from judge.agents.knowledge.curator import curator_agent
 from judge.agents.moderator.devil.agent import devil_agent
 from judge.agents.adjudication.agent import adjudication_agent
+from judge.agents.cache import result_cache_gate, result_cache_store
+from judge.agents.pipeline import SKIP_KEY, DagPipelineAgent
 from judge.agents.adjudication.evidence import evidence_agent
 from judge.agents.adjudication.jury import jury_agent
 from judge.agents.adjudication.synthesizer.agent import synthesizer_agent
 from judge.agents.knowledge.historian import historian_agent
+from judge.agents.knowledge.triage import triage_agent
 from judge.agents.moderator.agent import referee_loop, executor_agent
 from judge.agents.moderator.tools import log_tool_output
 from judge.agents.moderator.skeptic.agent import skeptic_agent
@@ -22,13 +26,25 @@ from judge.agents.social.agent import social_summary_agent
 from judge.agents.social.noise.agent import social_noise_agent
 
 from judge.tools import _before_init_session, append_event, make_record_callback
+from judge.tools.debate_log import DEBATE_STATE_KEYS
+from judge.tools.result_cache import RESULT_KEYS
+from judge.tools.instrumentation import install_instrumentation, instrumentation_enabled
+from judge.tools.models import install_model_backend_from_env
+from judge.tools.replay import install_replay_from_env
 
 
-def create_session(state: dict | None = None) -> Session:
-    """建立新的 Session（同步呼叫版）"""
+def create_session(
+    state: dict | None = None, service: BaseSessionService | None = None
+) -> Session:
+    """建立新的 Session（同步呼叫版）
+
+    Args:
+        state:   初始 state，預設為空的辯論訊息
+        service: 指定 SessionService（如 SqliteSessionService），預設使用全域服務
+    """
 
     # 使用 google.adk 提供的同步 API，避免在此處建立事件迴圈
-    return session_service.create_session_sync(
+    return (service or session_service).create_session_sync(
         app_name="agent_judge",
         user_id="user",
         state=state
@@ -39,10 +55,13 @@ def create_session(state: dict | None = None) -> Session:
     )
 
 
-def bind_session(session: Session) -> None:
-    """將 append_event 函式注入各代理，避免全域依賴"""
+def bind_session(session: Session, service: BaseSessionService | None = None) -> None:
+    """將 append_event 函式注入各代理，避免全域依賴
+
+    service 需與建立 session 時使用的服務相同。
+    """
 
-    append_event_fn = partial(append_event, session, service=session_service)
+    append_event_fn = partial(append_event, session, service=service or session_service)
 
     # 統一列出需要寫入事件的代理與對應鍵值
     agent_event_map = [
@@ -70,9 +89,17 @@ def bind_session(session: Session) -> None:
         log_tool_output, append_event=append_event_fn
     )
 
+    # 上方重新指定了回呼，需補回量測回呼
+    if instrumentation_enabled():
+        install_instrumentation(root_agent)
+
 
 # =============== Root Pipeline ===============
-# 固定順序：Curator → Historian → 主持人回合制（正/反/極端）→ Social → Evidence → Jury → Synthesizer(JSON)
+# 宣告順序：Curator → 結果快取 → Triage → Historian → 主持人回合制（正/反/極端）→ Social → Evidence → Jury
+# → Synthesizer(JSON) → 寫入結果快取
+# 實際依 state 讀寫關係排程：Historian 與辯論迴圈並行，Social 與 Evidence 於迴圈後並行；
+# 結果快取完全命中時還原先前的報告並略過其後所有階段，部分命中（來源變動）時僅略過 Historian；
+# Triage 判定結論明確時由快速整合者產生報告，並略過其後所有階段（寫入快取除外）
 
 init_session = LlmAgent(
     name="init_session",
@@ -82,18 +109,69 @@ init_session = LlmAgent(
     output_key="_init_session",
 )
 
-root_agent = SequentialAgent(
+root_agent = DagPipelineAgent(
     name="root_pipeline",
     sub_agents=[
         init_session,
         curator_agent,
+        result_cache_gate,
+        triage_agent,
         historian_agent,
         referee_loop,
         social_summary_agent,
         adjudication_agent,
+        result_cache_store,
     ],
+    flatten=[adjudication_agent.name],
+    # 辯論狀態由回呼與工具寫入，無法從 output_key 推得
+    extra_reads={
+        # init_session 會重設辯論狀態，Curator 須待其完成後才開始
+        curator_agent.name: [init_session.output_key],
+        # 快取鍵包含 Curator 來源的指紋，須待 Curator 完成後才查詢
+        result_cache_gate.name: ["curation"],
+        # 透過 before_agent_callback 讀取辯論訊息與證據庫並建構脈絡/證據摘要
+        jury_agent.name: ["debate_messages", "evidence_store", "evidence", "evidence_checked"],
+        synthesizer_agent.name: ["debate_messages", "evidence_store", "evidence_checked"],
+        result_cache_store.name: [*RESULT_KEYS, "curation", "result_cache"],
+    },
+    extra_writes={
+        init_session.name: list(DEBATE_STATE_KEYS),
+        result_cache_gate.name: [*RESULT_KEYS, "result_cache", SKIP_KEY],
+        # 分流可沿用近似重複主張的報告，或將其證據併入證據庫
+        triage_agent.name: [
+            "triage",
+            SKIP_KEY,
+            "final_report_json",
+            "jury_result",
+            "evidence_store",
+            "evidence_unique_count",
+        ],
+        referee_loop.name: list(DEBATE_STATE_KEYS),
+        # 整合者將查核結果併入證據庫
+        synthesizer_agent.name: ["evidence_store"],
+        result_cache_store.name: ["result_cache"],
+    },
 )
 
+_stages = root_agent.stages()
+# 結果快取完全命中：略過其後所有階段；部分命中：僅略過與來源無關的 Historian
+result_cache_gate.skip_on_hit = [stage.name for stage in _stages[_stages.index(result_cache_gate) + 1:]]
+result_cache_gate.skip_on_partial = [historian_agent.name]
+# 快速通道略過的階段：triage 之後的所有階段，但仍寫入結果快取
+triage_agent.skip = [
+    stage.name for stage in _stages[_stages.index(triage_agent) + 1:] if stage is not result_cache_store
+]
+
+# JUDGE_MODEL_BACKEND=fake 時改用離線 FakeLlm（基準測試/無網路環境）
+install_model_backend_from_env(root_agent)
+
+# JUDGE_REPLAY=record/replay 時錄製或重播所有模型與搜尋呼叫（重播時不需網路）
+install_replay_from_env(root_agent)
+
+# JUDGE_INSTRUMENTATION=1 時記錄各代理/工具/模型呼叫的耗時與 token
+if instrumentation_enabled():
+    install_instrumentation(root_agent)
+
 
 if __name__ == "__main__":
     session = create_session()
@@ -1,18 +1,10 @@
 """
 Agents package: 聚合所有子代理
+
+子代理於第一次存取時才匯入與建構（見 judge._lazy），只使用單一階段時不需載入其他代理。
 """
 
-from .moderator.advocate.agent import advocate_agent
-from .knowledge.curator import curator_agent
-from .knowledge.historian import historian_agent
-from .moderator.devil.agent import devil_agent
-from .adjudication.jury import jury_agent
-from .moderator.agent import orchestrator_agent, referee_loop
-from .moderator.skeptic.agent import skeptic_agent
-from .adjudication.synthesizer.agent import synthesizer_agent
-from .social.agent import social_summary_agent
-from .social.noise.agent import social_noise_agent
-from .adjudication.evidence import evidence_agent
+from judge._lazy import lazy_exports
 
 __all__ = [
     "advocate_agent",
@@ -27,4 +19,28 @@ __all__ = [
     "social_summary_agent",
     "social_noise_agent",
     "evidence_agent",
+    "triage_agent",
+    "result_cache_gate",
+    "result_cache_store",
 ]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "advocate_agent": ".moderator.advocate.agent:advocate_agent",
+        "curator_agent": ".knowledge.curator.agent:curator_agent",
+        "historian_agent": ".knowledge.historian.agent:historian_agent",
+        "devil_agent": ".moderator.devil.agent:devil_agent",
+        "jury_agent": ".adjudication.jury.agent:jury_agent",
+        "orchestrator_agent": ".moderator.agent:orchestrator_agent",
+        "referee_loop": ".moderator.agent:referee_loop",
+        "skeptic_agent": ".moderator.skeptic.agent:skeptic_agent",
+        "synthesizer_agent": ".adjudication.synthesizer.agent:synthesizer_agent",
+        "social_summary_agent": ".social.agent:social_summary_agent",
+        "social_noise_agent": ".social.noise.agent:social_noise_agent",
+        "evidence_agent": ".adjudication.evidence.agent:evidence_agent",
+        "triage_agent": ".knowledge.triage.agent:triage_agent",
+        "result_cache_gate": ".cache:result_cache_gate",
+        "result_cache_store": ".cache:result_cache_store",
+    },
+)
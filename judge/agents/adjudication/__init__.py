@@ -1,13 +1,10 @@
 """Adjudication layer: Evidence, Jury, Synthesizer.
 
 This package groups the agents that verify, judge, and synthesize
-outputs from the debate and social simulation.
+outputs from the debate and social simulation. Exports are resolved lazily.
 """
 
-from .evidence.agent import evidence_agent
-from .jury.agent import jury_agent
-from .synthesizer.agent import synthesizer_agent
-from .agent import adjudication_agent
+from judge._lazy import lazy_exports
 
 __all__ = [
     "evidence_agent",
@@ -15,3 +12,13 @@ __all__ = [
     "synthesizer_agent",
     "adjudication_agent",
 ]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "evidence_agent": ".evidence.agent:evidence_agent",
+        "jury_agent": ".jury.agent:jury_agent",
+        "synthesizer_agent": ".synthesizer.agent:synthesizer_agent",
+        "adjudication_agent": ".agent:adjudication_agent",
+    },
+)
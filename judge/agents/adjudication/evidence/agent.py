@@ -1,11 +1,12 @@
 from typing import List
 from pydantic import BaseModel, Field
 
-from google.adk.agents import LlmAgent, SequentialAgent
-from google.adk.tools.google_search_tool import GoogleSearchTool
+from google.adk.agents import LlmAgent
 from google.genai import types
 
 from judge.tools.evidence import Evidence
+from judge.tools.search import search_tool
+from judge.agents.structured import StructuredToolAgent, structured_instruction
 
 
 class CheckedClaim(BaseModel):
@@ -22,9 +23,10 @@ _evidence_tool_agent = LlmAgent(
     model="gemini-2.5-flash",
     instruction=(
         "根據辯論紀錄 state['debate_messages'] 或辯論檔案，"
-        "使用 GoogleSearchTool 逐條查證並將搜尋結果寫入 state['evidence_raw']。"
+        "使用 search_web 工具逐條查證並將搜尋結果寫入 state['evidence_raw']。"
+        + structured_instruction(EvidenceCheckOutput)
     ),
-    tools=[GoogleSearchTool()],
+    tools=[search_tool],
     output_key="evidence_raw",
 )
 
@@ -47,7 +49,7 @@ def _before_evidence(agent_context=None, **_):
     return None
 
 
-evidence_agent = SequentialAgent(
+evidence_agent = StructuredToolAgent(
     name="evidence_agent",
     sub_agents=[_evidence_tool_agent, _evidence_schema_agent],
     before_agent_callback=_before_evidence,
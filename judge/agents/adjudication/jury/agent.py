@@ -6,6 +6,8 @@ from google.adk.events.event_actions import EventActions
 import json
 from google.genai import types
 from judge.tools import flatten_fallacies
+from judge.tools.context import make_context_callback
+from judge.tools.evidence import make_evidence_digest_callback
 
 
 class ScoreDetail(BaseModel):
@@ -73,7 +75,8 @@ jury_agent = LlmAgent(
         "CURATION(JSON): {curation}\n"
         "ADVOCACY(JSON): (the current advocacy JSON in state['advocacy'], if any)\n"
         "SKEPTICISM(JSON): (the current skepticism JSON in state['skepticism'], if any)\n"
-        "DEBATE(LOG): (the current debate messages stored in state['debate_messages'])\n"
+        "DEBATE(LOG):\n{debate_context_jury?}\n"
+        "EVIDENCE(DIGEST, 已依來源去重):\n{evidence_digest_jury?}\n"
         "SOCIAL_LOG(JSON): {social_log}\n\n"
         "【評分規則】\n"
         "- evidence_quality: 來源權威性/時效性/相關性（0~30）\n"
@@ -89,6 +92,10 @@ jury_agent = LlmAgent(
     disallow_transfer_to_peers=True,
     output_key="jury_result",
     generate_content_config=types.GenerateContentConfig(temperature=0.0),
-    before_agent_callback=_ensure_and_flatten_fallacies,
+    before_agent_callback=[
+        _ensure_and_flatten_fallacies,
+        make_context_callback("jury"),
+        make_evidence_digest_callback("jury"),
+    ],
     after_agent_callback=jury_pretty_after,
 )
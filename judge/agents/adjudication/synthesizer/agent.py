@@ -6,6 +6,8 @@ from google.adk.events.event_actions import EventActions
 import json
 from google.genai import types
 from judge.tools import flatten_fallacies
+from judge.tools.context import make_context_callback
+from judge.tools.evidence import make_evidence_digest_callback
 
 
 class StakeSummary(BaseModel):
@@ -40,6 +42,7 @@ class FinalReport(BaseModel):
     risks: List[RiskItem] = Field(default_factory=list, description="可選：風險與緩解")
     open_questions: List[str] = Field(default_factory=list)
     appendix_links: List[str] = Field(default_factory=list, description="附錄連結（辯論日誌/原始證據等）")
+    fast_tracked: bool = Field(default=False, description="是否經分流快速通道產生（未經辯論與陪審）")
 
 
 def _ensure_and_flatten_fallacies(callback_context=None, **_):
@@ -81,7 +84,8 @@ synthesizer_agent = LlmAgent(
         "- SKEPTICISM(JSON): (the current skepticism JSON in state['skepticism'], if any)\n"
         "- (可選) DEVIL(JSON): (the optional devil turn stored in state['devil_turn'], if any)\n"
         "- JURY(JSON): (the current jury result in state['jury_result'], if any)\n"
-        "- DEBATE LOG (messages array): (the current debate messages stored in state['debate_messages'])\n"
+        "- DEBATE LOG:\n{debate_context_synthesizer?}\n"
+        "- EVIDENCE DIGEST（辯論與查核證據，已依來源去重）:\n{evidence_digest_synthesizer?}\n"
         "- SOCIAL LOG(JSON): (the current social diffusion log stored in state['social_log'], if any)\n\n"
         "【要求】\n"
         "1) 僅輸出符合 FinalReport schema 的 JSON；不得有多餘文字。\n"
@@ -95,6 +99,10 @@ synthesizer_agent = LlmAgent(
     disallow_transfer_to_peers=True,
     output_key="final_report_json",
     generate_content_config=types.GenerateContentConfig(temperature=0.0),
-    before_agent_callback=_ensure_and_flatten_fallacies,
+    before_agent_callback=[
+        _ensure_and_flatten_fallacies,
+        make_context_callback("synthesizer"),
+        make_evidence_digest_callback("synthesizer", include_checked=True),
+    ],
     after_agent_callback=_pretty_after,
 )
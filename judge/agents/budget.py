@@ -0,0 +1,249 @@
+"""辯論迴圈的預算控制。
+
+`BudgetedLoopAgent` 是在下列情況也會提前結束的 LoopAgent：
+
+- 預估下一輪會超出每場辯論的 token、實際時間或成本預算；預估值為本場辯論已執行各輪的
+  平均，第一次檢查時改用先前辯論的指數加權歷史
+- `update_metrics` 的邊際增益（``delta_dispute_points``、``delta_credibility``、
+  ``new_evidence_gain``）在 ``min_iterations`` 之後連續 ``low_gain_rounds`` 輪皆低於
+  門檻；尚無任何回合回報 confidence 時可信度差值恆為 0，不納入判斷
+
+token 用量來自 `install_usage_meter` 加在迴圈內每個 LlmAgent（含以 AgentTool 包裝的代理）
+最前面的 after_model 回呼，不論是否安裝 `judge.tools.instrumentation` 皆可運作。每輪結束
+後將已花費/預估用量與停止原因寫入 ``state['debate_budget']``。
+"""
+
+from __future__ import annotations
+
+import contextvars
+import copy
+import time
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent, LoopAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events.event import Event
+from google.adk.events.event_actions import EventActions
+from google.adk.tools.agent_tool import AgentTool
+from google.adk.utils.context_utils import Aclosing
+from pydantic import PrivateAttr
+
+from judge.tools.debate_log import has_confidence
+
+
+# 預設單價（美元 / 1K tokens），約為 gemini-2.5-flash 的公開價格
+DEFAULT_INPUT_PRICE = 0.0003
+DEFAULT_OUTPUT_PRICE = 0.0025
+
+# 跨辯論的每回合用量歷史：指數加權平均的權重
+HISTORY_WEIGHT = 0.3
+
+_METER_MARK = "_judge_usage_meter"
+_METER: contextvars.ContextVar[Optional["UsageMeter"]] = contextvars.ContextVar(
+    "judge_usage_meter", default=None
+)
+
+
+class UsageMeter:
+    """一次迴圈執行中的模型用量（由 after_model 回呼累加）"""
+
+    __slots__ = ("input_tokens", "output_tokens", "model_calls")
+
+    def __init__(self) -> None:
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.model_calls = 0
+
+    def snapshot(self) -> tuple[int, int, int]:
+        return self.input_tokens, self.output_tokens, self.model_calls
+
+
+def _meter_after_model(callback_context=None, llm_response=None, **_):
+    meter = _METER.get()
+    if meter is None or llm_response is None or getattr(llm_response, "partial", False):
+        return None
+    usage = getattr(llm_response, "usage_metadata", None)
+    meter.input_tokens += getattr(usage, "prompt_token_count", None) or 0
+    meter.output_tokens += getattr(usage, "candidates_token_count", None) or 0
+    meter.model_calls += 1
+    return None
+
+
+setattr(_meter_after_model, _METER_MARK, True)
+
+
+def install_usage_meter(agent: BaseAgent) -> int:
+    """為代理樹（含 AgentTool 包裝的代理）的 LlmAgent 前置用量回呼；可重複呼叫，回傳代理數"""
+    stack, seen, count = [agent], set(), 0
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        if isinstance(current, LlmAgent):
+            existing = current.after_model_callback
+            callbacks = existing if isinstance(existing, list) else ([existing] if existing else [])
+            if not any(getattr(cb, _METER_MARK, False) for cb in callbacks):
+                # after 回呼遇到非 None 回傳值即停止，放在最前面以確保執行
+                current.after_model_callback = [_meter_after_model] + callbacks
+            count += 1
+        stack.extend(t.agent for t in getattr(current, "tools", None) or [] if isinstance(t, AgentTool))
+        stack.extend(current.sub_agents)
+    return count
+
+
+def _gain(state, key: str) -> float:
+    value = state.get(key)
+    return float(value) if isinstance(value, (int, float)) else 0.0
+
+
+class BudgetedLoopAgent(LoopAgent):
+    """依預算與邊際增益提前結束的 LoopAgent"""
+
+    token_budget: Optional[int] = None
+    """整場辯論可花費的輸入 + 輸出 token 數。"""
+
+    time_budget: Optional[float] = None
+    """整場辯論可花費的實際秒數。"""
+
+    cost_budget: Optional[float] = None
+    """整場辯論可花費的美元，以 ``input_price``/``output_price``（每 1K token）計價。"""
+
+    input_price: float = DEFAULT_INPUT_PRICE
+    output_price: float = DEFAULT_OUTPUT_PRICE
+
+    min_iterations: int = 1
+    """套用增益門檻前一定會執行的輪數。"""
+
+    min_dispute_gain: float = 1.0
+    min_credibility_gain: float = 0.01
+    min_evidence_gain: float = 1.0
+
+    low_gain_rounds: int = 1
+    """停止前須連續低增益的輪數；辯論迴圈沿用停止判斷的 ``stall_rounds``，兩條規則一致。"""
+
+    _history: Optional[dict] = PrivateAttr(default=None)
+
+    def model_post_init(self, __context) -> None:
+        super().model_post_init(__context)
+        install_usage_meter(self)
+
+    def cost(self, input_tokens: float, output_tokens: float) -> float:
+        return (input_tokens * self.input_price + output_tokens * self.output_price) / 1000
+
+    def _estimate(self, iterations: list[dict]) -> Optional[dict]:
+        """下一回合的預估用量：本次辯論已完成回合的平均，沒有時使用跨辯論的歷史"""
+        if iterations:
+            n = len(iterations)
+            return {k: sum(it[k] for it in iterations) / n for k in ("tokens", "seconds", "cost")}
+        return dict(self._history) if self._history else None
+
+    def _learn(self, iteration: dict) -> None:
+        if self._history is None:
+            self._history = {k: iteration[k] for k in ("tokens", "seconds", "cost")}
+            return
+        for k in ("tokens", "seconds", "cost"):
+            self._history[k] += HISTORY_WEIGHT * (iteration[k] - self._history[k])
+
+    def over_budget(self, spent: dict, estimate: Optional[dict]) -> Optional[str]:
+        """加上下一回合的預估用量後是否超出任一預算，回傳超出的預算名稱"""
+        if estimate is None:
+            return None
+        for name, limit, key in (
+            ("token_budget", self.token_budget, "tokens"),
+            ("time_budget", self.time_budget, "seconds"),
+            ("cost_budget", self.cost_budget, "cost"),
+        ):
+            if limit is not None and spent[key] + estimate[key] > limit:
+                return name
+        return None
+
+    def low_gain(self, state) -> bool:
+        """dispute/credibility/evidence 的邊際增益皆低於門檻（沒有信心值時不看可信度）"""
+        return (
+            _gain(state, "delta_dispute_points") < self.min_dispute_gain
+            and (not has_confidence(state) or _gain(state, "delta_credibility") < self.min_credibility_gain)
+            and _gain(state, "new_evidence_gain") < self.min_evidence_gain
+        )
+
+    def _report(self, ctx: InvocationContext, report: dict) -> Event:
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={"debate_budget": copy.deepcopy(report)}),
+        )
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        meter = UsageMeter()
+        previous = _METER.get()
+        _METER.set(meter)
+        iterations: list[dict] = []
+        spent = {"tokens": 0, "input_tokens": 0, "output_tokens": 0, "seconds": 0.0, "cost": 0.0}
+        report = {
+            "budget": {"tokens": self.token_budget, "seconds": self.time_budget, "cost": self.cost_budget},
+            "iterations": 0,
+            "spent": spent,
+            "per_iteration": iterations,
+            "stop_reason": None,
+        }
+        started = time.perf_counter()
+        low_gain_streak = 0
+        try:
+            while not self.max_iterations or len(iterations) < self.max_iterations:
+                estimate = self._estimate(iterations)
+                exceeded = self.over_budget(spent, estimate)
+                if exceeded and len(iterations) >= self.min_iterations:
+                    report["stop_reason"] = exceeded
+                    report["estimate_next"] = estimate
+                    yield self._report(ctx, report)
+                    return
+
+                tokens_before = meter.snapshot()
+                iteration_start = time.perf_counter()
+                escalated = False
+                for sub_agent in self.sub_agents:
+                    async with Aclosing(sub_agent.run_async(ctx)) as agen:
+                        async for event in agen:
+                            yield event
+                            if event.actions.escalate:
+                                escalated = True
+                    if escalated:
+                        break
+
+                input_tokens = meter.input_tokens - tokens_before[0]
+                output_tokens = meter.output_tokens - tokens_before[1]
+                iteration = {
+                    "tokens": input_tokens + output_tokens,
+                    "model_calls": meter.model_calls - tokens_before[2],
+                    "seconds": round(time.perf_counter() - iteration_start, 4),
+                    "cost": round(self.cost(input_tokens, output_tokens), 6),
+                }
+                iterations.append(iteration)
+                self._learn(iteration)
+                spent["tokens"] += iteration["tokens"]
+                spent["input_tokens"] += input_tokens
+                spent["output_tokens"] += output_tokens
+                spent["seconds"] = round(time.perf_counter() - started, 4)
+                spent["cost"] = round(spent["cost"] + iteration["cost"], 6)
+                report["iterations"] = len(iterations)
+                report["gains"] = {
+                    key: ctx.session.state.get(key)
+                    for key in ("delta_dispute_points", "delta_credibility", "new_evidence_gain")
+                }
+
+                low_gain_streak = low_gain_streak + 1 if self.low_gain(ctx.session.state) else 0
+                if escalated:
+                    report["stop_reason"] = ctx.session.state.get("stop_reason") or "escalated"
+                elif len(iterations) >= self.min_iterations and low_gain_streak >= self.low_gain_rounds:
+                    report["stop_reason"] = "low_gain"
+                elif self.max_iterations and len(iterations) >= self.max_iterations:
+                    report["stop_reason"] = "max_iterations"
+                yield self._report(ctx, report)
+                if report["stop_reason"]:
+                    return
+        finally:
+            _METER.set(previous)
+
+
+__all__ = ["BudgetedLoopAgent", "UsageMeter", "install_usage_meter"]
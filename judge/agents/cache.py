@@ -0,0 +1,146 @@
+"""以主張層級結果快取為基礎的 pipeline 階段。
+
+快取項目只對同一主張 *且* 同一批 Curator 來源有效，因此 `ResultCacheGate` 讀取
+``state['curation']``，由 DagPipelineAgent 排在 Curator 之後執行：
+
+- 命中（同一主張、來源指紋相同）：還原先前的 ``final_report_json``、``jury_result``
+  與辯論紀錄，``state['pipeline_skip']`` 列出其後所有階段
+- 部分命中（同一主張、來源已變動）：只還原與來源無關的輸出（Historian 的 ``history``）
+  並略過對應階段，辯論與裁決依新的來源重新執行
+- 未命中：不還原任何輸出
+
+`ResultCacheStore` 最後執行並儲存完成的輸出，同時將主張與其 Curator 摘要加入近似
+重複索引（`judge.tools.near_duplicate`），之後的改寫主張可找到此 Session。兩個階段的
+結果皆寫入 ``state['result_cache']``。
+"""
+
+from __future__ import annotations
+
+import copy
+import time
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events.event import Event
+from google.adk.events.event_actions import EventActions
+from pydantic import Field
+
+from judge.agents.pipeline import SKIP_KEY
+from judge.evaluation.records import state_metrics
+from judge.tools.near_duplicate import (
+    NearDuplicateIndex,
+    curation_snippets,
+    near_duplicate_enabled,
+    near_duplicate_index,
+)
+from judge.tools.result_cache import (
+    PARTIAL_KEYS,
+    RESULT_KEYS,
+    ResultCache,
+    curation_fingerprint,
+    result_cache,
+    result_cache_enabled,
+)
+
+
+def claim_text(ctx: InvocationContext) -> str:
+    """本次執行的使用者訊息（即待查核的主張）"""
+    content = ctx.user_content
+    parts = getattr(content, "parts", None) or []
+    return "".join(part.text for part in parts if getattr(part, "text", None)).strip()
+
+
+def _plain(value):
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    return copy.deepcopy(value)
+
+
+class ResultCacheGate(BaseAgent):
+    """Curator 之後查詢結果快取；命中時還原輸出並略過後續階段"""
+
+    enabled: bool = True
+    cache: Optional[ResultCache] = None
+    """預設為共用的 `judge.tools.result_cache.result_cache`。"""
+
+    skip_on_hit: list[str] = Field(default_factory=list)
+    skip_on_partial: list[str] = Field(default_factory=list)
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        claim = claim_text(ctx)
+        status, payload = "disabled", None
+        fingerprint = curation_fingerprint(ctx.session.state.get("curation"))
+        if self.enabled and claim:
+            status, payload = (result_cache if self.cache is None else self.cache).lookup(claim, fingerprint)
+
+        info = {"status": status, "fingerprint": fingerprint}
+        # 每次執行都重設略過清單，避免沿用同一 Session 前一次的結果
+        delta: dict = {SKIP_KEY: []}
+        if status == "hit":
+            delta.update({k: payload[k] for k in RESULT_KEYS if k in payload})
+            delta[SKIP_KEY] = list(self.skip_on_hit)
+        elif status == "partial":
+            delta.update({k: payload[k] for k in PARTIAL_KEYS if k in payload})
+            delta[SKIP_KEY] = list(self.skip_on_partial)
+        if payload is not None:
+            info["age"] = round(time.time() - payload["cached_at"], 3)
+        delta["result_cache"] = info
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta=delta),
+        )
+
+
+class ResultCacheStore(BaseAgent):
+    """Pipeline 最後將本次輸出寫入結果快取"""
+
+    enabled: bool = True
+    cache: Optional[ResultCache] = None
+
+    index_enabled: bool = True
+    index: Optional[NearDuplicateIndex] = None
+    """預設為共用的 `judge.tools.near_duplicate.near_duplicate_index`。"""
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        claim = claim_text(ctx)
+        if not claim or not state.get("final_report_json") or not (self.enabled or self.index_enabled):
+            return
+        info = dict(state.get("result_cache") or {})
+        if self.enabled:
+            fingerprint = info.get("fingerprint") or curation_fingerprint(state.get("curation"))
+            payload = {k: _plain(state[k]) for k in RESULT_KEYS if state.get(k) is not None}
+            # 不還原至 state；批次沿用近似重複主張的結果時附於輸出紀錄
+            payload["metrics"] = state_metrics(state)
+            (result_cache if self.cache is None else self.cache).put(claim, fingerprint, payload)
+            info["stored"] = True
+        if self.index_enabled:
+            row = (near_duplicate_index if self.index is None else self.index).add(
+                ctx.session.id, claim, curation_snippets(state.get("curation"))
+            )
+            info["indexed"] = row is not None
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={"result_cache": info}),
+        )
+
+
+# JUDGE_RESULT_CACHE=0 停用；略過清單由 judge.agent 依 pipeline 階段設定
+result_cache_gate = ResultCacheGate(name="result_cache_gate", enabled=result_cache_enabled())
+result_cache_store = ResultCacheStore(
+    name="result_cache_store", enabled=result_cache_enabled(), index_enabled=near_duplicate_enabled()
+)
+
+
+__all__ = [
+    "ResultCacheGate",
+    "ResultCacheStore",
+    "claim_text",
+    "result_cache_gate",
+    "result_cache_store",
+]
@@ -1,6 +1,14 @@
-"""Knowledge layer agents: Curator and Historian."""
+"""Knowledge layer agents: Curator, Triage and Historian (resolved lazily)."""
 
-from .curator.agent import curator_agent
-from .historian.agent import historian_agent
+from judge._lazy import lazy_exports
 
-__all__ = ["curator_agent", "historian_agent"]
+__all__ = ["curator_agent", "historian_agent", "triage_agent"]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "curator_agent": ".curator.agent:curator_agent",
+        "historian_agent": ".historian.agent:historian_agent",
+        "triage_agent": ".triage.agent:triage_agent",
+    },
+)
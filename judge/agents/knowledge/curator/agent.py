@@ -1,10 +1,11 @@
 from typing import List, Optional
 from pydantic import BaseModel, Field
 
-from google.adk.agents import LlmAgent, SequentialAgent
+from google.adk.agents import LlmAgent
 from google.genai import types
-from google.adk.tools.google_search_tool import GoogleSearchTool
 from judge.tools.evidence import Evidence
+from judge.tools.search import search_tool
+from judge.agents.structured import StructuredToolAgent, structured_instruction
 
 
 class CuratorInput(BaseModel):
@@ -48,10 +49,11 @@ curator_tool_agent = LlmAgent(
     name="curator_tool_runner",
     model="gemini-2.5-flash",
     instruction=(
-        "你是 Curator 的工具執行者：使用 GoogleSearchTool 來取得原始搜尋結果，"
+        "你是 Curator 的工具執行者：使用 search_web 工具來取得原始搜尋結果，"
         "請把原始結果（未经 schema 驗證的 JSON）存入 state['curation_raw']。"
+        + structured_instruction(CuratorOutput)
     ),
-    tools=[GoogleSearchTool()],
+    tools=[search_tool],
     output_key="curation_raw",
 )
 
@@ -72,7 +74,7 @@ curator_schema_agent = LlmAgent(
 )
 
 
-curator_agent = SequentialAgent(
+curator_agent = StructuredToolAgent(
     name="curator",
     sub_agents=[curator_tool_agent, curator_schema_agent],
 )
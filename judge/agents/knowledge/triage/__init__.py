@@ -0,0 +1,3 @@
+from .agent import triage_agent
+
+__all__ = ["triage_agent"]
@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import os
+import re
+from itertools import combinations
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events.event import Event
+from google.adk.events.event_actions import EventActions
+from google.adk.utils.context_utils import Aclosing
+from google.genai import types
+from pydantic import Field
+
+from judge.agents.adjudication.synthesizer.agent import FinalReport
+from judge.agents.cache import claim_text
+from judge.agents.memo import jaccard_distance, shingles
+from judge.tools.evidence import canonical_source, record_evidence
+from judge.tools.near_duplicate import (
+    NearDuplicateIndex,
+    curation_snippets,
+    near_duplicate_enabled,
+    near_duplicate_index,
+    reuse_compatible,
+    reuse_threshold,
+    seed_threshold,
+)
+from judge.tools.result_cache import ResultCache, claim_key, result_cache
+
+
+# ==== 分流訊號 ====
+# 已知的事實查核來源（主機名稱，或正規化網址的前綴）
+FACT_CHECK_SOURCES = (
+    "tfc-taiwan.org.tw",
+    "mygopen.com",
+    "cofacts.tw",
+    "cofacts.g0v.tw",
+    "factcheck.org",
+    "snopes.com",
+    "politifact.com",
+    "fullfact.org",
+    "factcheck.afp.com",
+    "leadstories.com",
+    "https://reuters.com/fact-check",
+    "https://apnews.com/hub/ap-fact-check",
+)
+
+# 摘要中的查核結論用語。依序比對「未證實」、否定與肯定用語，避免「未證實」「不正確」
+# 「inaccurate」被判為肯定；未證實不算任何結論，該主張不會被快速通過。
+# 英文用語以單字邊界比對（「untrue」不含「true」），中文用語以子字串比對
+UNVERIFIED_CUES = (
+    "未證實", "尚未證實", "無法證實", "未經證實", "有待查證",
+    "unverified", "unproven", "unconfirmed", "not confirmed", "not verified",
+)
+FALSE_CUES = (
+    "錯誤", "謠言", "假訊息", "不實", "誤導", "闢謠", "假的", "不正確", "沒有根據", "不屬實", "不為真",
+    "false", "fake", "hoax", "misleading", "debunk", "debunked", "no evidence", "not true", "incorrect",
+    "inaccurate", "untrue", "not accurate", "not correct",
+)
+TRUE_CUES = ("正確", "屬實", "證實", "為真", "true", "accurate", "confirmed", "correct")
+
+
+def _cue_pattern(cues: tuple[str, ...]) -> re.Pattern:
+    return re.compile("|".join(rf"\b{re.escape(c)}\b" if c.isascii() else re.escape(c) for c in cues))
+
+
+_UNVERIFIED = _cue_pattern(UNVERIFIED_CUES)
+_FALSE = _cue_pattern(FALSE_CUES)
+_TRUE = _cue_pattern(TRUE_CUES)
+
+MAX_COMPARED_SNIPPETS = 10
+
+# 近似重複主張直接沿用時自結果快取還原的鍵
+REUSED_KEYS = ("final_report_json", "jury_result", "evidence_store")
+
+
+def is_fact_check_source(url: str) -> bool:
+    canonical = canonical_source(url)
+    host = canonical.removeprefix("https://").split("/", 1)[0]
+    for source in FACT_CHECK_SOURCES:
+        if source.startswith("https://"):
+            if canonical.startswith(source):
+                return True
+        elif host == source or host.endswith("." + source):
+            return True
+    return False
+
+
+def snippet_polarity(text: str) -> Optional[str]:
+    """由標題／摘要判斷查核結論："false"、"true" 或 None（無法判斷或未證實）"""
+    text = (text or "").casefold()
+    if _UNVERIFIED.search(text):
+        return None
+    if _FALSE.search(text):
+        return "false"
+    if _TRUE.search(text):
+        return "true"
+    return None
+
+
+def _results(curation) -> list[dict]:
+    if hasattr(curation, "model_dump"):
+        curation = curation.model_dump()
+    if not isinstance(curation, dict):
+        return []
+    return [r for r in curation.get("results") or [] if isinstance(r, dict)]
+
+
+def triage_curation(curation) -> dict:
+    """由 CuratorOutput 計算來源一致度、查核網站命中數與摘要相似度"""
+    results = _results(curation)
+    labeled = []
+    fact_checks = []
+    for result in results:
+        polarity = snippet_polarity(f"{result.get('title', '')} {result.get('snippet', '')}")
+        if polarity is not None:
+            labeled.append((polarity, result))
+        if is_fact_check_source(result.get("url", "")):
+            fact_checks.append(result.get("url", ""))
+    counts = {"false": 0, "true": 0}
+    for polarity, _ in labeled:
+        counts[polarity] += 1
+    verdict = max(counts, key=counts.get) if labeled else None
+    agreement = counts[verdict] / len(labeled) if labeled else 0.0
+    agreeing = [r for p, r in labeled if p == verdict][:MAX_COMPARED_SNIPPETS]
+    tokens = [shingles(r.get("snippet", "")) for r in agreeing]
+    pairs = list(combinations(tokens, 2))
+    similarity = sum(1.0 - jaccard_distance(a, b) for a, b in pairs) / len(pairs) if pairs else 0.0
+    score = 0.5 * agreement + 0.3 * min(1.0, len(fact_checks) / 2) + 0.2 * similarity
+    return {
+        "verdict": verdict,
+        "score": round(score, 4),
+        "signals": {
+            "results": len(results),
+            "labeled": len(labeled),
+            "agreement": round(agreement, 4),
+            "fact_check_hits": len(fact_checks),
+            "snippet_similarity": round(similarity, 4),
+        },
+        "fact_check_sources": fact_checks,
+    }
+
+
+# ==== 快速整合者：僅依 curation 與分流結果產生 FinalReport ====
+fast_synthesizer_agent = LlmAgent(
+    name="fast_synthesizer",
+    model="gemini-2.5-flash",
+    instruction=(
+        "你是『快速整合者』。此主張已有多個一致的查核來源，不需要辯論。\n"
+        "- CURATION(JSON): {curation}\n"
+        "- TRIAGE(JSON): {triage}\n\n"
+        "請依 TRIAGE.verdict 與查核來源輸出符合 FinalReport schema 的 JSON：\n"
+        "overall_assessment 直接說明查核結論；evidence_digest 列出查核來源（含網址）；"
+        "stake_summaries 與 key_contentions 各簡述 1 項即可；jury_score/jury_brief 留空；"
+        "fast_tracked 設為 true。不得有多餘文字。"
+    ),
+    output_schema=FinalReport,
+    disallow_transfer_to_parent=True,
+    disallow_transfer_to_peers=True,
+    output_key="final_report_json",
+    generate_content_config=types.GenerateContentConfig(temperature=0.0),
+)
+
+
+def _prior_evidence(payload: dict) -> list:
+    store = payload.get("evidence_store")
+    items = store.get("items") if isinstance(store, dict) else None
+    return list(items.values()) if isinstance(items, dict) else []
+
+
+class TriageAgent(BaseAgent):
+    """Curator 之後的分流：結論明確時以快速整合者產生報告，並略過其餘階段
+
+    另查詢近似重複索引：與先前查核過的主張（含 Curator 摘要）相似度達
+    seed_threshold 時將其證據併入證據庫作為辯論起點。設定 reuse_threshold 時，
+    相似度達門檻且否定用語與數字皆相同（reuse_compatible）的主張直接沿用其
+    FinalReport（與陪審結果、證據庫）；預設不沿用。先前的結果取自結果快取。
+
+    寫入 state['triage']；快速通道時將 skip 併入 state['pipeline_skip']（由
+    DagPipelineAgent 略過對應階段）。sub_agents = [fast_synthesizer]。
+    """
+
+    enabled: bool = True
+    threshold: float = 0.7
+    min_sources: int = 2
+    min_agreement: float = 0.8
+    min_fact_checks: int = 1
+    skip: list[str] = Field(default_factory=list)
+    """主張走快速通道時略過的 pipeline 階段。"""
+
+    near_duplicates: bool = True
+    reuse_threshold: Optional[float] = None
+    """沿用先前 FinalReport 的相似度門檻；None 時只併入其證據。"""
+    seed_threshold: float = 0.5
+    index: Optional[NearDuplicateIndex] = None
+    cache: Optional[ResultCache] = None
+
+    def route(self, triage: dict) -> bool:
+        signals = triage["signals"]
+        return (
+            self.enabled
+            and triage["verdict"] is not None
+            and signals["labeled"] >= self.min_sources
+            and signals["agreement"] >= self.min_agreement
+            and signals["fact_check_hits"] >= self.min_fact_checks
+            and triage["score"] >= self.threshold
+        )
+
+    def near_duplicate(self, ctx: InvocationContext) -> tuple[Optional[dict], Optional[dict]]:
+        """回傳 (最相近的已查核主張, 其快取結果)；低於 seed_threshold 或沒有快取結果時為 (None, None)"""
+        claim = claim_text(ctx)
+        if not self.near_duplicates or not claim:
+            return None, None
+        match = (near_duplicate_index if self.index is None else self.index).query(
+            claim,
+            curation_snippets(ctx.session.state.get("curation")),
+            min_score=self.seed_threshold,
+            exclude=ctx.session.id,
+        )
+        if match is None:
+            return None, None
+        payload = (result_cache if self.cache is None else self.cache).get(match.claim)
+        return ({**match.to_dict(), "query": claim}, payload) if payload else (None, None)
+
+    def _reuse_delta(self, triage: dict, match: dict, payload: dict, state) -> dict:
+        """依相似度沿用先前的 FinalReport 或併入其證據"""
+        report = payload.get("final_report_json")
+        # 同一主張由結果快取處理：走到這裡代表來源已變動（部分命中），只併入證據
+        paraphrase = claim_key(match["claim"]) != claim_key(match["query"])
+        if (
+            paraphrase
+            and self.reuse_threshold is not None
+            and not triage["fast_track"]
+            and isinstance(report, dict)
+            and match["score"] >= self.reuse_threshold
+            and reuse_compatible(match["query"], match["claim"])
+        ):
+            triage["reused_from"] = match["session_id"]
+            # 一併沿用陪審結果與證據庫，之後再相似的主張仍可取得完整結果
+            delta = {k: payload[k] for k in REUSED_KEYS if payload.get(k) is not None}
+            delta["final_report_json"] = {**report, "fast_tracked": True}
+            return delta
+        items = _prior_evidence(payload)
+        if not items:
+            return {}
+        scratch = {k: state.get(k) for k in ("evidence_store", "evidence")}
+        triage["seeded_evidence"] = record_evidence(scratch, items, origin="near_duplicate")
+        return {k: scratch[k] for k in ("evidence_store", "evidence_unique_count")}
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        triage = triage_curation(ctx.session.state.get("curation"))
+        triage["fast_track"] = self.route(triage)
+        delta: dict = {"triage": triage}
+        match, payload = self.near_duplicate(ctx)
+        if match is not None:
+            triage["near_duplicate"] = match
+            delta.update(self._reuse_delta(triage, match, payload, ctx.session.state))
+        if triage["fast_track"] or triage.get("reused_from"):
+            # 保留前面階段（如結果快取的部分命中）已設定的略過清單
+            skip = list(ctx.session.state.get("pipeline_skip") or [])
+            delta["pipeline_skip"] = skip + [name for name in self.skip if name not in skip]
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta=delta),
+        )
+        if not triage["fast_track"]:
+            return
+
+        async with Aclosing(self.sub_agents[0].run_async(ctx)) as agen:
+            async for event in agen:
+                yield event
+        report = ctx.session.state.get("final_report_json")
+        if hasattr(report, "model_dump"):
+            report = report.model_dump()
+        if isinstance(report, dict):
+            yield Event(
+                invocation_id=ctx.invocation_id,
+                author=self.name,
+                branch=ctx.branch,
+                actions=EventActions(state_delta={"final_report_json": {**report, "fast_tracked": True}}),
+            )
+
+
+triage_agent = TriageAgent(
+    name="triage",
+    sub_agents=[fast_synthesizer_agent],
+    enabled=(os.getenv("JUDGE_TRIAGE") or "1").lower() not in ("0", "false", "no"),
+    threshold=float(os.getenv("JUDGE_TRIAGE_THRESHOLD") or 0.7),
+    near_duplicates=near_duplicate_enabled(),
+    reuse_threshold=reuse_threshold(),
+    seed_threshold=seed_threshold(),
+)
@@ -0,0 +1,135 @@
+"""每輪迴圈都會執行的代理：輸入未變時略過的記憶化包裝。
+
+`MemoizedAgent` 包裝單一子代理，並為該子代理實際依賴的 state 鍵計算指紋。輸入與上一次
+實際執行時相同，或差異小於 ``min_change``（詞集合的 Jaccard 距離）時略過子代理，state 中
+保留其先前的輸出；連續沿用 ``refresh_every`` 次後強制實際執行一次。
+
+指紋依 Session 保存在記憶體中（有上限的 LRU，與 `judge.tools.debate_log` 的回合索引相同）；
+命中/未命中次數寫入 ``state['<name>_stats']``。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events.event import Event
+from google.adk.events.event_actions import EventActions
+from google.adk.utils.context_utils import Aclosing
+from pydantic import Field, PrivateAttr
+
+
+MEMO_MAX_SESSIONS = 256
+
+_TOKEN_RE = re.compile(r"[\u3400-\u9fff]|[^\W_\u3400-\u9fff]+")
+
+
+def _text_of(value) -> str:
+    if hasattr(value, "model_dump"):
+        value = value.model_dump()
+    if isinstance(value, list):
+        # 辯論訊息只取實際呈現給模型的欄位，略過重複的 data 負載
+        value = [
+            {k: v for k, v in m.items() if k != "data"} if isinstance(m, dict) and m.get("content") else m
+            for m in value
+        ]
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, default=str)
+
+
+def shingles(text: str) -> set[str]:
+    """字詞（中文為單字）與相鄰二元組的集合"""
+    tokens = _TOKEN_RE.findall(text.casefold())
+    return set(tokens) | {f"{a} {b}" for a, b in zip(tokens, tokens[1:])}
+
+
+def jaccard_distance(a: set[str], b: set[str]) -> float:
+    if not a and not b:
+        return 0.0
+    return 1.0 - len(a & b) / len(a | b)
+
+
+class _Memo:
+    __slots__ = ("digest", "shingles", "reuses")
+
+    def __init__(self, digest: str, tokens: set[str]) -> None:
+        self.digest = digest
+        self.shingles = tokens
+        self.reuses = 0
+
+
+class MemoizedAgent(BaseAgent):
+    """sub_agents = [wrapped]；輸入未變（或變化低於門檻）時沿用上一次的輸出"""
+
+    input_keys: list[str] = Field(default_factory=list)
+    """決定被包裝代理輸出的 state 鍵。"""
+
+    min_change: float = 0.0
+    """輸入有變但 Jaccard 距離低於此值時仍沿用上一次的輸出。"""
+
+    refresh_every: int = 0
+    """連續沿用此次數後強制實際執行（0 為停用）。"""
+
+    _memos: "OrderedDict[tuple[str, str], _Memo]" = PrivateAttr(default_factory=OrderedDict)
+
+    def fingerprint(self, state) -> tuple[str, set[str]]:
+        text = "\n".join(f"{key}={_text_of(state.get(key))}" for key in self.input_keys)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest(), shingles(text)
+
+    def decide(self, session_id: str, state) -> tuple[bool, str, float, Optional[_Memo]]:
+        """回傳 (是否沿用, 原因, 與上次輸入的距離, 實際執行後要記錄的指紋)"""
+        digest, tokens = self.fingerprint(state)
+        key = (session_id, self.name)
+        memo: Optional[_Memo] = self._memos.get(key)
+        if memo is None:
+            return False, "first_run", 1.0, _Memo(digest, tokens)
+        self._memos.move_to_end(key)
+        distance = 0.0 if memo.digest == digest else jaccard_distance(memo.shingles, tokens)
+        if self.refresh_every and memo.reuses >= self.refresh_every:
+            return False, "refresh", distance, _Memo(digest, tokens)
+        if memo.digest == digest:
+            reason = "unchanged"
+        elif distance < self.min_change:
+            reason = "below_threshold"
+        else:
+            return False, "changed", distance, _Memo(digest, tokens)
+        memo.reuses += 1
+        return True, reason, distance, None
+
+    def _remember(self, session_id: str, memo: _Memo) -> None:
+        self._memos[(session_id, self.name)] = memo
+        while len(self._memos) > MEMO_MAX_SESSIONS:
+            self._memos.popitem(last=False)
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        reuse, reason, distance, memo = self.decide(ctx.session.id, ctx.session.state)
+
+        stats_key = f"{self.name}_stats"
+        stats = dict(ctx.session.state.get(stats_key) or {"hits": 0, "misses": 0})
+        stats["hits" if reuse else "misses"] += 1
+        stats["hit_rate"] = stats["hits"] / (stats["hits"] + stats["misses"])
+        stats["last_reason"] = reason
+        stats["last_distance"] = round(distance, 4)
+
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={stats_key: stats}),
+        )
+        if reuse:
+            return
+        async with Aclosing(self.sub_agents[0].run_async(ctx)) as agen:
+            async for event in agen:
+                yield event
+        # 僅在實際執行完成後記錄指紋，失敗時下次仍會重新執行
+        self._remember(ctx.session.id, memo)
+
+
+__all__ = ["MemoizedAgent", "jaccard_distance", "shingles"]
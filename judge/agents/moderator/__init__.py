@@ -2,15 +2,21 @@
 
 Exports the moderator orchestrator/loop and keeps debaters under this package,
 following the architecture where the moderator controls Advocate/Skeptic/Devil.
+Exports are resolved lazily so importing a single debater does not build the
+whole moderator loop.
 """
 
-from .agent import orchestrator_agent, decision_agent, executor_agent, stop_checker, referee_loop
+from judge._lazy import lazy_exports
 
 __all__ = [
     "orchestrator_agent",
     "decision_agent",
     "executor_agent",
     "stop_checker",
+    "stop_checker_llm",
+    "RuleStopChecker",
+    "social_noise_memo",
     "referee_loop",
 ]
 
+__getattr__, __dir__ = lazy_exports(__name__, {name: f".agent:{name}" for name in __all__})
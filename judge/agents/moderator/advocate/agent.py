@@ -1,10 +1,11 @@
 from typing import List
 from pydantic import BaseModel, Field
 
-from google.adk.agents import LlmAgent, SequentialAgent
+from google.adk.agents import LlmAgent
 from google.genai import types
-from google.adk.tools.google_search_tool import GoogleSearchTool
 from judge.tools.evidence import Evidence
+from judge.tools.search import search_tool
+from judge.agents.structured import StructuredToolAgent, structured_instruction
 
 
 class CuratorSearchResult(BaseModel):
@@ -29,10 +30,11 @@ advocate_tool_agent = LlmAgent(
     name="advocate_tool_runner",
     model="gemini-2.5-flash",
     instruction=(
-        "你是 Advocate 的工具執行者：在需要時使用 GoogleSearchTool 補充證據，"
+        "你是 Advocate 的工具執行者：在需要時使用 search_web 工具補充證據，"
         "並把任何工具輸出（raw）寫入 state['advocate_search_raw']。"
+        + structured_instruction(AdvocateOutput)
     ),
-    tools=[GoogleSearchTool()],
+    tools=[search_tool],
     output_key="advocate_search_raw",
 )
 
@@ -52,7 +54,7 @@ advocate_schema_agent = LlmAgent(
 )
 
 
-advocate_agent = SequentialAgent(
+advocate_agent = StructuredToolAgent(
     name="advocate",
     sub_agents=[advocate_tool_agent, advocate_schema_agent],
 )
@@ -2,14 +2,32 @@
 Moderator orchestrator: decision, execution, and stop-checker agents.
 
 This module wires together the moderator's LLM sub-agents and the
-referee LoopAgent. Helper functions and AgentTool wrappers live in
+referee LoopAgent. The stop checker is rule-based and only falls back to
+an LLM call when the debate metrics are ambiguous. The per-iteration social
+noise simulation is memoized and only re-run when curation or the debate has
+changed enough. The executor dispatches ``next_decision`` to the debater
+tools without a model call (see `.dispatch`). With ``JUDGE_SPECULATIVE`` set,
+the likely next debater runs while the decision agent is still deciding (see
+`.speculative`). The referee loop runs several turns within a token / time /
+cost budget (see `judge.agents.budget`). Helper functions and AgentTool wrappers live in
 `judge.agents.moderator.tools`.
 """
 
-from google.adk.agents import LlmAgent, SequentialAgent, LoopAgent
+import os
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent, LlmAgent, SequentialAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events.event import Event
+from google.adk.events.event_actions import EventActions
+from google.adk.utils.context_utils import Aclosing
 from google.genai import types
 
 from .tools import (
+    DEFAULT_MAX_TURNS,
+    DEFAULT_MIN_NOVELTY,
+    DEFAULT_STALL_ROUNDS,
+    evaluate_stop,
     exit_loop,
     ensure_debate_messages,
     advocate_tool,
@@ -17,7 +35,12 @@ from .tools import (
     devil_tool,
     NextTurnDecision,
 )
+from .dispatch import DirectExecutor
+from .speculative import SpeculativeOrchestrator
+from judge.agents.budget import BudgetedLoopAgent
+from judge.agents.memo import MemoizedAgent
 from judge.agents.social.noise.agent import social_noise_agent
+from judge.tools.context import make_context_callback
 
 
 # --- Step 1: decision agent (schema-only) ---
@@ -27,10 +50,13 @@ decision_agent = LlmAgent(
     instruction=(
         "你是主持人的決策模組。目標：在維持秩序、避免重複論點、推進爭點澄清的前提下，"
         "輸出一個 NextTurnDecision JSON（next_speaker: 'advocate'|'skeptic'|'devil'|'end'）以及簡短 rationale。\n"
-        "輸入：\n- CURATION: {curation}\n- SOCIAL_NOISE: {social_noise}\n- MESSAGES(JSON array): (the current debate messages stored in state['debate_messages'])\n\n"
+        "輸入：\n- CURATION: {curation}\n- SOCIAL_NOISE: {social_noise}\n- DEBATE:\n{debate_context_moderator_decider?}\n"
+        "- NOVELTY（最近一次發言相對先前論點的新穎度 score 0~1 與重述的論點）: {novelty?}\n\n"
+        "NOVELTY.score 偏低代表辯手在重複先前論點：請改派能提出新觀點的角色；"
+        "若各方都已無新觀點，請輸出 'end'。\n"
         "僅產生 NextTurnDecision，不呼叫任何工具。"
     ),
-    before_agent_callback=ensure_debate_messages,
+    before_agent_callback=[ensure_debate_messages, make_context_callback("moderator_decider")],
     output_schema=NextTurnDecision,
     disallow_transfer_to_parent=True,
     disallow_transfer_to_peers=True,
@@ -42,33 +68,58 @@ decision_agent = LlmAgent(
 )
 
 
-# --- Step 2: executor agent (tool-enabled, no output_schema) ---
-executor_agent = LlmAgent(
-    name="moderator_executor",
-    model="gemini-2.5-flash",
-    instruction=(
-        "你是主持人的執行模組：讀取 state['next_decision']，若 next_speaker 為 'end' 則回傳空字串，"
-        "否則呼叫相對應的工具 (call_advocate/call_skeptic/call_devil) 取得該角色的發言。"
-        "工具已自動更新 state['debate_messages']，請將取得的字串原封不動地回傳。"
-    ),
-    before_agent_callback=ensure_debate_messages,
-    tools=[advocate_tool, skeptic_tool, devil_tool],
-    after_tool_callback=None,
-    output_key="orchestrator_exec",
-    generate_content_config=types.GenerateContentConfig(
-        temperature=0.0,
-        response_mime_type="text/plain"
-    ),
-)
+# --- Step 2: executor agent ---
+# next_speaker → 工具的對應是固定的：預設以 DirectExecutor 直接呼叫辯手工具，
+# 省下每回合一次模型呼叫；JUDGE_EXECUTOR=llm 時改回由 LLM 呼叫工具
+EXECUTOR_MODE = (os.getenv("JUDGE_EXECUTOR") or "direct").lower()
 
-orchestrator_agent = SequentialAgent(
-    name="moderator_orchestrator",
-    sub_agents=[decision_agent, executor_agent],
-)
+if EXECUTOR_MODE == "llm":
+    executor_agent = LlmAgent(
+        name="moderator_executor",
+        model="gemini-2.5-flash",
+        instruction=(
+            "你是主持人的執行模組：讀取 state['next_decision']，若 next_speaker 為 'end' 則回傳空字串，"
+            "否則呼叫相對應的工具 (call_advocate/call_skeptic/call_devil) 取得該角色的發言。"
+            "工具已自動更新 state['debate_messages']，請將取得的字串原封不動地回傳。"
+        ),
+        before_agent_callback=ensure_debate_messages,
+        tools=[advocate_tool, skeptic_tool, devil_tool],
+        after_tool_callback=None,
+        output_key="orchestrator_exec",
+        generate_content_config=types.GenerateContentConfig(
+            temperature=0.0,
+            response_mime_type="text/plain"
+        ),
+    )
+else:
+    executor_agent = DirectExecutor(
+        name="moderator_executor",
+        before_agent_callback=ensure_debate_messages,
+        tools=[advocate_tool, skeptic_tool, devil_tool],
+        after_tool_callback=None,
+        output_key="orchestrator_exec",
+    )
 
+# JUDGE_SPECULATIVE=N（N>0）時，決策期間預先執行最可能的 N 位辯手，
+# 命中即略過執行者 LLM；未設定時維持決策 → 執行的兩段式流程
+SPECULATION_WIDTH = int(os.getenv("JUDGE_SPECULATIVE") or 0)
 
-stop_checker = LlmAgent(
-    name="stop_checker",
+if SPECULATION_WIDTH > 0:
+    orchestrator_agent = SpeculativeOrchestrator(
+        name="moderator_orchestrator",
+        sub_agents=[decision_agent, executor_agent],
+        width=SPECULATION_WIDTH,
+    )
+else:
+    orchestrator_agent = SequentialAgent(
+        name="moderator_orchestrator",
+        sub_agents=[decision_agent, executor_agent],
+    )
+
+
+# LLM 版停止判斷：僅在規則無法判斷時作為備援
+stop_checker_llm = LlmAgent(
+    name="stop_checker_llm",
     model="gemini-2.5-flash",
     tools=[exit_loop],
     instruction=(
@@ -76,10 +127,10 @@ stop_checker = LlmAgent(
         "規則：達到 max_turns 或連續兩輪沒有新增實質證據/新觀點。\n"
         "若決策模組 next_decision.next_speaker 為 'end'，務必呼叫提供的工具 exit_loop。\n"
         "若不該結束，請回傳純文字 continue（或回傳空字串）。\n"
-        "MESSAGES:\n(the current debate messages are available in state['debate_messages'])\n"
+        "MESSAGES:\n{debate_context_stop_checker_llm?}\n"
         "NEXT_DECISION:\n(the current moderator decision is available in state['next_decision'])"
     ),
-    before_agent_callback=ensure_debate_messages,
+    before_agent_callback=[ensure_debate_messages, make_context_callback("stop_checker_llm")],
     output_key="stop_signal",
     generate_content_config=types.GenerateContentConfig(
         temperature=0.0,
@@ -87,8 +138,71 @@ stop_checker = LlmAgent(
     ),
 )
 
-referee_loop = LoopAgent(
+class RuleStopChecker(BaseAgent):
+    """以規則判斷是否結束辯論迴圈（不呼叫 LLM）
+
+    依序檢查 next_decision 是否為 'end'、是否達到 max_turns、以及
+    update_metrics/should_stop 的指標或發言新穎度是否連續停滯；只有部分指標
+    停滯的模糊情況才交給 sub_agents 中的 LLM 備援判斷。
+    """
+
+    max_turns: int = DEFAULT_MAX_TURNS
+    stall_rounds: int = DEFAULT_STALL_ROUNDS
+    min_novelty: float = DEFAULT_MIN_NOVELTY
+    use_llm_fallback: bool = True
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        verdict, reason, updates = evaluate_stop(state, self.max_turns, self.stall_rounds, self.min_novelty)
+        fallback = self.use_llm_fallback and verdict == "ambiguous" and self.sub_agents
+
+        stats = dict(state.get("stop_checker_stats") or {"rule_decisions": 0, "llm_fallbacks": 0})
+        stats["llm_fallbacks" if fallback else "rule_decisions"] += 1
+        updates["stop_checker_stats"] = stats
+        updates["stop_reason"] = reason
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta=updates, escalate=verdict == "stop" or None),
+        )
+
+        if fallback:
+            async with Aclosing(self.sub_agents[0].run_async(ctx)) as agen:
+                async for event in agen:
+                    yield event
+
+
+stop_checker = RuleStopChecker(
+    name="stop_checker",
+    sub_agents=[stop_checker_llm],
+    min_novelty=float(os.getenv("JUDGE_MIN_NOVELTY") or DEFAULT_MIN_NOVELTY),
+)
+
+# 社群噪音僅依 curation 與辯論內容而變：變化低於門檻時沿用上一輪結果，
+# 並每隔 refresh_every 次沿用強制重新模擬一次
+social_noise_memo = MemoizedAgent(
+    name="social_noise_memo",
+    sub_agents=[social_noise_agent],
+    input_keys=["curation", "debate_messages"],
+    min_change=float(os.getenv("JUDGE_SOCIAL_NOISE_MIN_CHANGE") or 0.2),
+    refresh_every=int(os.getenv("JUDGE_SOCIAL_NOISE_REFRESH_EVERY") or 3),
+)
+
+def _env_number(name: str, cast=float):
+    value = os.getenv(name)
+    return cast(value) if value else None
+
+
+# 多回合辯論：回合數上限外，另以 token/時間/成本預算與邊際增益提前結束，
+# 爭議大的主張辯得深、明確的主張少跑幾輪
+referee_loop = BudgetedLoopAgent(
     name="debate_referee_loop",
-    sub_agents=[social_noise_agent, orchestrator_agent, stop_checker],
-    max_iterations=1,
+    sub_agents=[social_noise_memo, orchestrator_agent, stop_checker],
+    max_iterations=_env_number("JUDGE_DEBATE_MAX_ITERATIONS", int) or DEFAULT_MAX_TURNS,
+    token_budget=_env_number("JUDGE_DEBATE_TOKEN_BUDGET", int),
+    time_budget=_env_number("JUDGE_DEBATE_TIME_BUDGET"),
+    cost_budget=_env_number("JUDGE_DEBATE_COST_BUDGET"),
+    # 與規則停止判斷相同：連續停滯 stall_rounds 回合才因增益過低而結束
+    low_gain_rounds=stop_checker.stall_rounds,
 )
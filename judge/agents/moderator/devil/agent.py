@@ -1,9 +1,11 @@
 from typing import List
 from pydantic import BaseModel, Field
-from google.adk.agents import LlmAgent, SequentialAgent
+from google.adk.agents import LlmAgent
 from google.genai import types
-from google.adk.tools.google_search_tool import GoogleSearchTool
 from judge.tools.evidence import Evidence
+from judge.tools.context import make_context_callback
+from judge.tools.search import search_tool
+from judge.agents.structured import StructuredToolAgent, structured_instruction
 
 
 class DevilOutput(BaseModel):
@@ -17,10 +19,11 @@ devil_tool_agent = LlmAgent(
     name="devil_tool_runner",
     model="gemini-2.5-flash",
     instruction=(
-        "你是 Devil 的工具執行者：在需要時使用 GoogleSearchTool 補充證據，"
+        "你是 Devil 的工具執行者：在需要時使用 search_web 工具補充證據，"
         "並把任何工具輸出（raw）寫入 state['devil_search_raw']。"
+        + structured_instruction(DevilOutput)
     ),
-    tools=[GoogleSearchTool()],
+    tools=[search_tool],
     output_key="devil_search_raw",
     generate_content_config=types.GenerateContentConfig(temperature=0.0),
 )
@@ -30,9 +33,11 @@ devil_schema_agent = LlmAgent(
     name="devil_schema_validator",
     model="gemini-2.5-flash",
     instruction=(
-        "根據 state['curation']、state['debate_messages'] 與可選的 state['devil_search_raw']，"
-        "輸出符合 DevilOutput schema 的嚴格 JSON（不要多餘文字）。"
+        "根據 state['curation']、辯論紀錄與可選的 state['devil_search_raw']，"
+        "輸出符合 DevilOutput schema 的嚴格 JSON（不要多餘文字）。\n"
+        "DEBATE:\n{debate_context_devil_schema_validator?}"
     ),
+    before_agent_callback=make_context_callback("devil_schema_validator"),
     output_schema=DevilOutput,
     disallow_transfer_to_parent=True,
     disallow_transfer_to_peers=True,
@@ -45,7 +50,7 @@ def _before_devil(agent_context=None, **_):
     return None
 
 
-devil_agent = SequentialAgent(
+devil_agent = StructuredToolAgent(
     name="devils_advocate",
     sub_agents=[devil_tool_agent, devil_schema_agent],
     before_agent_callback=_before_devil,
@@ -0,0 +1,179 @@
+"""依 ``next_decision`` 直接分派至辯手工具。
+
+`DirectExecutor` 取代執行者 LLM：後者只是把 ``state['next_decision'].next_speaker`` 對應到
+``call_advocate`` / ``call_skeptic`` / ``call_devil`` 並原樣回傳結果。它直接呼叫對應的
+AgentTool，並執行與 LLM 流程相同的 plugin 與 ``before/after_tool_callback`` 鏈，
+``log_tool_output``（及其 ``append_event``）照常觸發，記錄的函式呼叫/回應事件格式不變。
+
+它提供其他程式碼會用到的 LlmAgent 屬性（``tools``、``output_key``、``before_tool_callback``、
+``after_tool_callback`` 及對應的 ``canonical_*`` 列表），``bind_session`` 與量測不需修改。
+"""
+
+from __future__ import annotations
+
+import inspect
+import json
+from typing import Any, AsyncGenerator, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events.event import Event
+from google.adk.events.event_actions import EventActions
+from google.adk.flows.llm_flows.functions import generate_client_function_call_id
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+from pydantic import Field
+
+from .tools import LOG_MAP, speaker_of
+
+
+SPEAKER_TOOLS = {speaker: tool_name for tool_name, (speaker, _) in LOG_MAP.items()}
+
+
+def decided_speaker(state) -> Optional[str]:
+    """取出 next_decision.next_speaker，與 evaluate_stop 以相同方式正規化"""
+    return speaker_of(state.get("next_decision"))
+
+
+def decided_rationale(state) -> str:
+    decision = state.get("next_decision")
+    if isinstance(decision, dict):
+        return decision.get("rationale") or ""
+    return getattr(decision, "rationale", None) or ""
+
+
+def debater_request(speaker: str, rationale: str = "") -> dict:
+    """AgentTool 的呼叫參數（取代執行者 LLM 自行撰寫的 request）"""
+    request = f"請以 {speaker} 的角色，針對目前的辯論提出下一輪發言。"
+    if rationale:
+        request += f"主持人考量：{rationale}"
+    return {"request": request}
+
+
+def _canonical(callbacks) -> list:
+    if not callbacks:
+        return []
+    return callbacks if isinstance(callbacks, list) else [callbacks]
+
+
+async def run_before_tool_callbacks(ctx: InvocationContext, agent, tool, args: dict, tool_context: ToolContext):
+    """依 ADK 的順序執行 plugin 與代理的 before_tool 回呼，回傳覆寫的回應（若有）"""
+    response = await ctx.plugin_manager.run_before_tool_callback(
+        tool=tool, tool_args=args, tool_context=tool_context
+    )
+    if response is None:
+        for callback in agent.canonical_before_tool_callbacks:
+            response = callback(tool=tool, args=args, tool_context=tool_context)
+            if inspect.isawaitable(response):
+                response = await response
+            if response:
+                break
+    return response
+
+
+async def run_after_tool_callbacks(ctx: InvocationContext, agent, tool, args: dict, tool_context: ToolContext, result):
+    """依 ADK 的順序執行 plugin 與代理的 after_tool 回呼，回傳最終的工具回應"""
+    response = await ctx.plugin_manager.run_after_tool_callback(
+        tool=tool, tool_args=args, tool_context=tool_context, result=result
+    )
+    if response is None:
+        for callback in agent.canonical_after_tool_callbacks:
+            response = callback(tool=tool, args=args, tool_context=tool_context, tool_response=result)
+            if inspect.isawaitable(response):
+                response = await response
+            if response:
+                break
+    return result if response is None else response
+
+
+def output_text(result: Any) -> str:
+    return result if isinstance(result, str) else json.dumps(result, ensure_ascii=False, default=str)
+
+
+def function_call_event(ctx: InvocationContext, author: str, tool, args: dict, call_id: str) -> Event:
+    part = types.Part.from_function_call(name=tool.name, args=args)
+    part.function_call.id = call_id
+    return Event(
+        invocation_id=ctx.invocation_id,
+        author=author,
+        branch=ctx.branch,
+        content=types.Content(role="model", parts=[part]),
+    )
+
+
+def function_response_event(ctx: InvocationContext, author: str, tool, result, tool_context: ToolContext) -> Event:
+    """與 ADK 工具回應事件相同的格式：content 為 function_response，actions 攜帶 state 變更"""
+    response = result if isinstance(result, dict) else {"result": result}
+    part = types.Part.from_function_response(name=tool.name, response=response)
+    part.function_response.id = tool_context.function_call_id
+    return Event(
+        invocation_id=ctx.invocation_id,
+        author=author,
+        branch=ctx.branch,
+        content=types.Content(role="user", parts=[part]),
+        actions=tool_context.actions,
+    )
+
+
+def clear_output_event(ctx: InvocationContext, author: str, output_key: str) -> Event:
+    """結束辯論時清空執行者的 output_key"""
+    return Event(
+        invocation_id=ctx.invocation_id,
+        author=author,
+        branch=ctx.branch,
+        actions=EventActions(state_delta={output_key: ""}),
+    )
+
+
+class DirectExecutor(BaseAgent):
+    """不呼叫 LLM 的主持人執行者：依 next_speaker 直接呼叫對應的辯手工具"""
+
+    tools: list[Any] = Field(default_factory=list)
+    output_key: Optional[str] = None
+    before_tool_callback: Any = None
+    after_tool_callback: Any = None
+
+    @property
+    def canonical_before_tool_callbacks(self) -> list:
+        return _canonical(self.before_tool_callback)
+
+    @property
+    def canonical_after_tool_callbacks(self) -> list:
+        return _canonical(self.after_tool_callback)
+
+    def tool_for(self, speaker: Optional[str]):
+        name = SPEAKER_TOOLS.get(speaker or "")
+        return next((t for t in self.tools if getattr(t, "name", None) == name), None)
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        speaker = decided_speaker(ctx.session.state)
+        tool = self.tool_for(speaker)
+        if tool is None:
+            # 'end' 或無法對應的決策：與執行者 LLM 相同，不呼叫任何工具並輸出空字串，
+            # 避免 output_key 留著上一輪辯手的輸出
+            if self.output_key:
+                yield clear_output_event(ctx, self.name, self.output_key)
+            return
+        args = debater_request(speaker, decided_rationale(ctx.session.state))
+        call_id = generate_client_function_call_id()
+        yield function_call_event(ctx, self.name, tool, args, call_id)
+
+        tool_context = ToolContext(ctx, function_call_id=call_id)
+        result = await run_before_tool_callbacks(ctx, self, tool, args, tool_context)
+        if result is None:
+            result = await tool.run_async(args=args, tool_context=tool_context)
+        result = await run_after_tool_callbacks(ctx, self, tool, args, tool_context, result)
+        if self.output_key:
+            tool_context.state[self.output_key] = output_text(result)
+        yield function_response_event(ctx, self.name, tool, result, tool_context)
+
+
+__all__ = [
+    "DirectExecutor",
+    "SPEAKER_TOOLS",
+    "clear_output_event",
+    "debater_request",
+    "decided_speaker",
+    "run_after_tool_callbacks",
+    "run_before_tool_callbacks",
+]
@@ -1,10 +1,11 @@
 from typing import List
 from pydantic import BaseModel, Field
 
-from google.adk.agents import LlmAgent, SequentialAgent
+from google.adk.agents import LlmAgent
 from google.genai import types
-from google.adk.tools.google_search_tool import GoogleSearchTool
 from judge.tools.evidence import Evidence
+from judge.tools.search import search_tool
+from judge.agents.structured import StructuredToolAgent, structured_instruction
 
 
 class CuratorSearchResult(BaseModel):
@@ -36,10 +37,11 @@ skeptic_tool_agent = LlmAgent(
     name="skeptic_tool_runner",
     model="gemini-2.5-flash",
     instruction=(
-        "你是 Skeptic 的工具執行者：在需要時使用 GoogleSearchTool 搜尋反證，"
+        "你是 Skeptic 的工具執行者：在需要時使用 search_web 工具搜尋反證，"
         "並把工具輸出寫入 state['skeptic_search_raw']。"
+        + structured_instruction(SkepticOutput)
     ),
-    tools=[GoogleSearchTool()],
+    tools=[search_tool],
     output_key="skeptic_search_raw",
 )
 
@@ -58,7 +60,7 @@ skeptic_schema_agent = LlmAgent(
     generate_content_config=types.GenerateContentConfig(temperature=0.0),
 )
 
-skeptic_agent = SequentialAgent(
+skeptic_agent = StructuredToolAgent(
     name="skeptic",
     sub_agents=[skeptic_tool_agent, skeptic_schema_agent],
 )
@@ -0,0 +1,169 @@
+"""主持人迴圈的推測式辯手回合。
+
+`SpeculativeOrchestrator` 取代「先決策、再執行」的 SequentialAgent
+（``sub_agents = [decision_agent, executor_agent]``）。決策代理執行期間，最可能的下一位
+辯手已在複製的 session state 上透過其 AgentTool 先行執行，state 變更彼此隔離。取得
+``next_decision`` 後：
+
+- 命中：提交對應的推測結果，套用其 state 變更，並如同執行者實際呼叫工具般觸發執行者的
+  after_tool 回呼（``log_tool_output``，見 `.dispatch`）
+- 未命中：取消推測執行，由執行者照常執行
+- ``end``：取消推測執行，不再執行其他代理，並清空執行者的 ``output_key``
+
+推測執行時主持人的 rationale 尚未產生，因此只比對發言者：命中時刻意沿用未附 rationale
+的發言，記錄的工具呼叫參數也是推測時實際使用的 request，而非附上 rationale 的版本；
+需要辯手參考 rationale 時請關閉推測（JUDGE_SPECULATIVE=0）。
+
+預測依此 orchestrator 目前觀察到的發言轉移次數，沒有資料時依固定順序。命中/未命中/
+浪費次數寫入 ``state['speculation_stats']``。
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter, defaultdict
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events.event import Event
+from google.adk.events.event_actions import EventActions
+from google.adk.flows.llm_flows.functions import generate_client_function_call_id
+from google.adk.tools.tool_context import ToolContext
+from google.adk.utils.context_utils import Aclosing
+from pydantic import PrivateAttr
+
+from .dispatch import (
+    SPEAKER_TOOLS,
+    clear_output_event,
+    debater_request,
+    decided_speaker,
+    function_call_event,
+    function_response_event,
+    output_text,
+    run_after_tool_callbacks,
+)
+
+
+# 沒有觀察資料時，各發言者之後最可能的發言順序（正反交替，極端質疑者穿插）
+DEFAULT_SUCCESSORS: dict[Optional[str], tuple[str, ...]] = {
+    None: ("advocate", "skeptic", "devil"),
+    "advocate": ("skeptic", "devil", "advocate"),
+    "skeptic": ("advocate", "devil", "skeptic"),
+    "devil": ("advocate", "skeptic", "devil"),
+}
+
+def _last_speaker(state) -> Optional[str]:
+    messages = state.get("debate_messages") or []
+    last = messages[-1] if messages else None
+    return last.get("speaker") if isinstance(last, dict) else None
+
+
+def _fork(ctx: InvocationContext) -> InvocationContext:
+    """複製 InvocationContext 與頂層 state，推測執行寫入的鍵不會影響原 Session"""
+    session = ctx.session.model_copy(update={"state": dict(ctx.session.state)})
+    return ctx.model_copy(update={"session": session})
+
+
+class SpeculativeOrchestrator(BaseAgent):
+    """sub_agents = [decision_agent, executor_agent]；決策期間預先執行可能的下一位辯手"""
+
+    width: int = 1
+    """每回合推測執行的辯手數。"""
+
+    _transitions: "defaultdict[Optional[str], Counter]" = PrivateAttr(
+        default_factory=lambda: defaultdict(Counter)
+    )
+
+    def predict(self, state) -> list[str]:
+        """依已觀察的發言轉移次數排序候選者，未出現過的依預設順序補上"""
+        last = _last_speaker(state)
+        observed = [speaker for speaker, _ in self._transitions[last].most_common()]
+        ordered = observed + [s for s in DEFAULT_SUCCESSORS.get(last, DEFAULT_SUCCESSORS[None]) if s not in observed]
+        return [s for s in ordered if s in SPEAKER_TOOLS][: self.width]
+
+    def _tool(self, speaker: str):
+        executor = self.sub_agents[1]
+        name = SPEAKER_TOOLS[speaker]
+        return next(t for t in executor.tools if getattr(t, "name", None) == name)
+
+    async def _speculate(self, ctx: InvocationContext, speaker: str) -> tuple[dict, object, ToolContext]:
+        """以不含 rationale 的 request 推測執行；命中時沿用此結果與參數，不再附上 rationale 重新呼叫"""
+        tool = self._tool(speaker)
+        args = debater_request(speaker)
+        tool_context = ToolContext(_fork(ctx))
+        result = await tool.run_async(args=args, tool_context=tool_context)
+        return args, result, tool_context
+
+    async def _commit(
+        self, ctx: InvocationContext, speaker: str, args: dict, result, spec_context: ToolContext
+    ) -> AsyncGenerator[Event, None]:
+        """套用推測執行的 state 變更並觸發執行者的 after_tool 回呼，事件格式與實際呼叫工具相同"""
+        executor = self.sub_agents[1]
+        tool = self._tool(speaker)
+        call_id = generate_client_function_call_id()
+        yield function_call_event(ctx, executor.name, tool, args, call_id)
+        tool_context = ToolContext(ctx, function_call_id=call_id)
+        tool_context.state.update(spec_context.actions.state_delta)
+        result = await run_after_tool_callbacks(ctx, executor, tool, args, tool_context, result)
+        if executor.output_key:
+            tool_context.state[executor.output_key] = output_text(result)
+        yield function_response_event(ctx, executor.name, tool, result, tool_context)
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        decision_agent, executor = self.sub_agents[0], self.sub_agents[1]
+        last = _last_speaker(ctx.session.state)
+        candidates = self.predict(ctx.session.state)
+        tasks = {speaker: asyncio.create_task(self._speculate(ctx, speaker)) for speaker in candidates}
+        for task in tasks.values():
+            # 被捨棄的推測執行若已失敗，避免 "exception was never retrieved" 警告
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+        try:
+            async with Aclosing(decision_agent.run_async(ctx)) as agen:
+                async for event in agen:
+                    yield event
+
+            speaker = decided_speaker(ctx.session.state)
+            if speaker in SPEAKER_TOOLS:
+                self._transitions[last][speaker] += 1
+            hit = tasks.pop(speaker, None) if speaker else None
+            committed = None
+            if hit is not None:
+                try:
+                    committed = await hit
+                except Exception:
+                    # 推測執行失敗時改走一般流程
+                    committed = None
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+        stats = dict(ctx.session.state.get("speculation_stats") or {})
+        stats["turns"] = stats.get("turns", 0) + 1
+        stats["speculated"] = stats.get("speculated", 0) + len(candidates)
+        stats["hits"] = stats.get("hits", 0) + (committed is not None)
+        stats["misses"] = stats.get("misses", 0) + (speaker in SPEAKER_TOOLS and committed is None)
+        stats["wasted"] = stats.get("wasted", 0) + len(candidates) - (committed is not None)
+        stats["hit_rate"] = stats["hits"] / stats["turns"]
+        stats["last"] = {"predicted": candidates, "decided": speaker}
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={"speculation_stats": stats}),
+        )
+
+        if committed is not None:
+            async with Aclosing(self._commit(ctx, speaker, *committed)) as agen:
+                async for event in agen:
+                    yield event
+        elif speaker != "end":
+            async with Aclosing(executor.run_async(ctx)) as agen:
+                async for event in agen:
+                    yield event
+        elif executor.output_key:
+            yield clear_output_event(ctx, executor.name, executor.output_key)
+
+
+__all__ = ["SpeculativeOrchestrator", "DEFAULT_SUCCESSORS"]
@@ -6,6 +6,9 @@ from google.adk.tools.agent_tool import AgentTool
 
 from google.adk.events.event import Event
 from google.adk.events.event_actions import EventActions
+from judge.tools.debate_log import DEBATE_DELTA_KEY, has_confidence, make_debate_delta
+from judge.tools.evidence import record_evidence, unique_evidence_count
+from judge.tools.novelty import update_novelty
 from .advocate import advocate_agent
 from .skeptic import skeptic_agent
 from .devil import devil_agent
@@ -36,19 +39,96 @@ def update_metrics(state):
     state["delta_credibility"] = curr_cred - prev_cred
     state["prev_credibility"] = curr_cred
 
+    # 以相異來源數計算新證據，重複引用同一網址不算增益
     prev_ev = state.get("prev_evidence_count", 0)
-    curr_ev = len(state.get("evidence", []))
+    curr_ev = unique_evidence_count(state)
     state["new_evidence_gain"] = curr_ev - prev_ev
     state["prev_evidence_count"] = curr_ev
 
 
+# 規則式停止判斷的預設值
+DEFAULT_MAX_TURNS = 8
+DEFAULT_STALL_ROUNDS = 2
+# 最近一輪發言的新穎度低於此值時視為重述先前論點（見 judge.tools.novelty）
+DEFAULT_MIN_NOVELTY = 0.3
+
+
+def is_repetitive(state, min_novelty: float = DEFAULT_MIN_NOVELTY) -> bool:
+    # 沒有論點的發言（novelty_score 為 None）無從判斷，不算重述
+    novelty = state.get("novelty_score")
+    return isinstance(novelty, (int, float)) and novelty < min_novelty
+
+
 def should_stop(state) -> bool:
     return (
         state.get("delta_dispute_points", 0) <= 0
         or state.get("delta_credibility", 0) <= 0
         or state.get("new_evidence_gain", 0) <= 0
+        or is_repetitive(state)
     )
 
+_METRIC_KEYS = (
+    "dispute_points",
+    "credibility",
+    "evidence",
+    "evidence_store",
+    "prev_dispute_points",
+    "prev_credibility",
+    "prev_evidence_count",
+)
+
+
+def speaker_of(decision) -> str | None:
+    """取出決策的 next_speaker 並正規化（容許大小寫與空白差異），執行者與停止判斷共用"""
+    if isinstance(decision, dict):
+        speaker = decision.get("next_speaker")
+    else:
+        speaker = getattr(decision, "next_speaker", None)
+    return speaker.strip().lower() if isinstance(speaker, str) else None
+
+
+def evaluate_stop(
+    state,
+    max_turns: int = DEFAULT_MAX_TURNS,
+    stall_rounds: int = DEFAULT_STALL_ROUNDS,
+    min_novelty: float = DEFAULT_MIN_NOVELTY,
+):
+    """以 update_metrics 的指標差值、發言新穎度與回合上限判斷是否結束辯論
+
+    最近一輪發言多為重述先前論點（novelty_score < min_novelty）時，即使指標仍有
+    增益也算停滯回合，避免再花一次 LLM 備援判斷。
+
+    不直接修改 state，回傳 (verdict, reason, updates)：
+    - verdict："stop"、"continue" 或 "ambiguous"（僅部分指標停滯，交由 LLM 判斷）
+    - updates：應寫回 state 的指標差值與停滯回合數
+    """
+    scratch = {k: state.get(k) for k in _METRIC_KEYS if state.get(k) is not None}
+    update_metrics(scratch)
+    updates = {k: v for k, v in scratch.items() if k not in ("dispute_points", "credibility", "evidence", "evidence_store")}
+
+    gains = [scratch["delta_dispute_points"], scratch["new_evidence_gain"]]
+    # 辯手輸出多半沒有 confidence，沒有信心值時可信度差值恆為 0，不納入判斷
+    if has_confidence(state):
+        gains.append(scratch["delta_credibility"])
+    repetitive = is_repetitive(state, min_novelty)
+    stalled = all(g <= 0 for g in gains) or repetitive
+    stall_count = (state.get("stall_rounds", 0) + 1) if stalled else 0
+    updates["stall_rounds"] = stall_count
+
+    turns = len(state.get("debate_messages") or [])
+    limit = state.get("max_turns") or max_turns
+    if speaker_of(state.get("next_decision")) == "end":
+        return "stop", "decision_end", updates
+    if turns >= limit:
+        return "stop", "max_turns", updates
+    if stall_count >= stall_rounds:
+        return "stop", "repetitive" if repetitive else "stalled", updates
+    if stalled:
+        return "continue", "stall_pending", updates
+    if all(g > 0 for g in gains):
+        return "continue", "progress", updates
+    return "ambiguous", "partial_progress", updates
+
 
 def ensure_debate_messages(callback_context=None, **_):
     if callback_context is None:
@@ -114,12 +194,19 @@ async def log_tool_output(tool, args=None, tool_context=None, tool_response=None
         # Create a human-friendly summary for content
         content_text = _summarize_payload(payload, speaker)
 
-        st["debate_messages"].append({
+        message = {
             "speaker": speaker,
             "content": content_text,
             "claim": claim,
             "data": payload,
-        })
+        }
+        st["debate_messages"].append(message)
+        if isinstance(payload, dict) and payload.get("evidence"):
+            record_evidence(st, payload["evidence"], speaker)
+        novelty = update_novelty(st)
+        # 僅附上本回合新增的訊息與其序號，避免事件大小隨回合數成長
+        seq = len(st["debate_messages"]) - 1
+        delta = make_debate_delta(seq, [message], payload_key=key)
         if append_event is not None:
             try:
                 await append_event(
@@ -128,13 +215,20 @@ async def log_tool_output(tool, args=None, tool_context=None, tool_response=None
                         actions=EventActions(
                             state_delta={
                                 key: payload,
-                                "debate_messages": st.get("debate_messages"),
+                                DEBATE_DELTA_KEY: delta,
+                                "novelty_score": novelty.get("score"),
+                                "novelty": novelty,
                             }
                         ),
                     )
                 )
             except Exception:
                 pass
+        elif tool_context is not None:
+            # 未綁定 Session 時（如批次執行），改由 Runner 記錄的工具回應事件攜帶增量；
+            # 負載一併寫入 payload_key，重建回合時才取得 confidence 與 evidence
+            st[key] = payload
+            st[DEBATE_DELTA_KEY] = delta
     return response
 
 
@@ -0,0 +1,236 @@
+"""依相依關係排程的 pipeline。
+
+`DagPipelineAgent` 保留 SequentialAgent 的宣告順序，但依各階段讀寫的 state 鍵推導出 DAG：
+
+- 寫入：階段代理樹中（含以 AgentTool 包裝的代理）的每個 ``output_key``，以及 ``extra_writes`` 宣告的鍵
+- 讀取：指令中的 ``{placeholder}`` 與 ``state['key']``，以及 ``extra_reads`` 宣告的鍵
+
+後面的階段只在與前面的階段存取同一個鍵（讀後寫、寫後讀或寫後寫）時等待，其餘並行執行。
+寫入 ``state['pipeline_skip']``（階段名稱列表）的階段會擋住其後所有階段，就緒時列於其中的
+階段直接視為完成而不執行。階段啟動時，若仍有與其無先後關係的階段尚未完成（兩者可能重疊），
+就如 ParallelAgent 般在獨立的 branch 上執行，並行的 LLM 階段互不看見彼此的對話；無先後關係
+但已完成的階段不影響判斷，例如 Historian 早於 Jury 結束時，Jury 仍看得到完整的辯論紀錄。
+結束時將各階段耗時、略過的階段與關鍵路徑寫入 ``state['pipeline_timing']``。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events.event import Event
+from google.adk.events.event_actions import EventActions
+from google.adk.tools.agent_tool import AgentTool
+from google.adk.utils.context_utils import Aclosing
+from pydantic import Field
+
+
+_PLACEHOLDER_RE = re.compile(r"{+([^{}]*)}+")
+_STATE_REF_RE = re.compile(r"state\[['\"]([A-Za-z_][\w:]*)['\"]\]")
+_IDENTIFIER_RE = re.compile(r"^(?:app:|user:|temp:)?[A-Za-z_]\w*$")
+_STAGE_DONE = object()
+
+# 階段可寫入此鍵（階段名稱列表）以略過後續階段，例如分流的快速通道
+SKIP_KEY = "pipeline_skip"
+
+
+def _instruction_reads(instruction) -> set[str]:
+    if not isinstance(instruction, str):
+        return set()
+    reads = set(_STATE_REF_RE.findall(instruction))
+    for raw in _PLACEHOLDER_RE.findall(instruction):
+        key = raw.strip().removesuffix("?")
+        if _IDENTIFIER_RE.match(key):
+            reads.add(key)
+    return reads
+
+
+def agent_state_io(agent: BaseAgent) -> tuple[set[str], set[str]]:
+    """走訪代理樹，回傳 (讀取的 state 鍵, 寫入的 state 鍵)"""
+    reads: set[str] = set()
+    writes: set[str] = set()
+    stack = [agent]
+    seen: set[int] = set()
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        if isinstance(current, LlmAgent):
+            reads |= _instruction_reads(current.instruction)
+        if getattr(current, "output_key", None):
+            writes.add(current.output_key)
+        stack.extend(t.agent for t in getattr(current, "tools", None) or [] if isinstance(t, AgentTool))
+        stack.extend(current.sub_agents)
+    return reads, writes
+
+
+class DagPipelineAgent(BaseAgent):
+    """依 state 讀寫關係排程的 pipeline，互不相依的階段會並行執行"""
+
+    flatten: list[str] = Field(default_factory=list)
+    """其子代理個別排程的 SequentialAgent 階段名稱。"""
+
+    extra_reads: dict[str, list[str]] = Field(default_factory=dict)
+    """階段在指令以外（如回呼中）讀取的 state 鍵。"""
+
+    extra_writes: dict[str, list[str]] = Field(default_factory=dict)
+    """階段在 ``output_key`` 以外（如回呼中）寫入的 state 鍵。"""
+
+    def stages(self) -> list[BaseAgent]:
+        stages: list[BaseAgent] = []
+        for agent in self.sub_agents:
+            if agent.name in self.flatten:
+                stages.extend(agent.sub_agents)
+            else:
+                stages.append(agent)
+        return stages
+
+    def dependencies(self) -> dict[str, list[str]]:
+        """每個階段需等待的前置階段（僅依宣告順序向前找）"""
+        stages = self.stages()
+        io = []
+        for stage in stages:
+            reads, writes = agent_state_io(stage)
+            reads |= set(self.extra_reads.get(stage.name, []))
+            writes |= set(self.extra_writes.get(stage.name, []))
+            io.append((reads, writes))
+        deps: dict[str, list[str]] = {}
+        for j, stage in enumerate(stages):
+            reads_j, writes_j = io[j]
+            deps[stage.name] = [
+                stages[i].name
+                for i in range(j)
+                if reads_j & io[i][1] or writes_j & io[i][0] or writes_j & io[i][1] or SKIP_KEY in io[i][1]
+            ]
+        return deps
+
+    @staticmethod
+    def unordered_stages(deps: dict[str, list[str]]) -> dict[str, set[str]]:
+        """每個階段與哪些階段沒有直接或間接相依（兩者的先後由排程決定，可能重疊）"""
+        ancestors: dict[str, set[str]] = {}
+        for name, direct in deps.items():
+            ancestors[name] = set(direct).union(*(ancestors[d] for d in direct))
+        return {
+            a: {b for b in deps if a != b and a not in ancestors[b] and b not in ancestors[a]}
+            for a in deps
+        }
+
+    def _branch_ctx(self, stage: BaseAgent, ctx: InvocationContext) -> InvocationContext:
+        """與 ParallelAgent 相同：為並行的階段建立獨立的 branch"""
+        branch_ctx = ctx.model_copy()
+        suffix = f"{self.name}.{stage.name}"
+        branch_ctx.branch = f"{ctx.branch}.{suffix}" if ctx.branch else suffix
+        return branch_ctx
+
+    @staticmethod
+    def _timing_report(deps: dict[str, list[str]], spans: dict[str, tuple[float, float]], origin: float) -> dict:
+        durations = {name: end - start for name, (start, end) in spans.items()}
+        # 依相依關係計算最長路徑（各階段耗時為權重）
+        finish: dict[str, float] = {}
+        previous: dict[str, str | None] = {}
+        for name in deps:
+            if name not in durations:
+                continue
+            best, best_dep = 0.0, None
+            for dep in deps[name]:
+                if finish.get(dep, 0.0) > best:
+                    best, best_dep = finish[dep], dep
+            finish[name] = best + durations[name]
+            previous[name] = best_dep
+        path: list[str] = []
+        node = max(finish, key=finish.get) if finish else None
+        while node is not None:
+            path.append(node)
+            node = previous[node]
+        return {
+            "stages": {
+                name: {
+                    "start": spans[name][0] - origin,
+                    "end": spans[name][1] - origin,
+                    "duration": durations[name],
+                    "depends_on": deps[name],
+                }
+                for name in deps
+                if name in spans
+            },
+            "critical_path": list(reversed(path)),
+            "critical_path_seconds": max(finish.values()) if finish else 0.0,
+            "sequential_seconds": sum(durations.values()),
+            "wall_seconds": time.perf_counter() - origin,
+        }
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        stages = self.stages()
+        deps = self.dependencies()
+        unordered = self.unordered_stages(deps)
+        queue: asyncio.Queue = asyncio.Queue()
+        pending = list(stages)
+        running: dict[str, asyncio.Task] = {}
+        finished: set[str] = set()
+        skipped: list[str] = []
+        spans: dict[str, tuple[float, float]] = {}
+        origin = time.perf_counter()
+
+        async def run_stage(stage: BaseAgent, stage_ctx: InvocationContext) -> None:
+            start = time.perf_counter()
+            try:
+                async with Aclosing(stage.run_async(stage_ctx)) as agen:
+                    async for event in agen:
+                        resume = asyncio.Event()
+                        await queue.put((stage.name, event, resume))
+                        # 等待上游處理（寫入 Session）後再繼續產生事件
+                        await resume.wait()
+            finally:
+                spans[stage.name] = (start, time.perf_counter())
+                await queue.put((stage.name, _STAGE_DONE, None))
+
+        def launch_ready() -> None:
+            launched = True
+            while launched:
+                launched = False
+                skip = set(ctx.session.state.get(SKIP_KEY) or ())
+                for stage in list(pending):
+                    if all(dep in finished for dep in deps[stage.name]):
+                        pending.remove(stage)
+                        if stage.name in skip:
+                            # 略過的階段視為已完成，可能讓其他階段就緒
+                            skipped.append(stage.name)
+                            finished.add(stage.name)
+                            launched = True
+                        else:
+                            # 仍有無先後關係的階段未完成時可能重疊，改在獨立的 branch 上執行
+                            overlapping = unordered[stage.name] - finished
+                            stage_ctx = self._branch_ctx(stage, ctx) if overlapping else ctx
+                            running[stage.name] = asyncio.create_task(run_stage(stage, stage_ctx))
+
+        launch_ready()
+        try:
+            while running:
+                name, event, resume = await queue.get()
+                if event is _STAGE_DONE:
+                    await running.pop(name)
+                    finished.add(name)
+                    launch_ready()
+                    continue
+                yield event
+                resume.set()
+        finally:
+            for task in running.values():
+                task.cancel()
+
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(
+                state_delta={"pipeline_timing": {**self._timing_report(deps, spans, origin), "skipped": skipped}}
+            ),
+        )
+
+
+__all__ = ["DagPipelineAgent", "agent_state_io"]
@@ -1,5 +1,7 @@
-"""Social 模組：模擬社群擴散"""
+"""Social 模組：模擬社群擴散（代理於第一次存取時建構）"""
 
-from .agent import social_summary_agent
+from judge._lazy import lazy_exports
 
 __all__ = ["social_summary_agent"]
+
+__getattr__, __dir__ = lazy_exports(__name__, {"social_summary_agent": ".agent:social_summary_agent"})
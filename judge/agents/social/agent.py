@@ -1,9 +1,5 @@
 from pydantic import BaseModel, Field
 
-from google.adk.agents import LlmAgent, SequentialAgent
-
-from .base import create_social_agent
-
 
 # ==== 社群擴散紀錄 Schema ====
 class SocialLog(BaseModel):
@@ -16,31 +12,47 @@ class SocialLog(BaseModel):
     manipulation_risk: float = Field(description="0 到 1 之間的操弄風險")
 
 
-# ==== 建立平行角色流程 ====
-_social_parallel = create_social_agent(influencer_count=1, include_noise=False)
-
-# 聚合社群輸出為 SocialLog JSON
-_social_aggregator = LlmAgent(
-    name="social_aggregator",
-    model="gemini-2.5-flash",
-    instruction=(
-        "你是社群紀錄者，請依序讀取以下輸出並統整成 JSON。\n"
-        "- Echo Chamber: {echo_chamber}\n"
-        "- Influencer: {influencer}\n"
-        "- Disrupter: {social_noise}\n"
-        "請根據上述內容計算以下指標：\n"
-        "polarization_index、virality_score、manipulation_risk，數值介於 0 到 1。\n"
-        "僅輸出符合 SocialLog schema 的 JSON。"
-    ),
-    output_schema=SocialLog,
-    # 禁止傳遞以符合 output_schema 規定
-    disallow_transfer_to_parent=True,
-    disallow_transfer_to_peers=True,
-    output_key="social_log",
-)
-
-# 公開的 social_summary_agent，先平行模擬，再聚合結果
-social_summary_agent = SequentialAgent(
-    name="social_summary",
-    sub_agents=[_social_parallel, _social_aggregator],
-)
+def build_social_summary_agent():
+    """建立 social_summary_agent：先平行模擬，再聚合結果"""
+    from google.adk.agents import LlmAgent, SequentialAgent
+
+    from .base import create_social_agent
+
+    # ==== 建立平行角色流程 ====
+    social_parallel = create_social_agent(influencer_count=1, include_noise=False)
+
+    # 聚合社群輸出為 SocialLog JSON
+    social_aggregator = LlmAgent(
+        name="social_aggregator",
+        model="gemini-2.5-flash",
+        instruction=(
+            "你是社群紀錄者，請依序讀取以下輸出並統整成 JSON。\n"
+            "- Echo Chamber: {echo_chamber}\n"
+            "- Influencer: {influencer}\n"
+            "- Disrupter: {social_noise}\n"
+            "請根據上述內容計算以下指標：\n"
+            "polarization_index、virality_score、manipulation_risk，數值介於 0 到 1。\n"
+            "僅輸出符合 SocialLog schema 的 JSON。"
+        ),
+        output_schema=SocialLog,
+        # 禁止傳遞以符合 output_schema 規定
+        disallow_transfer_to_parent=True,
+        disallow_transfer_to_peers=True,
+        output_key="social_log",
+    )
+
+    return SequentialAgent(
+        name="social_summary",
+        sub_agents=[social_parallel, social_aggregator],
+    )
+
+
+def __getattr__(name: str):
+    # 公開的 social_summary_agent 於第一次存取時建構並快取
+    if name == "social_summary_agent":
+        agent = globals()[name] = build_social_summary_agent()
+        return agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["SocialLog", "build_social_summary_agent", "social_summary_agent"]
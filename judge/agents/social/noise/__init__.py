@@ -1,4 +1,5 @@
-from .agent import social_noise_agent
+from judge._lazy import lazy_exports
 
 __all__ = ["social_noise_agent"]
 
+__getattr__, __dir__ = lazy_exports(__name__, {"social_noise_agent": ".agent:social_noise_agent"})
@@ -0,0 +1,140 @@
+"""辯手、Curator 與 Evidence 角色的工具執行 + 本地 schema 驗證。
+
+各角色原本先執行呼叫工具的 ``LlmAgent``，再由只負責把原始文字整理為 JSON 的
+``*_schema_validator`` ``LlmAgent`` 轉換格式。`StructuredToolAgent` 要求工具執行者
+直接以 schema 回答，在本地以 pydantic 驗證，只有本地驗證失敗時才呼叫驗證者（改為修復步驟）。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from typing import AsyncGenerator, Optional, Type
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events.event import Event
+from google.adk.events.event_actions import EventActions
+from google.adk.utils.context_utils import Aclosing
+from google.genai import types
+from pydantic import BaseModel, ValidationError
+
+
+# 設定 JUDGE_STRUCTURED_MODE=sequential 可回到「工具執行 → schema 驗證」兩段式呼叫
+COMBINED_BY_DEFAULT = os.getenv("JUDGE_STRUCTURED_MODE", "combined") != "sequential"
+
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+# 全程序累計：本地驗證成功次數即為省下的模型往返次數；sequential 模式不做本地驗證，另計
+_STATS: dict[str, dict[str, int]] = {}
+_OUTCOMES = ("local", "repaired", "sequential")
+
+
+def structured_instruction(schema: Type[BaseModel]) -> str:
+    """產生要求工具執行者直接輸出 schema JSON 的指令段落"""
+    spec = json.dumps(schema.model_json_schema(), ensure_ascii=False, separators=(",", ":"))
+    return (
+        f"\n完成後，最後一則回覆請直接輸出符合 {schema.__name__} 的 JSON（不要多餘文字），"
+        f"JSON Schema：{spec}"
+    )
+
+
+def parse_structured(raw, schema: Type[BaseModel]) -> Optional[BaseModel]:
+    """嘗試在本地將工具執行者的輸出驗證為 schema，失敗回傳 None"""
+    if raw is None:
+        return None
+    if isinstance(raw, BaseModel):
+        raw = raw.model_dump()
+    if isinstance(raw, dict):
+        try:
+            return schema.model_validate(raw)
+        except ValidationError:
+            return None
+    text = str(raw).strip()
+    candidates = [m.strip() for m in _FENCE_RE.findall(text)] + [text]
+    start, end = text.find("{"), text.rfind("}")
+    if 0 <= start < end:
+        candidates.append(text[start : end + 1])
+    for candidate in candidates:
+        try:
+            return schema.model_validate_json(candidate)
+        except ValidationError:
+            continue
+    return None
+
+
+def structured_output_stats() -> dict:
+    """回傳各代理本地驗證成功/LLM 修復/sequential 模式的次數與省下的往返次數"""
+    per_agent = {name: dict(counts) for name, counts in _STATS.items()}
+    totals = {o: sum(c.get(o, 0) for c in per_agent.values()) for o in _OUTCOMES}
+    return {"agents": per_agent, **totals, "saved_round_trips": totals["local"]}
+
+
+class StructuredToolAgent(BaseAgent):
+    """sub_agents = [tool_runner, schema_validator]
+
+    combined 模式下 tool_runner 的最終輸出若可通過 schema_validator 的
+    output_schema 驗證，直接寫入其 output_key；否則才執行 schema_validator 修復。
+    """
+
+    combined: bool = COMBINED_BY_DEFAULT
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        tool_agent, repair_agent = self.sub_agents
+        async with Aclosing(tool_agent.run_async(ctx)) as agen:
+            async for event in agen:
+                yield event
+
+        parsed = None
+        if self.combined:
+            parsed = parse_structured(
+                ctx.session.state.get(tool_agent.output_key), repair_agent.output_schema
+            )
+
+        # 只有實際做過本地驗證時才區分成功與修復
+        if not self.combined:
+            outcome = "sequential"
+        else:
+            outcome = "local" if parsed is not None else "repaired"
+        counts = _STATS.setdefault(self.name, dict.fromkeys(_OUTCOMES, 0))
+        counts[outcome] += 1
+        stats = dict(ctx.session.state.get("structured_output_stats") or {})
+        agent_stats = {**dict.fromkeys(_OUTCOMES, 0), **(stats.get(self.name) or {})}
+        agent_stats[outcome] += 1
+        stats[self.name] = agent_stats
+
+        if parsed is None:
+            yield Event(
+                invocation_id=ctx.invocation_id,
+                author=self.name,
+                branch=ctx.branch,
+                actions=EventActions(state_delta={"structured_output_stats": stats}),
+            )
+            async with Aclosing(repair_agent.run_async(ctx)) as agen:
+                async for event in agen:
+                    yield event
+            return
+
+        # 與 LlmAgent 的 output_schema 行為一致：存入 model_dump(exclude_none=True)
+        data = parsed.model_dump(exclude_none=True)
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(
+                role="model",
+                parts=[types.Part(text=json.dumps(data, ensure_ascii=False))],
+            ),
+            actions=EventActions(
+                state_delta={repair_agent.output_key: data, "structured_output_stats": stats}
+            ),
+        )
+
+
+__all__ = [
+    "StructuredToolAgent",
+    "parse_structured",
+    "structured_instruction",
+    "structured_output_stats",
+]
@@ -0,0 +1,311 @@
+"""批次查核：以有限並行度對 JSONL 中的多筆主張執行 root_agent。
+
+每筆主張使用獨立 Session；依模型以 token bucket 限速，失敗時指數退避重試。
+結果於每筆完成時即寫入輸出 JSONL（寫出後即刪除該 Session，每次失敗的嘗試亦同），輸出檔同時作為檢查點：重新執行時會略過
+已成功的主張，因此中斷後可直接續跑。每筆結果另含 metrics（各階段耗時、token、
+停止原因等），供 python -m judge.evaluation 比較不同設定。
+
+輸入每行格式：{"id": "...", "claim": "..."}（id 可省略，預設為行號）
+
+指定 --reuse-near-duplicates 時，與先前查核過的主張（近似重複索引）相似度達
+門檻、否定用語與數字皆相同且結果快取仍有其結果的主張，直接沿用先前的結果而不執行
+pipeline。
+
+    python -m judge.batch claims.jsonl results.jsonl --concurrency 8 --rpm 120
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.runners import Runner
+from google.adk.sessions.base_session_service import BaseSessionService
+from google.genai import types
+
+from judge.evaluation.records import state_metrics
+from judge.tools import clear_turn_index, export_debate_log
+from judge.tools.file_io import ensure_parent_dir
+from judge.tools.near_duplicate import DEFAULT_REUSE_THRESHOLD, near_duplicate_index, reuse_compatible
+from judge.tools.result_cache import result_cache
+from judge.tools.session_service import session_service
+
+
+APP_NAME = "agent_judge"
+
+
+class TokenBucket:
+    """非同步 token bucket：rate 為每秒補充數量，capacity 為可累積的突發量"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+class RateLimitPlugin(BasePlugin):
+    """在每次模型呼叫前依模型名稱取得 token，達成逐模型限速"""
+
+    def __init__(self, requests_per_minute: float, burst: Optional[float] = None) -> None:
+        super().__init__(name="rate_limit")
+        self.rate = requests_per_minute / 60.0
+        self.burst = burst
+        self._buckets: dict[str, TokenBucket] = {}
+
+    async def before_model_callback(
+        self, *, callback_context: CallbackContext, llm_request: LlmRequest
+    ):
+        model = llm_request.model or "default"
+        bucket = self._buckets.get(model)
+        if bucket is None:
+            bucket = self._buckets[model] = TokenBucket(self.rate, self.burst)
+        await bucket.acquire()
+        return None
+
+
+def load_claims(path: str) -> list[dict]:
+    claims = []
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            if isinstance(item, str):
+                item = {"claim": item}
+            item.setdefault("id", str(lineno))
+            item["id"] = str(item["id"])
+            claims.append(item)
+    return claims
+
+
+def completed_ids(path: str) -> set[str]:
+    """讀取既有輸出作為檢查點，回傳已成功完成的主張 id"""
+    done: set[str] = set()
+    p = Path(path)
+    if not p.exists():
+        return done
+    with p.open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # 中斷時可能留下不完整的最後一行
+            if record.get("status") == "ok":
+                done.add(str(record.get("id")))
+    return done
+
+
+def _state_value(value: Any) -> Any:
+    return value.model_dump() if hasattr(value, "model_dump") else value
+
+
+class BatchRunner:
+    """以 asyncio 並行執行多筆主張，逐筆串流輸出結果"""
+
+    def __init__(
+        self,
+        agent=None,
+        service: Optional[BaseSessionService] = None,
+        concurrency: int = 4,
+        requests_per_minute: Optional[float] = None,
+        max_retries: int = 3,
+        backoff: float = 2.0,
+        reuse_threshold: Optional[float] = None,
+    ) -> None:
+        if agent is None:
+            from judge.agent import root_agent as agent
+        self.service = service or session_service
+        plugins = [RateLimitPlugin(requests_per_minute)] if requests_per_minute else []
+        self.runner = Runner(app_name=APP_NAME, agent=agent, session_service=self.service, plugins=plugins)
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.reuse_threshold = reuse_threshold
+        self._write_lock = asyncio.Lock()
+
+    def reuse(self, item: dict) -> Optional[dict]:
+        """近似重複（否定用語與數字相同）且仍有快取結果的主張：回傳沿用先前結果的紀錄，否則為 None"""
+        if self.reuse_threshold is None:
+            return None
+        started = time.perf_counter()
+        match = near_duplicate_index.query(item["claim"], min_score=self.reuse_threshold)
+        if match is not None and not reuse_compatible(item["claim"], match.claim):
+            match = None
+        payload = result_cache.get(match.claim) if match else None
+        if not payload or not payload.get("final_report_json"):
+            return None
+        # 沿用先前執行的指標（停止原因、回合數、證據等），但本筆沒有模型呼叫與階段耗時；
+        # wall_seconds 留空，由 evaluation 以 elapsed 補上
+        metrics = {
+            **(payload.get("metrics") or {}),
+            "wall_seconds": None,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "model_calls": 0,
+            "stages": {},
+            "agent_tokens": {},
+        }
+        # 先前的 Session 已刪除，只以 reused_from 指向其結果
+        return {
+            "id": item["id"],
+            "status": "ok",
+            "claim": item["claim"],
+            "attempts": 0,
+            "elapsed": time.perf_counter() - started,
+            "reused_from": match.to_dict(),
+            "final_report": payload.get("final_report_json"),
+            "jury_result": payload.get("jury_result"),
+            "debate_log": payload.get("debate_log") or [],
+            "metrics": metrics,
+        }
+
+    async def _discard(self, session) -> None:
+        """刪除已用完的 Session 與其回合索引，避免長時間批次執行時記憶體持續成長"""
+        await self.service.delete_session(app_name=APP_NAME, user_id=session.user_id, session_id=session.id)
+        clear_turn_index(session)
+
+    async def run_claim(self, item: dict) -> dict:
+        """執行單筆主張；失敗時以新 Session 重試"""
+        reused = self.reuse(item)
+        if reused is not None:
+            return reused
+        started = time.perf_counter()
+        last_error: Optional[Exception] = None
+        for attempt in range(1, self.max_retries + 2):
+            session = await self.service.create_session(
+                app_name=APP_NAME, user_id=f"batch-{item['id']}", state={"debate_messages": [], "agents": []}
+            )
+            message = types.Content(role="user", parts=[types.Part(text=item["claim"])])
+            try:
+                async for _ in self.runner.run_async(
+                    user_id=session.user_id, session_id=session.id, new_message=message
+                ):
+                    pass
+            except Exception as exc:  # 網路或配額錯誤：退避後重試
+                last_error = exc
+                await self._discard(session)
+                if attempt <= self.max_retries:
+                    await asyncio.sleep(self.backoff ** attempt * (0.5 + random.random()))
+                continue
+            final = await self.service.get_session(
+                app_name=APP_NAME, user_id=session.user_id, session_id=session.id
+            )
+            state = final.state
+            record = {
+                "id": item["id"],
+                "status": "ok",
+                "claim": item["claim"],
+                "session_id": final.id,
+                "attempts": attempt,
+                "elapsed": time.perf_counter() - started,
+                "final_report": _state_value(state.get("final_report_json")),
+                "jury_result": _state_value(state.get("jury_result")),
+                "debate_log": json.loads(export_debate_log(final)),
+                "metrics": state_metrics(state),
+            }
+            await self._discard(final)
+            return record
+        return {
+            "id": item["id"],
+            "status": "error",
+            "claim": item["claim"],
+            "attempts": self.max_retries + 1,
+            "elapsed": time.perf_counter() - started,
+            "error": repr(last_error),
+        }
+
+    async def _write(self, out, record: dict) -> None:
+        async with self._write_lock:
+            out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            out.flush()
+
+    async def run(self, claims: list[dict], output_path: str) -> dict:
+        done = completed_ids(output_path)
+        todo = [c for c in claims if c["id"] not in done]
+        summary = {"total": len(claims), "skipped": len(claims) - len(todo), "ok": 0, "error": 0}
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in todo:
+            queue.put_nowait(item)
+
+        ensure_parent_dir(output_path)
+        with open(output_path, "a", encoding="utf-8") as out:
+
+            async def worker() -> None:
+                while True:
+                    try:
+                        item = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    record = await self.run_claim(item)
+                    summary[record["status"]] += 1
+                    await self._write(out, record)
+
+            await asyncio.gather(*(worker() for _ in range(max(1, self.concurrency))))
+        return summary
+
+
+def _prepare_agents() -> None:
+    """批次模式下各 Session 由 Runner 記錄事件，主持人工具不綁定單一 Session"""
+    from judge.agent import root_agent
+    from judge.agents.moderator.agent import executor_agent
+    from judge.agents.moderator.tools import log_tool_output
+    from judge.tools.instrumentation import install_instrumentation, instrumentation_enabled
+
+    executor_agent.after_tool_callback = log_tool_output
+    if instrumentation_enabled():
+        install_instrumentation(root_agent)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="批次執行假新聞查核 pipeline")
+    parser.add_argument("claims", help="輸入 JSONL（每行含 claim 與可選的 id）")
+    parser.add_argument("output", help="輸出 JSONL，同時作為續跑用的檢查點")
+    parser.add_argument("--concurrency", type=int, default=4, help="同時執行的 pipeline 數")
+    parser.add_argument("--rpm", type=float, default=None, help="每個模型每分鐘的請求上限")
+    parser.add_argument("--retries", type=int, default=3, help="每筆主張的重試次數")
+    parser.add_argument(
+        "--reuse-near-duplicates",
+        type=float,
+        nargs="?",
+        const=DEFAULT_REUSE_THRESHOLD,
+        default=None,
+        metavar="THRESHOLD",
+        help=f"沿用相似度達門檻（預設 {DEFAULT_REUSE_THRESHOLD}）的先前查核結果，不執行 pipeline",
+    )
+    args = parser.parse_args(argv)
+
+    _prepare_agents()
+    runner = BatchRunner(
+        concurrency=args.concurrency,
+        requests_per_minute=args.rpm,
+        max_retries=args.retries,
+        reuse_threshold=args.reuse_near_duplicates,
+    )
+    summary = asyncio.run(runner.run(load_claims(args.claims), args.output))
+    print(json.dumps(summary, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
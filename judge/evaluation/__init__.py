@@ -0,0 +1,34 @@
+"""離線評估：批次讀取封存的查核紀錄並比較不同 pipeline 設定
+
+``records`` 不依賴 pandas；``loader`` 與 ``metrics`` 於第一次存取時才匯入 pandas。
+命令列用法見 ``python -m judge.evaluation --help``。
+"""
+
+from .._lazy import lazy_exports
+
+__all__ = [
+    "agreement",
+    "attach_labels",
+    "load_labels",
+    "load_runs",
+    "read_log",
+    "score_distribution",
+    "stage_table",
+    "state_metrics",
+    "summary",
+]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "read_log": ".records:read_log",
+        "state_metrics": ".records:state_metrics",
+        "load_labels": ".loader:load_labels",
+        "load_runs": ".loader:load_runs",
+        "agreement": ".metrics:agreement",
+        "attach_labels": ".metrics:attach_labels",
+        "score_distribution": ".metrics:score_distribution",
+        "stage_table": ".metrics:stage_table",
+        "summary": ".metrics:summary",
+    },
+)
@@ -0,0 +1,108 @@
+"""離線評估 CLI：比較多個 pipeline 設定的封存紀錄。
+
+每個位置參數為 ``名稱=路徑``（或僅路徑，以目錄名為名稱），路徑可為檔案或目錄；
+第一個設定預設為 baseline：
+
+    python -m judge.evaluation base=runs/base fast=runs/fast --labels labels.jsonl
+    python -m judge.evaluation base=base.jsonl fast=fast.jsonl --min-agreement 0.9 --csv runs.csv
+
+指定 --min-agreement / --max-accuracy-drop 時，任一設定未達門檻即以非零碼結束，
+可在 CI 中確認吞吐量最佳化未降低裁決品質。
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from typing import Optional
+
+import pandas as pd
+from tabulate import tabulate
+
+from .loader import load_labels, load_runs
+from .metrics import agreement, attach_labels, score_distribution, stage_table, summary
+
+
+def _sources(specs: list[str]) -> dict[str, list[str]]:
+    sources: dict[str, list[str]] = {}
+    for spec in specs:
+        name, sep, path = spec.partition("=")
+        if not sep:
+            name, path = "", spec
+        sources.setdefault(name or path.rstrip("/").rsplit("/", 1)[-1], []).append(path)
+    return sources
+
+
+def _print(title: str, table: pd.DataFrame, fmt: str) -> None:
+    if table.empty:
+        return
+    print(f"\n## {title}")
+    print(tabulate(table, headers="keys", tablefmt=fmt, floatfmt=".3f", missingval="-"))
+
+
+def check_quality(
+    table: pd.DataFrame,
+    agree: pd.DataFrame,
+    min_agreement: Optional[float],
+    max_accuracy_drop: Optional[float],
+    baseline: str,
+) -> list[str]:
+    failures = []
+    if min_agreement is not None:
+        for config, row in agree.iterrows():
+            if not row["agreement"] >= min_agreement:
+                failures.append(f"{config}: agreement {row['agreement']:.3f} < {min_agreement}")
+    if max_accuracy_drop is not None and "accuracy" in table:
+        base = table.loc[baseline, "accuracy"]
+        for config, accuracy in table["accuracy"].items():
+            if config != baseline and base - accuracy > max_accuracy_drop:
+                failures.append(f"{config}: accuracy {accuracy:.3f} vs baseline {base:.3f}")
+    return failures
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="比較多個 pipeline 設定的封存查核紀錄")
+    parser.add_argument("runs", nargs="+", help="名稱=路徑（檔案或目錄，可重複同一名稱）")
+    parser.add_argument("--labels", help="標註集（JSONL/CSV，含 claim 或 id 與 label）")
+    parser.add_argument("--baseline", help="比較基準的設定名稱（預設為第一個）")
+    parser.add_argument("--workers", type=int, default=None, help="解析紀錄的行程數（預設為 CPU 數）")
+    parser.add_argument("--format", default="github", help="tabulate 表格格式")
+    parser.add_argument("--stages", action="store_true", help="另列各階段耗時與各代理 token")
+    parser.add_argument("--csv", help="將每次執行的紀錄寫入 CSV")
+    parser.add_argument("--min-agreement", type=float, default=None, help="與 baseline 的裁決一致率下限")
+    parser.add_argument("--max-accuracy-drop", type=float, default=None, help="相對 baseline 的正確率容許降幅")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    sources = _sources(args.runs)
+    frame = load_runs(sources, workers=args.workers)
+    if frame.empty:
+        print("no runs found", file=sys.stderr)
+        return 1
+    frame["config"] = frame["config"].cat.set_categories(list(sources))
+    if args.labels:
+        frame = attach_labels(frame, load_labels(args.labels))
+    baseline = args.baseline or next(iter(sources))
+    loaded = time.perf_counter() - started
+
+    table = summary(frame)
+    agree = agreement(frame, baseline) if len(sources) > 1 else pd.DataFrame()
+    _print("Runs", table, args.format)
+    _print(f"Verdict agreement vs {baseline}", agree, args.format)
+    _print("Jury score distribution", score_distribution(frame), args.format)
+    if args.stages:
+        _print("Stage seconds (mean)", stage_table(frame, "seconds."), args.format)
+        _print("Agent tokens (mean)", stage_table(frame, "tokens."), args.format)
+    if args.csv:
+        frame.to_csv(args.csv, index=False)
+    print(f"\n{len(frame)} runs from {frame['source'].nunique()} files in {loaded:.2f}s")
+
+    failures = check_quality(table, agree, args.min_agreement, args.max_accuracy_drop, baseline)
+    for failure in failures:
+        print(f"QUALITY REGRESSION {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
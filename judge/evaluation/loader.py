@@ -0,0 +1,114 @@
+"""批次讀取封存紀錄並組成 pandas DataFrame。
+
+每個設定（config）對應一或多個檔案/目錄；檔案數多時以多個行程平行解析
+（JSON 解析是主要成本），每個檔案只保留扁平紀錄，不在記憶體中保存原始紀錄，
+最後以 ``DataFrame.from_records`` 一次建立。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Mapping, Optional, Union
+
+import pandas as pd
+
+from judge.tools.file_io import open_text
+
+from .records import claim_key, iter_log_paths, read_log
+
+
+# 檔案數少於此值時直接在本行程解析，省去建立行程池的成本
+PARALLEL_MIN_FILES = 256
+CATEGORY_COLUMNS = ("config", "status", "stop_reason", "result_cache")
+
+Sources = Union[str, Iterable[str], Mapping[str, Union[str, Iterable[str]]]]
+
+
+def _read_many(paths: list[str]) -> list[dict]:
+    records: list[dict] = []
+    for path in paths:
+        records.extend(read_log(path))
+    return records
+
+
+def _chunks(items: list, size: int) -> Iterable[list]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def read_records(paths: list[str], workers: Optional[int] = None) -> list[dict]:
+    """解析多個紀錄檔；workers 未指定時依 CPU 數決定，1 表示不使用行程池"""
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(paths) < PARALLEL_MIN_FILES:
+        return _read_many(paths)
+    # 每個工作含數十至數百個檔案，攤平行程間傳遞的開銷
+    size = max(16, min(512, len(paths) // (workers * 4) or 1))
+    records: list[dict] = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in pool.map(_read_many, _chunks(paths, size)):
+            records.extend(chunk)
+    return records
+
+
+def _named_sources(sources: Sources) -> dict[str, list[str]]:
+    if isinstance(sources, str):
+        sources = [sources]
+    if not isinstance(sources, Mapping):
+        sources = {os.path.basename(os.path.normpath(s)) or s: s for s in sources}
+    named: dict[str, list[str]] = {}
+    for name, value in sources.items():
+        for source in [value] if isinstance(value, str) else value:
+            named.setdefault(name, []).extend(iter_log_paths(source))
+    return named
+
+
+def load_runs(sources: Sources, workers: Optional[int] = None) -> pd.DataFrame:
+    """讀取各設定的紀錄，回傳每次執行一列的 DataFrame（含 config 與 key 欄）
+
+    sources 可為單一路徑、路徑清單（以檔名/目錄名作為設定名稱），或
+    ``{設定名稱: 路徑或路徑清單}``。key 為跨設定比對同一主張的鍵：
+    正規化主張優先，其次為 id。
+    """
+    named = _named_sources(sources)
+    paths = [path for files in named.values() for path in files]
+    config_of = {path: name for name, files in named.items() for path in files}
+    records = read_records(paths, workers)
+    frame = pd.DataFrame.from_records(records)
+    if frame.empty:
+        return frame
+    frame.insert(0, "config", frame["source"].map(config_of))
+    frame.insert(1, "key", frame["claim_key"].fillna(frame["id"]).fillna(frame["session_id"]))
+    for column in CATEGORY_COLUMNS:
+        if column in frame:
+            frame[column] = frame[column].astype("category")
+    return frame
+
+
+def load_labels(path: str) -> pd.DataFrame:
+    """標註集（JSONL 或 CSV）：每列含 claim 或 id，以及 label（或 verdict）
+
+    回傳含 key（與 load_runs 相同的比對鍵）、id 與 label 欄的 DataFrame。
+    """
+    if ".csv" in os.path.basename(path):
+        labels = pd.read_csv(path, dtype=str)
+    else:
+        with open_text(path) as f:
+            labels = pd.DataFrame.from_records([json.loads(line) for line in f if line.strip()])
+    if "label" not in labels and "verdict" in labels:
+        labels = labels.rename(columns={"verdict": "label"})
+    if "label" not in labels:
+        raise ValueError(f"{path}: 標註集需要 label 或 verdict 欄位")
+    if "claim" in labels:
+        labels["key"] = labels["claim"].map(lambda c: claim_key(c) if isinstance(c, str) else None)
+    else:
+        labels["key"] = None
+    if "id" in labels:
+        labels["id"] = labels["id"].astype(str)
+    else:
+        labels["id"] = None
+    return labels[["key", "id", "label"]]
+
+
+__all__ = ["load_labels", "load_runs", "read_records"]
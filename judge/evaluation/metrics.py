@@ -0,0 +1,138 @@
+"""以 DataFrame 計算各設定的指標與設定間的比較（全部以 pandas 向量運算）。
+
+- ``summary``：各設定的回合數、證據去重、陪審分數、耗時、token、快速通道/沿用比例，
+  有標註集時另含裁決正確率
+- ``agreement``：各設定與 baseline 設定在相同主張上的裁決一致率與陪審分數差
+- ``score_distribution``：陪審總分的分位數與區間分布
+- ``stage_table``：各階段平均耗時（``seconds.*``）或各代理平均 token（``tokens.*``）
+
+裁決以 ``normalize_verdict`` 正規化（小寫、去除空白與標點）後比較，
+標註集的 label 應使用與陪審團 verdict 相同的用語。
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+SCORE_BINS = (0, 20, 40, 60, 80, 100)
+
+
+def normalize_verdict(verdicts: pd.Series) -> pd.Series:
+    return verdicts.astype("string").str.casefold().str.replace(r"[\s\W_]+", "", regex=True)
+
+
+def attach_labels(frame: pd.DataFrame, labels: pd.DataFrame) -> pd.DataFrame:
+    """加上 label 與 correct 欄；標註集以主張比對，沒有主張的列改以 id 比對"""
+    by_key = labels.dropna(subset=["key"]).drop_duplicates("key", keep="last").set_index("key")["label"]
+    by_id = labels.dropna(subset=["id"]).drop_duplicates("id", keep="last").set_index("id")["label"]
+    label = frame["key"].map(by_key)
+    if not by_id.empty and "id" in frame:
+        label = label.fillna(frame["id"].astype("string").map(by_id))
+    frame = frame.assign(label=label)
+    correct = normalize_verdict(frame["verdict"]) == normalize_verdict(frame["label"])
+    return frame.assign(correct=correct.where(frame["label"].notna()).astype("boolean"))
+
+
+def _quantile(q: float):
+    def agg(values: pd.Series) -> float:
+        return values.quantile(q)
+
+    agg.__name__ = f"p{int(q * 100)}"
+    return agg
+
+
+def summary(frame: pd.DataFrame) -> pd.DataFrame:
+    """每個設定一列的指標表"""
+    frame = frame.assign(
+        ok=frame["status"].astype("string") == "ok",
+        tokens=frame["input_tokens"].fillna(0) + frame["output_tokens"].fillna(0),
+    )
+    grouped = frame.groupby("config", observed=True, sort=False)
+    table = grouped.agg(
+        runs=("key", "size"),
+        ok_rate=("ok", "mean"),
+        turns=("turns", "mean"),
+        evidence_total=("evidence_total", "mean"),
+        evidence_unique=("evidence_unique", "mean"),
+        jury_mean=("jury_total", "mean"),
+        jury_std=("jury_total", "std"),
+        wall_p50=("wall_seconds", _quantile(0.5)),
+        wall_p95=("wall_seconds", _quantile(0.95)),
+        tokens=("tokens", "mean"),
+        model_calls=("model_calls", "mean"),
+        fast_tracked=("fast_tracked", "mean"),
+        reused=("reused", "mean"),
+    )
+    if "correct" in frame:
+        table["labelled"] = grouped["correct"].count()
+        table["accuracy"] = grouped["correct"].mean().astype(float)
+    return table
+
+
+def _latest(frame: pd.DataFrame) -> pd.DataFrame:
+    """同一設定重複執行的主張只取最後一次"""
+    return frame.drop_duplicates(["config", "key"], keep="last")
+
+
+def agreement(frame: pd.DataFrame, baseline: Optional[str] = None) -> pd.DataFrame:
+    """各設定與 baseline 在共同主張上的裁決一致率、陪審總分差（設定 − baseline）"""
+    configs = list(frame["config"].cat.categories if hasattr(frame["config"], "cat") else frame["config"].unique())
+    baseline = baseline or configs[0]
+    latest = _latest(frame)
+    verdicts = latest.assign(v=normalize_verdict(latest["verdict"])).pivot(index="key", columns="config", values="v")
+    scores = latest.pivot(index="key", columns="config", values="jury_total").astype(float)
+    if baseline not in verdicts:
+        raise ValueError(f"baseline 設定 {baseline!r} 沒有任何紀錄")
+    rows = {}
+    for config in verdicts.columns:
+        if config == baseline:
+            continue
+        shared = verdicts[baseline].notna() & verdicts[config].notna()
+        delta = (scores[config] - scores[baseline])[shared]
+        rows[config] = {
+            "baseline": baseline,
+            "shared": int(shared.sum()),
+            "agreement": float((verdicts.loc[shared, config] == verdicts.loc[shared, baseline]).mean())
+            if shared.any()
+            else np.nan,
+            "score_delta": delta.mean(),
+            "score_abs_delta": delta.abs().mean(),
+            "score_corr": scores.loc[shared, config].corr(scores.loc[shared, baseline]),
+        }
+    return pd.DataFrame.from_dict(rows, orient="index")
+
+
+def score_distribution(frame: pd.DataFrame, bins=SCORE_BINS) -> pd.DataFrame:
+    """陪審總分的分位數與各區間所佔比例"""
+    scores = frame.dropna(subset=["jury_total"])
+    grouped = scores.groupby("config", observed=True, sort=False)["jury_total"]
+    quantiles = grouped.quantile([0.1, 0.25, 0.5, 0.75, 0.9]).unstack()
+    quantiles.columns = [f"p{int(q * 100)}" for q in quantiles.columns]
+    bucket = pd.cut(scores["jury_total"], bins=list(bins), include_lowest=True)
+    shares = pd.crosstab(scores["config"], bucket, normalize="index")
+    shares.columns = [f"{int(c.left) if c.left > 0 else 0}-{int(c.right)}" for c in shares.columns]
+    return quantiles.join(shares)
+
+
+def stage_table(frame: pd.DataFrame, prefix: str = "seconds.", stat: str = "mean") -> pd.DataFrame:
+    """階段（列）× 設定（欄）；略過的階段不計入平均"""
+    columns = [c for c in frame.columns if c.startswith(prefix)]
+    if not columns:
+        return pd.DataFrame()
+    table = frame.groupby("config", observed=True, sort=False)[columns].agg(stat).T
+    table.index = [c[len(prefix) :] for c in table.index]
+    return table
+
+
+__all__ = [
+    "agreement",
+    "attach_labels",
+    "normalize_verdict",
+    "score_distribution",
+    "stage_table",
+    "summary",
+]
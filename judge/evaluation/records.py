@@ -0,0 +1,244 @@
+"""將封存的查核紀錄轉為每次執行一筆的扁平紀錄（不依賴 pandas）。
+
+支援的輸入：
+
+- Session 匯出（``export_session`` / ``export_latest_session``）：含 ``state`` 與 ``events``
+- 串流匯出的 state 快照（``export_session_stream``）；``*.events.jsonl`` 事件檔不需讀取
+- ``export_debate_log`` 的 ``debate_log.json``（回合清單，只有辯論相關指標）
+- ``judge.batch`` 的輸出 JSONL（每行一筆主張，含 ``metrics``）
+
+每筆紀錄的欄位見 ``state_record``；各階段耗時與各代理 token 以
+``seconds.<階段>``、``tokens.<代理>`` 為鍵展開，方便直接組成 DataFrame。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+from judge.tools.evidence import canonical_source, normalize_claim
+from judge.tools.file_io import open_text
+
+
+LOG_SUFFIXES = (".json", ".jsonl", ".json.gz", ".jsonl.gz")
+JURY_SCORE_FIELDS = ("evidence_quality", "logical_rigor", "robustness", "social_impact", "total")
+
+# 各紀錄引用的來源大量重複（同一批新聞/查核網站），網址正規化的結果以 LRU 快取
+_canonical_source = lru_cache(maxsize=65536)(canonical_source)
+
+
+def claim_key(claim: str) -> str:
+    """跨設定比對同一主張用的鍵；與結果快取（result_cache.claim_key）共用 normalize_claim"""
+    return normalize_claim(claim)
+
+
+def _plain(value: Any) -> Any:
+    return value.model_dump() if hasattr(value, "model_dump") else value
+
+
+def iter_log_paths(source: str) -> Iterator[str]:
+    """檔案本身，或目錄下（遞迴）所有紀錄檔；略過串流匯出的事件檔"""
+    if os.path.isfile(source):
+        yield source
+        return
+    for root, _, files in os.walk(source):
+        for name in sorted(files):
+            if name.endswith(LOG_SUFFIXES) and ".events.jsonl" not in name:
+                yield os.path.join(root, name)
+
+
+def turn_evidence(turns: Iterable[dict]) -> tuple[int, int]:
+    """(引用證據總數, 相異來源數)；支援 Turn 與 debate_messages 兩種格式"""
+    total = 0
+    sources = set()
+    for turn in turns:
+        if not isinstance(turn, dict):
+            continue
+        items = turn.get("evidence")
+        if items is None and isinstance(turn.get("data"), dict):
+            items = turn["data"].get("evidence")
+        for item in items or []:
+            total += 1
+            source = item.get("source") if isinstance(item, dict) else None
+            if source:
+                sources.add(_canonical_source(source))
+    return total, len(sources)
+
+
+def jury_fields(jury: Any) -> dict:
+    jury = _plain(jury)
+    if not isinstance(jury, dict):
+        return {"verdict": None, **{f"jury_{k}": None for k in JURY_SCORE_FIELDS}}
+    scores = jury.get("scores") or {}
+    return {"verdict": jury.get("verdict"), **{f"jury_{k}": scores.get(k) for k in JURY_SCORE_FIELDS}}
+
+
+def state_metrics(state: dict) -> dict:
+    """Session state 中與評估相關的精簡指標（judge.batch 寫入輸出的 ``metrics``）"""
+    timing = state.get("pipeline_timing") or {}
+    instrumentation = state.get("instrumentation") or {}
+    budget = state.get("debate_budget") or {}
+    agents = instrumentation.get("agents") or {}
+    return {
+        "stop_reason": budget.get("stop_reason") or state.get("stop_reason"),
+        "debate_iterations": budget.get("iterations"),
+        "debate_spent": budget.get("spent"),
+        "evidence_unique": state.get("evidence_unique_count"),
+        "novelty_score": state.get("novelty_score"),
+        "wall_seconds": instrumentation.get("wall_seconds") or timing.get("wall_seconds"),
+        "input_tokens": instrumentation.get("input_tokens"),
+        "output_tokens": instrumentation.get("output_tokens"),
+        "stages": {name: stage.get("duration") for name, stage in (timing.get("stages") or {}).items()},
+        "skipped": timing.get("skipped") or [],
+        "agent_tokens": {
+            name: a["input_tokens"] + a["output_tokens"]
+            for name, a in agents.items()
+            if a.get("input_tokens") or a.get("output_tokens")
+        },
+        "model_calls": sum(a.get("model_calls", 0) for a in agents.values()) if agents else None,
+        "result_cache": (state.get("result_cache") or {}).get("status"),
+    }
+
+
+def _record(
+    claim: Optional[str],
+    run_id: Optional[str],
+    session_id: Optional[str],
+    status: str,
+    turns: list,
+    report: Any,
+    jury: Any,
+    metrics: dict,
+) -> dict:
+    report = _plain(report)
+    evidence_total, evidence_unique = turn_evidence(turns)
+    spent = metrics.get("debate_spent") or {}
+    record = {
+        "id": run_id,
+        "session_id": session_id,
+        "claim": claim,
+        "claim_key": claim_key(claim) if claim else None,
+        "status": status,
+        "turns": len(turns),
+        "evidence_total": evidence_total,
+        # evidence_store 的相異來源數較完整（含 Curator 與 Evidence 查核），有則優先
+        "evidence_unique": metrics.get("evidence_unique") if metrics.get("evidence_unique") is not None else evidence_unique,
+        **jury_fields(jury),
+        "report_score": report.get("jury_score") if isinstance(report, dict) else None,
+        "fast_tracked": bool(report.get("fast_tracked")) if isinstance(report, dict) else False,
+        "reused": bool(metrics.get("reused")),
+        "skipped_stages": len(metrics.get("skipped") or []),
+        "result_cache": metrics.get("result_cache"),
+        "stop_reason": metrics.get("stop_reason"),
+        "debate_iterations": metrics.get("debate_iterations"),
+        "debate_tokens": spent.get("tokens"),
+        "debate_cost": spent.get("cost"),
+        "novelty_score": metrics.get("novelty_score"),
+        "wall_seconds": metrics.get("wall_seconds"),
+        "input_tokens": metrics.get("input_tokens"),
+        "output_tokens": metrics.get("output_tokens"),
+        "model_calls": metrics.get("model_calls"),
+    }
+    for name, seconds in (metrics.get("stages") or {}).items():
+        record[f"seconds.{name}"] = seconds
+    for name, tokens in (metrics.get("agent_tokens") or {}).items():
+        record[f"tokens.{name}"] = tokens
+    return record
+
+
+def _user_claim(events: list) -> Optional[str]:
+    for event in events or []:
+        if event.get("author") != "user":
+            continue
+        parts = (event.get("content") or {}).get("parts") or []
+        text = "".join(p.get("text") or "" for p in parts).strip()
+        if text:
+            return text
+    return None
+
+
+def state_record(export: dict, claim: Optional[str] = None) -> dict:
+    """Session 匯出或串流快照 → 紀錄；主張取自第一則使用者事件，其次為報告主題"""
+    scoped = export.get("state") or {}
+    state = scoped.get("shared", scoped)
+    session = export.get("session") or {}
+    report = _plain(state.get("final_report_json"))
+    if claim is None:
+        claim = _user_claim(export.get("events"))
+    if claim is None:
+        claim = (report or {}).get("topic") if isinstance(report, dict) else None
+    turns = state.get("debate_log") or state.get("debate_messages") or []
+    status = "ok" if report else "incomplete"
+    return _record(claim, None, session.get("id"), status, turns, report, state.get("jury_result"), state_metrics(state))
+
+
+def batch_record(item: dict) -> dict:
+    metrics = dict(item.get("metrics") or {})
+    if metrics.get("wall_seconds") is None:
+        metrics["wall_seconds"] = item.get("elapsed")
+    metrics["reused"] = bool(item.get("reused_from"))
+    return _record(
+        item.get("claim"),
+        item.get("id"),
+        item.get("session_id"),
+        item.get("status") or "ok",
+        item.get("debate_log") or [],
+        item.get("final_report"),
+        item.get("jury_result"),
+        metrics,
+    )
+
+
+def turns_record(turns: list, name: Optional[str] = None) -> dict:
+    """只有 debate_log.json 時：僅能得到回合與證據指標"""
+    return _record(None, name, None, "turns_only", turns, None, None, {})
+
+
+def _from_json(data: Any, name: str) -> list[dict]:
+    if isinstance(data, list):
+        return [turns_record(data, name)]
+    if isinstance(data, dict) and "state" in data:
+        return [state_record(data)]
+    if isinstance(data, dict) and ("final_report" in data or "status" in data):
+        return [batch_record(data)]
+    return []
+
+
+def read_log(path: str) -> list[dict]:
+    """讀取單一紀錄檔，回傳其中每次執行的紀錄（JSONL 可含多筆）"""
+    name = Path(path).name
+    records: list[dict] = []
+    with open_text(path) as f:
+        if ".jsonl" in name:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.extend(_from_json(json.loads(line), name))
+                except ValueError:
+                    continue  # 中斷時可能留下不完整的最後一行
+        else:
+            try:
+                records.extend(_from_json(json.load(f), Path(name).stem))
+            except ValueError:
+                return []
+    for record in records:
+        record["source"] = path
+    return records
+
+
+__all__ = [
+    "JURY_SCORE_FIELDS",
+    "batch_record",
+    "claim_key",
+    "iter_log_paths",
+    "read_log",
+    "state_metrics",
+    "state_record",
+    "turn_evidence",
+    "turns_record",
+]
@@ -3,36 +3,82 @@
 from __future__ import annotations
 
 import json
+from typing import TYPE_CHECKING, Optional
 
-from google.adk.events.event import Event
-from google.adk.events.event_actions import EventActions
-from google.adk.sessions.in_memory_session_service import InMemorySessionService
-from google.adk.sessions.session import Session
-
-from judge.tools.session_service import session_service
+from judge._lazy import lazy_exports
 
 from .debate_log import (
     Turn,
+    DebateMetrics,
+    get_debate_metrics,
+    has_confidence,
     initialize_debate_state,
+    verify_metrics,
     update_state_from_session,
     append_event_update,
     export_debate_log,
     export_session,
+    export_session_stream,
+    clear_turn_index,
+)
+from .context import build_debate_context, make_context_callback
+from .evidence import (
+    Evidence,
+    EvidenceStore,
+    canonical_source,
+    curator_result_to_evidence,
+    get_evidence_store,
+    record_evidence,
 )
-from .evidence import Evidence, curator_result_to_evidence
-from .file_io import ensure_parent_dir, write_json_file
+from .file_io import append_jsonl, ensure_parent_dir, read_jsonl, write_json_file
 from .fallacies import flatten_fallacies
 
+if TYPE_CHECKING:
+    from google.adk.events.event import Event
+    from google.adk.sessions.base_session_service import BaseSessionService
+    from google.adk.sessions.session import Session
+
+# 依賴 google.adk 的工具於第一次存取時才匯入
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "create_session_service": ".session_service:create_session_service",
+        "SqliteSessionService": ".sqlite_session_service:SqliteSessionService",
+        "install_instrumentation": ".instrumentation:install_instrumentation",
+        "last_summary": ".instrumentation:last_summary",
+        "to_prometheus": ".instrumentation:to_prometheus",
+        "FakeLlm": ".models:FakeLlm",
+        "install_fake_llm": ".models:install_fake_llm",
+        "install_model_backend": ".models:install_model_backend",
+        "near_duplicate_index": ".near_duplicate:near_duplicate_index",
+        "update_novelty": ".novelty:update_novelty",
+        "install_replay": ".replay:install_replay",
+        "replay_store": ".replay:replay_store",
+        "result_cache": ".result_cache:result_cache",
+        "result_cache_stats": ".result_cache:result_cache_stats",
+        "search_stats": ".search:search_stats",
+        "search_tool": ".search:search_tool",
+    },
+)
+
+
+def _default_service() -> "BaseSessionService":
+    from .session_service import session_service
 
+    return session_service
 
 
 async def append_event(
     session: Session,
     event: Event,
-    service: InMemorySessionService = session_service,
+    service: Optional[BaseSessionService] = None,
 ) -> Event:
-    """加入事件到指定 Session 並同步更新 state（非同步）"""
+    """加入事件到指定 Session 並同步更新 state（非同步）
 
+    未指定 service 時使用全域 SessionService。
+    """
+
+    service = service or _default_service()
     # 透過 await 呼叫 Session 服務，避免在回呼中建立新事件迴圈
     result = await service.append_event(session, event)
     append_event_update(session.state, event)
@@ -71,6 +117,9 @@ def make_record_callback(author: str, key: str, show_pretty_message: bool = Fals
                 # 退回為字串
                 message = str(output)
 
+        from google.adk.events.event import Event
+        from google.adk.events.event_actions import EventActions
+
         # 非同步寫入事件，確保使用同一事件迴圈
         await append_event(
             Event(author=author, actions=EventActions(state_delta={key: output}, message=message))
@@ -82,10 +131,11 @@ def make_record_callback(author: str, key: str, show_pretty_message: bool = Fals
 
 
 async def export_latest_debate_log(
-    session: Session, service: InMemorySessionService = session_service
+    session: Session, service: Optional[BaseSessionService] = None
 ) -> str:
     """取得最新事件並輸出辯論紀錄（非同步）"""
 
+    service = service or _default_service()
     session = await service.get_session(
         app_name=session.app_name,
         user_id=session.user_id,
@@ -97,17 +147,29 @@ async def export_latest_debate_log(
 async def export_latest_session(
     session: Session,
     path: str = "debate_log.json",
-    service: InMemorySessionService = session_service,
+    service: Optional[BaseSessionService] = None,
+    stream: bool = False,
+    compact: bool = False,
+    compress: bool = False,
 ) -> dict:
-    """匯出最新 Session 並保存為 JSON 檔（非同步）"""
+    """匯出最新 Session 並保存為 JSON 檔（非同步）
+
+    stream=True 時改以 JSON Lines 逐筆附加尚未寫出的事件，並原子替換 state 快照，
+    回傳匯出進度（見 export_session_stream）；compact 不縮排，compress 以 gzip 壓縮。
+    """
 
+    service = service or _default_service()
     session = await service.get_session(
         app_name=session.app_name,
         user_id=session.user_id,
         session_id=session.id,
     )
+    if stream:
+        return export_session_stream(session, path, compact=compact, compress=compress)
     data = export_session(session)
-    write_json_file(path, data)
+    if compress and not path.endswith(".gz"):
+        path += ".gz"
+    write_json_file(path, data, compact=compact, compress=compress)
     return data
 
 
@@ -121,12 +183,22 @@ def _before_init_session(agent_context=None, **_):
 
 __all__ = [
     "Turn",
+    "DebateMetrics",
+    "get_debate_metrics",
     "initialize_debate_state",
     "ensure_parent_dir",
     "write_json_file",
+    "append_jsonl",
+    "read_jsonl",
     "Evidence",
     "curator_result_to_evidence",
+    "EvidenceStore",
+    "canonical_source",
+    "get_evidence_store",
+    "record_evidence",
     "append_event",
+    "create_session_service",
+    "SqliteSessionService",
     "update_state_from_session",
     "append_event_update",
     "make_record_callback",
@@ -134,6 +206,20 @@ __all__ = [
     "export_latest_debate_log",
     "export_session",
     "export_latest_session",
+    "export_session_stream",
+    "clear_turn_index",
+    "has_confidence",
+    "verify_metrics",
     "_before_init_session",
     "flatten_fallacies",
+    "build_debate_context",
+    "make_context_callback",
+    "install_instrumentation",
+    "last_summary",
+    "to_prometheus",
+    "FakeLlm",
+    "install_fake_llm",
+    "install_model_backend",
+    "search_stats",
+    "search_tool",
 ]
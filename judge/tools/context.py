@@ -0,0 +1,171 @@
+"""辯論脈絡建構：為主持人、陪審團與整合者提供有上限的 debate_messages 視圖。
+
+- 最近 K 則訊息原文保留（有 content 時去除重複的 data 原始負載）
+- 更早的訊息折疊為逐步累積的摘要（state['debate_digest']），每次只處理新折疊的訊息
+- 每個代理有各自的 token 預算，超出時先截短摘要、再截短訊息內容
+- 結果寫入 state['debate_context_<代理>']，於指令中以 {debate_context_<代理>?} 引用；
+  各代理的呼叫次數、完整 debate_messages 的 token 數（raw_tokens）、實際注入的脈絡
+  token 數（context_tokens）與兩者差額（saved_tokens）累計於 state['debate_context_stats']
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Optional
+
+
+DEFAULT_RECENT = 4
+DIGEST_LINE_CHARS = 80
+
+# 各代理的脈絡 token 預算（估計值）
+CONTEXT_BUDGETS: dict[str, int] = {
+    "moderator_decider": 1500,
+    "stop_checker_llm": 800,
+    "devil_schema_validator": 1200,
+    "jury": 3000,
+    "synthesizer": 3000,
+}
+DEFAULT_BUDGET = 1500
+
+
+def estimate_tokens(text: str) -> int:
+    """粗估 token 數：以 UTF-8 位元組數 / 4 計（中文約每字 0.75 token）"""
+    return (len(text.encode("utf-8")) + 3) // 4
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def compact_message(msg: Any) -> dict:
+    """保留發言者、主張與內容；content 已摘要 data 時不重複附上 data"""
+    if not isinstance(msg, dict):
+        return {"content": str(msg)}
+    if msg.get("content"):
+        return {k: v for k, v in msg.items() if k != "data" and v is not None}
+    return {k: v for k, v in msg.items() if v is not None}
+
+
+def _digest_line(msg: Any) -> str:
+    if not isinstance(msg, dict):
+        text, speaker = str(msg), "?"
+    else:
+        speaker = msg.get("speaker") or "?"
+        text = msg.get("claim") or msg.get("content") or _dumps(msg.get("data", ""))
+    text = " ".join(str(text).split())
+    if len(text) > DIGEST_LINE_CHARS:
+        text = text[: DIGEST_LINE_CHARS - 1] + "…"
+    return f"- {speaker}: {text}"
+
+
+def update_digest(state, recent: int = DEFAULT_RECENT) -> dict:
+    """將最近 recent 則以外、尚未折疊的訊息加入 state['debate_digest']"""
+    messages = state.get("debate_messages") or []
+    digest = dict(state.get("debate_digest") or {"folded": 0, "lines": []})
+    target = max(0, len(messages) - recent)
+    if target < digest["folded"]:
+        # 訊息被重設（新的辯論）：重新開始
+        digest = {"folded": 0, "lines": []}
+    if target > digest["folded"]:
+        new = messages[digest["folded"] : target]
+        digest["lines"] = list(digest["lines"]) + [_digest_line(m) for m in new]
+        digest["folded"] = target
+        state["debate_digest"] = digest
+    return digest
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    # 依位元組比例估算可保留的字數
+    keep = max(1, int(len(text) * max_tokens / estimate_tokens(text)) - 1)
+    return text[:keep] + "…"
+
+
+def build_debate_context(
+    state, budget: int = DEFAULT_BUDGET, recent: int = DEFAULT_RECENT
+) -> tuple[str, int]:
+    """回傳 (脈絡文字, 脈絡 token 數)"""
+    messages = state.get("debate_messages") or []
+    digest = update_digest(state, recent)
+    tail = [compact_message(m) for m in messages[digest["folded"] :]]
+
+    recent_text = _dumps(tail)
+    recent_tokens = estimate_tokens(recent_text)
+    if recent_tokens > budget and tail:
+        # 最近訊息本身超出預算：平均截短每則內容
+        per_message = max(16, budget // len(tail))
+        for m in tail:
+            if "content" in m:
+                m["content"] = _truncate(str(m["content"]), per_message)
+        recent_text = _dumps(tail)
+        recent_tokens = estimate_tokens(recent_text)
+
+    parts = []
+    lines = digest["lines"]
+    if lines:
+        remaining = budget - recent_tokens
+        kept: list[str] = []
+        used = 0
+        for line in reversed(lines):
+            cost = estimate_tokens(line) + 1
+            if used + cost > remaining:
+                break
+            kept.append(line)
+            used += cost
+        kept.reverse()
+        omitted = len(lines) - len(kept)
+        header = f"[較早的 {len(lines)} 則發言摘要"
+        header += f"，最早 {omitted} 則已省略]" if omitted else "]"
+        parts.append("\n".join([header, *kept]))
+    parts.append(f"[最近 {len(tail)} 則發言]\n{recent_text}")
+    text = "\n".join(parts)
+    return text, estimate_tokens(text)
+
+
+def context_key(agent_name: str) -> str:
+    return f"debate_context_{agent_name}"
+
+
+def make_context_callback(
+    agent_name: str, budget: Optional[int] = None, recent: int = DEFAULT_RECENT
+):
+    """建立 before_agent_callback：寫入 state['debate_context_<agent_name>']，並以
+    estimate_tokens 累計完整訊息與摘要後脈絡的 token 數"""
+    budget = budget or CONTEXT_BUDGETS.get(agent_name, DEFAULT_BUDGET)
+
+    def _callback(callback_context=None, **_):
+        if callback_context is None:
+            return None
+        state = callback_context.state
+        text, used = build_debate_context(state, budget=budget, recent=recent)
+        state[context_key(agent_name)] = text
+        # 以相同估計方式量測直接注入完整 debate_messages 時的大小
+        raw = estimate_tokens(_dumps(state.get("debate_messages") or []))
+
+        stats = dict(state.get("debate_context_stats") or {})
+        agent_stats = dict(
+            stats.get(agent_name)
+            or {"calls": 0, "raw_tokens": 0, "context_tokens": 0, "saved_tokens": 0}
+        )
+        agent_stats["calls"] += 1
+        agent_stats["raw_tokens"] += raw
+        agent_stats["context_tokens"] += used
+        agent_stats["saved_tokens"] += max(0, raw - used)
+        stats[agent_name] = agent_stats
+        state["debate_context_stats"] = stats
+        return None
+
+    return _callback
+
+
+__all__ = [
+    "CONTEXT_BUDGETS",
+    "DEFAULT_RECENT",
+    "estimate_tokens",
+    "compact_message",
+    "update_digest",
+    "build_debate_context",
+    "context_key",
+    "make_context_callback",
+]
@@ -1,12 +1,41 @@
 from __future__ import annotations
-from typing import List, Optional
+from collections import OrderedDict
+from typing import TYPE_CHECKING, List, Optional
 import json
-from pydantic import BaseModel, Field
+import math
+import os
+from pydantic import BaseModel, Field, PrivateAttr, field_serializer
 
-from google.adk.events.event import Event
-from google.adk.sessions.session import Session
+if TYPE_CHECKING:
+    from google.adk.events.event import Event
+    from google.adk.sessions.session import Session
 
-from .evidence import Evidence
+from .evidence import Evidence, EvidenceStore
+from .file_io import append_jsonl, open_text, write_json_file, write_jsonl
+
+# 事件中只攜帶新增辯論訊息的鍵名（取代每次附上完整 debate_messages）
+DEBATE_DELTA_KEY = "debate_messages_delta"
+
+# initialize_debate_state 與主持人工具會寫入的辯論相關 state 鍵
+DEBATE_STATE_KEYS = (
+    "debate_messages",
+    "debate_log",
+    "debate_metrics",
+    "dispute_points",
+    "credibility",
+    "evidence",
+    "evidence_store",
+    "evidence_count",
+    "evidence_unique_count",
+    "prev_dispute_points",
+    "prev_credibility",
+    "prev_evidence_count",
+    "novelty_score",
+    "novelty",
+)
+
+# 回合索引快取最多保留的 Session 數
+TURN_INDEX_MAX_SESSIONS = 256
 
 
 class Turn(BaseModel):
@@ -29,10 +58,172 @@ def recalculate_metrics(turns: List[Turn]) -> dict:
     }
 
 
+class DebateMetrics(BaseModel):
+    """辯論指標的累計值，每回合 O(1) 更新，取代逐回合全量重算。
+
+    - claims：已出現的相異主張（依出現順序累加，序列化時才排序）
+    - confidence_sum / confidence_count：信心值累計，用於計算平均
+    - evidence：只增不減的證據索引；as_state 只輸出計數，不複製列表
+    """
+
+    claims: List[str] = Field(default_factory=list)
+    confidence_sum: float = 0.0
+    confidence_count: int = 0
+    evidence: List[Evidence] = Field(default_factory=list)
+
+    _claim_set: set = PrivateAttr(default_factory=set)
+    # clone 後與來源共用列表，第一次修改時才複製（copy-on-write）
+    _shared: bool = PrivateAttr(default=False)
+
+    def model_post_init(self, __context) -> None:
+        self._claim_set = set(self.claims)
+
+    @field_serializer("claims")
+    def _serialize_claims(self, claims: List[str]) -> List[str]:
+        return sorted(claims)
+
+    @classmethod
+    def from_turns(cls, turns: List[Turn]) -> "DebateMetrics":
+        metrics = cls()
+        for turn in turns:
+            metrics.add_turn(turn)
+        return metrics
+
+    def add_turn(self, turn: Turn) -> None:
+        if self._shared:
+            self.claims = list(self.claims)
+            self.evidence = list(self.evidence)
+            self._claim_set = set(self._claim_set)
+            self._shared = False
+        if turn.claim and turn.claim not in self._claim_set:
+            self._claim_set.add(turn.claim)
+            self.claims.append(turn.claim)
+        if turn.confidence is not None:
+            self.confidence_sum += turn.confidence
+            self.confidence_count += 1
+        self.evidence.extend(turn.evidence)
+
+    def clone(self) -> "DebateMetrics":
+        """複製累計值（O(1)：共用列表，任一方下次 add_turn 時才複製），避免外部修改影響快取"""
+        clone = DebateMetrics.model_construct(
+            claims=self.claims,
+            confidence_sum=self.confidence_sum,
+            confidence_count=self.confidence_count,
+            evidence=self.evidence,
+        )
+        clone._claim_set = self._claim_set
+        clone._shared = self._shared = True
+        return clone
+
+    def as_state(self) -> dict:
+        """輸出累計指標（證據只輸出數量；完整列表見 debate_metrics.evidence）"""
+        return {
+            "dispute_points": len(self.claims),
+            "credibility": (
+                self.confidence_sum / self.confidence_count if self.confidence_count else 0.0
+            ),
+            "evidence_count": len(self.evidence),
+        }
+
+
+def _as_turn(turn) -> Turn:
+    return turn if isinstance(turn, Turn) else Turn.model_validate(turn)
+
+
+def get_debate_metrics(state: dict) -> DebateMetrics:
+    """取得 state 中的累計指標；若不存在（或為序列化後的 dict）則由 debate_log 重建一次"""
+    metrics = state.get("debate_metrics")
+    if isinstance(metrics, DebateMetrics):
+        return metrics
+    if isinstance(metrics, dict):
+        metrics = DebateMetrics.model_validate(metrics)
+    else:
+        metrics = DebateMetrics.from_turns([_as_turn(t) for t in state.get("debate_log", [])])
+    state["debate_metrics"] = metrics
+    return metrics
+
+
+def has_confidence(state) -> bool:
+    """辯論中是否有任何回合提供信心值；沒有時可信度（credibility）恆為 0，不應作為增益指標"""
+    metrics = state.get("debate_metrics")
+    count = metrics.get("confidence_count") if isinstance(metrics, dict) else getattr(metrics, "confidence_count", None)
+    if count is not None:
+        return count > 0
+    return bool(state.get("credibility") or state.get("prev_credibility"))
+
+
+def verify_metrics(state: dict) -> bool:
+    """比對累計指標與 recalculate_metrics 全量重算的結果（供測試與除錯使用）"""
+    turns = [_as_turn(t) for t in state.get("debate_log", [])]
+    expected = recalculate_metrics(turns)
+    metrics = get_debate_metrics(state)
+    actual = metrics.as_state()
+    return (
+        actual["dispute_points"] == expected["dispute_points"]
+        and math.isclose(actual["credibility"], expected["credibility"])
+        and metrics.evidence == expected["evidence"]
+    )
+
+
 def append_turn(state: dict, turn: Turn) -> None:
     turns: List[Turn] = state.setdefault("debate_log", [])
+    metrics = get_debate_metrics(state)
     turns.append(turn)
-    state.update(recalculate_metrics(turns))
+    metrics.add_turn(turn)
+    # 證據庫（含各來源被引用次數）只由產生發言的 log_tool_output 記錄，此處不重複計入
+    state.update(metrics.as_state())
+
+
+def make_debate_delta(seq: int, messages: list, payload_key: Optional[str] = None) -> dict:
+    """建立只含新增訊息的事件格式：seq 為第一則訊息在 debate_messages 中的索引
+
+    payload_key 指出同一事件中哪個鍵是該回合的結構化輸出（含 confidence/evidence）。
+    """
+    delta = {"seq": seq, "messages": list(messages)}
+    if payload_key:
+        delta["payload_key"] = payload_key
+    return delta
+
+
+def _event_messages(state_delta: dict) -> Optional[tuple]:
+    """取出事件攜帶的辯論訊息，回傳 (起始索引, 訊息列表)
+
+    同時支援新的 DEBATE_DELTA_KEY 增量格式與舊版完整 debate_messages 列表。
+    """
+    delta = state_delta.get(DEBATE_DELTA_KEY)
+    if isinstance(delta, dict) and isinstance(delta.get("messages"), list):
+        return int(delta.get("seq") or 0), delta["messages"]
+    msgs = state_delta.get("debate_messages")
+    if isinstance(msgs, list):
+        return 0, msgs
+    return None
+
+
+def _event_payload(state_delta: dict):
+    delta = state_delta.get(DEBATE_DELTA_KEY)
+    if isinstance(delta, dict) and delta.get("payload_key") in state_delta:
+        return state_delta[delta["payload_key"]]
+    return next(
+        (v for k, v in state_delta.items() if k not in ("debate_messages", DEBATE_DELTA_KEY)),
+        {},
+    )
+
+
+def _turn_from_message(msg: dict, author: str, payload) -> Turn:
+    speaker = msg.get("speaker") or author
+    content = msg.get("content")
+    if isinstance(content, (dict, list)):
+        content = json.dumps(content, ensure_ascii=False)
+    confidence = payload.get("confidence") if isinstance(payload, dict) else None
+    evidence = payload.get("evidence", []) if isinstance(payload, dict) else []
+    return Turn(
+        speaker=speaker,
+        content=content or "",
+        claim=msg.get("claim"),
+        confidence=confidence,
+        evidence=evidence,
+        fallacies=msg.get("fallacies", []),
+    )
 
 
 def append_event_update(state: dict, event: Event) -> None:
@@ -40,88 +231,128 @@ def append_event_update(state: dict, event: Event) -> None:
     if not actions or not getattr(actions, "state_delta", None):
         return
     state_delta = actions.state_delta
-    msgs = state_delta.get("debate_messages")
-    if not isinstance(msgs, list):
+    found = _event_messages(state_delta)
+    if found is None:
         return
+    start, msgs = found
+    if DEBATE_DELTA_KEY in state_delta:
+        # 增量事件不再攜帶完整列表，需自行補齊 state 中的 debate_messages
+        messages = state.get("debate_messages")
+        if not isinstance(messages, list):
+            messages = state["debate_messages"] = []
+        for offset, msg in enumerate(msgs):
+            if start + offset >= len(messages):
+                messages.append(msg)
     turns: List[Turn] = state.setdefault("debate_log", [])
     seen = len(turns)
-    payload = next((v for k, v in state_delta.items() if k != "debate_messages"), {})
-    for msg in msgs[seen:]:
-        speaker = msg.get("speaker") or event.author
-        content = msg.get("content")
-        if isinstance(content, (dict, list)):
-            content = json.dumps(content, ensure_ascii=False)
-        confidence = payload.get("confidence") if isinstance(payload, dict) else None
-        evidence = payload.get("evidence", []) if isinstance(payload, dict) else []
-        turn = Turn(
-            speaker=speaker,
-            content=content or "",
-            claim=msg.get("claim"),
-            confidence=confidence,
-            evidence=evidence,
-            fallacies=msg.get("fallacies", []),
-        )
-        append_turn(state, turn)
+    payload = _event_payload(state_delta)
+    for msg in msgs[max(seen - start, 0):]:
+        append_turn(state, _turn_from_message(msg, event.author, payload))
 
 
 def initialize_debate_state(state: dict, reset: bool = True) -> None:
     if reset:
         state["debate_messages"] = []
         state["debate_log"] = []
+        state["debate_metrics"] = DebateMetrics()
         state["dispute_points"] = 0
         state["credibility"] = 0.0
         state["evidence"] = []
+        state["evidence_count"] = 0
+        state["evidence_store"] = EvidenceStore()
+        state["evidence_unique_count"] = 0
         state["prev_dispute_points"] = 0
         state["prev_credibility"] = 0.0
         state["prev_evidence_count"] = 0
+        state["novelty_score"] = 1.0
+        state["novelty"] = {}
+
+
+class _TurnIndex:
+    """單一 Session 的回合索引：只處理上次之後新增的事件，並快取 Turn 與其 JSON"""
+
+    def __init__(self) -> None:
+        self.event_count = 0
+        self.last_event_id: Optional[str] = None
+        self.turns: List[Turn] = []
+        self.dumps: List[str] = []
+        self.metrics = DebateMetrics()
+        self._export: Optional[str] = None
+
+    def matches(self, events: list) -> bool:
+        """確認 events 仍以已索引的事件為前綴（事件被刪除或替換時需重建）"""
+        if len(events) < self.event_count:
+            return False
+        if self.event_count == 0:
+            return True
+        return events[self.event_count - 1].id == self.last_event_id
+
+    def extend(self, events: list) -> None:
+        for ev in events[self.event_count:]:
+            actions = getattr(ev, "actions", None)
+            state_delta = getattr(actions, "state_delta", None) if actions else None
+            found = _event_messages(state_delta) if state_delta else None
+            if found is not None:
+                start, msgs = found
+                payload = _event_payload(state_delta)
+                for msg in msgs[max(len(self.turns) - start, 0):]:
+                    turn = _turn_from_message(msg, ev.author, payload)
+                    self.turns.append(turn)
+                    self.dumps.append(json.dumps(turn.model_dump(), ensure_ascii=False))
+                    self.metrics.add_turn(turn)
+                    self._export = None
+        self.event_count = len(events)
+        if events:
+            self.last_event_id = events[-1].id
+
+    def export(self) -> str:
+        # 與 json.dumps(list) 的預設分隔符號一致
+        if self._export is None:
+            self._export = "[" + ", ".join(self.dumps) + "]"
+        return self._export
+
+
+_TURN_INDEX: "OrderedDict[tuple, _TurnIndex]" = OrderedDict()
+
+
+def _turn_index(session: Session) -> _TurnIndex:
+    key = (session.app_name, session.user_id, session.id)
+    index = _TURN_INDEX.get(key)
+    if index is None or not index.matches(session.events):
+        index = _TurnIndex()
+    _TURN_INDEX[key] = index
+    _TURN_INDEX.move_to_end(key)
+    while len(_TURN_INDEX) > TURN_INDEX_MAX_SESSIONS:
+        _TURN_INDEX.popitem(last=False)
+    index.extend(session.events)
+    return index
+
+
+def clear_turn_index(session: Optional[Session] = None) -> None:
+    """清除回合索引快取；未指定 session 時清除全部"""
+    if session is None:
+        _TURN_INDEX.clear()
+    else:
+        _TURN_INDEX.pop((session.app_name, session.user_id, session.id), None)
 
 
 def _turns_from_session(session: Session) -> List[Turn]:
-    turns: List[Turn] = []
-    seen = 0
-    for ev in session.events:
-        actions = getattr(ev, "actions", None)
-        if not actions or not getattr(actions, "state_delta", None):
-            continue
-        state_delta = actions.state_delta
-        msgs = state_delta.get("debate_messages")
-        if not isinstance(msgs, list):
-            continue
-        while seen < len(msgs):
-            msg = msgs[seen]
-            speaker = msg.get("speaker") or ev.author
-            content = msg.get("content")
-            if isinstance(content, (dict, list)):
-                content = json.dumps(content, ensure_ascii=False)
-            payload = next((v for k, v in state_delta.items() if k != "debate_messages"), {})
-            confidence = payload.get("confidence") if isinstance(payload, dict) else None
-            evidence = payload.get("evidence", []) if isinstance(payload, dict) else []
-            turn = Turn(
-                speaker=speaker,
-                content=content or "",
-                claim=msg.get("claim"),
-                confidence=confidence,
-                evidence=evidence,
-                fallacies=msg.get("fallacies", []),
-            )
-            turns.append(turn)
-            seen += 1
-    return turns
+    return list(_turn_index(session).turns)
 
 
 def update_state_from_session(state: dict, session: Session) -> None:
-    turns = _turns_from_session(session)
-    state["debate_log"] = turns
-    state.update(recalculate_metrics(turns))
+    index = _turn_index(session)
+    metrics = index.metrics.clone()
+    state["debate_log"] = list(index.turns)
+    state["debate_metrics"] = metrics
+    state.update(metrics.as_state())
 
 
 def export_debate_log(session: Session) -> str:
-    turns = _turns_from_session(session)
-    data = [t.model_dump() for t in turns]
-    return json.dumps(data, ensure_ascii=False)
+    return _turn_index(session).export()
 
 
-def export_session(session: Session) -> dict:
+def scoped_state(session: Session) -> dict:
     state_scoped = {"app": {}, "user": {}, "shared": {}}
     for key, value in session.state.items():
         if key.startswith("app:"):
@@ -130,15 +361,121 @@ def export_session(session: Session) -> dict:
             state_scoped["user"][key[5:]] = value
         else:
             state_scoped["shared"][key] = value
+    return state_scoped
+
+
+def session_header(session: Session) -> dict:
+    return {
+        "id": session.id,
+        "app_name": session.app_name,
+        "user_id": session.user_id,
+        "last_update_time": session.last_update_time,
+    }
+
+
+def export_session(session: Session) -> dict:
     events = [ev.model_dump() for ev in session.events]
     return {
-        "session": {
-            "id": session.id,
-            "app_name": session.app_name,
-            "user_id": session.user_id,
-            "last_update_time": session.last_update_time,
-        },
-        "state": state_scoped,
+        "session": session_header(session),
+        "state": scoped_state(session),
         "events": events,
     }
 
+
+class _ExportCursor:
+    """串流匯出的進度：已寫入的事件數、最後一筆事件 id 與事件檔大小"""
+
+    __slots__ = ("events_path", "flushed", "last_event_id", "events_bytes")
+
+    def __init__(self, events_path: str, flushed: int = 0, last_event_id=None, events_bytes: int = 0):
+        self.events_path = events_path
+        self.flushed = flushed
+        self.last_event_id = last_event_id
+        self.events_bytes = events_bytes
+
+    def valid_for(self, events: list) -> bool:
+        """事件檔未被外部改動，且 Session 事件仍以已寫入的事件為前綴"""
+        if not os.path.exists(self.events_path):
+            return False
+        if os.path.getsize(self.events_path) != self.events_bytes:
+            return False
+        if len(events) < self.flushed:
+            return False
+        return self.flushed == 0 or events[self.flushed - 1].id == self.last_event_id
+
+
+_EXPORT_CURSORS: "OrderedDict[str, _ExportCursor]" = OrderedDict()
+
+
+def stream_export_paths(path: str, compress: bool = False) -> tuple[str, str]:
+    """回傳 (state 快照路徑, 事件 JSONL 路徑)，如 debate_log.json -> debate_log.events.jsonl"""
+    base = path[:-3] if path.endswith(".gz") else path
+    stem = base[:-5] if base.endswith(".json") else base
+    suffix = ".gz" if compress else ""
+    return base + suffix, f"{stem}.events.jsonl{suffix}"
+
+
+def _load_cursor(snapshot_path: str, events_path: str) -> Optional[_ExportCursor]:
+    cursor = _EXPORT_CURSORS.get(os.path.abspath(snapshot_path))
+    if cursor is not None and cursor.events_path == events_path:
+        return cursor
+    # 新的程序：從上次的快照讀回進度
+    if not os.path.exists(snapshot_path):
+        return None
+    try:
+        with open_text(snapshot_path) as f:
+            info = json.load(f).get("export") or {}
+    except (OSError, ValueError):
+        return None
+    return _ExportCursor(
+        events_path,
+        int(info.get("events_count") or 0),
+        info.get("last_event_id"),
+        int(info.get("events_bytes") or 0),
+    )
+
+
+def export_session_stream(
+    session: Session, path: str, compact: bool = False, compress: bool = False
+) -> dict:
+    """以 JSON Lines 串流匯出 Session，記憶體用量與事件總數無關
+
+    事件逐筆序列化並只附加上次之後新增的部分；state 快照（含 session 資訊與
+    匯出進度）以暫存檔 + os.replace 原子替換。若事件檔被改動或 Session 事件
+    被重寫，會整份重寫事件檔。
+    """
+    snapshot_path, events_path = stream_export_paths(path, compress)
+    key = os.path.abspath(snapshot_path)
+    events = session.events
+    cursor = _load_cursor(snapshot_path, events_path)
+    rewritten = cursor is None or not cursor.valid_for(events)
+    start = 0 if rewritten else cursor.flushed
+    records = (ev.model_dump(mode="json") for ev in events[start:])
+    if rewritten:
+        appended = write_jsonl(events_path, records, compress=compress)
+    else:
+        appended = append_jsonl(events_path, records, compress=compress)
+    cursor = _ExportCursor(
+        events_path,
+        len(events),
+        events[-1].id if events else None,
+        os.path.getsize(events_path),
+    )
+    info = {
+        "format": "jsonl",
+        "events_file": os.path.basename(events_path),
+        "events_count": cursor.flushed,
+        "last_event_id": cursor.last_event_id,
+        "events_bytes": cursor.events_bytes,
+    }
+    write_json_file(
+        snapshot_path,
+        {"session": session_header(session), "state": scoped_state(session), "export": info},
+        compact=compact,
+        compress=compress,
+    )
+    _EXPORT_CURSORS[key] = cursor
+    _EXPORT_CURSORS.move_to_end(key)
+    while len(_EXPORT_CURSORS) > TURN_INDEX_MAX_SESSIONS:
+        _EXPORT_CURSORS.popitem(last=False)
+    return {"snapshot": snapshot_path, "events": events_path, "appended": appended, "rewritten": rewritten, **info}
@@ -1,5 +1,11 @@
-from typing import Optional
-from pydantic import BaseModel
+import hashlib
+import json
+import re
+import unicodedata
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from pydantic import BaseModel, Field
 
 
 class Evidence(BaseModel):
@@ -27,3 +33,244 @@ def curator_result_to_evidence(result, claim: str, warrant: str,
         risk=risk,
         confidence=confidence,
     )
+
+
+# ---- 證據庫：以正規化來源去重，並建立主張 → 證據的反向索引 ----
+
+# 正規化時移除的追蹤參數
+TRACKING_PARAMS = frozenset({"fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid", "ref", "ref_src", "spm"})
+
+# 陪審團／整合者證據摘要的預設上限
+DIGEST_LIMIT = 12
+DIGEST_BUDGETS: dict[str, int] = {"jury": 800, "synthesizer": 1000}
+DIGEST_LINE_CHARS = 120
+
+
+def canonical_source(source: str) -> str:
+    """來源正規化：網址統一 scheme/主機大小寫、去除 www、預設埠、片段、追蹤參數與結尾斜線；
+    非網址來源則以小寫並壓縮空白後的文字作為鍵
+    """
+    text = " ".join(str(source or "").split())
+    parts = urlsplit(text)
+    if parts.scheme.lower() not in ("http", "https") or not parts.hostname:
+        return text.casefold()
+    host = parts.hostname.lower().removeprefix("www.").removeprefix("m.")
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/")
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def claim_key(claim: str) -> str:
+    return " ".join(str(claim or "").split()).casefold()
+
+
+# 數字內的小數點與分隔符號（5.0、1,000、2023/05）
+_NUMBER_SEPARATOR = re.compile(r"(?<=\d)[.,:/\-](?=\d)")
+# 與中日韓文字相鄰的空白（中文主張的空白位置不固定）
+_CJK_SPACE = re.compile(r"(?<=[\u3400-\u9fff\uf900-\ufaff]) | (?=[\u3400-\u9fff\uf900-\ufaff])")
+
+
+def normalize_claim(claim: str) -> str:
+    """主張比對用的正規化（結果快取與離線評估共用）：全半形統一、忽略大小寫、
+    移除標點並壓縮空白，但保留數字內的小數點、分隔符號與 %，且只移除與中文相鄰的空白，
+    「5.0%」與「50%」、「2.3千萬」與「23千萬」不會得到相同的鍵
+    """
+    text = unicodedata.normalize("NFKC", str(claim or "")).casefold()
+    kept = {m.start() for m in _NUMBER_SEPARATOR.finditer(text)}
+    text = "".join(
+        " " if unicodedata.category(ch).startswith("P") and ch != "%" and i not in kept else ch
+        for i, ch in enumerate(text)
+    )
+    return _CJK_SPACE.sub("", " ".join(text.split()))
+
+
+class EvidenceStore(BaseModel):
+    """以正規化來源去重的證據庫（存於 state['evidence_store']）
+
+    - items：正規化來源 → 第一次出現的 Evidence
+    - claims：主張 → {正規化來源: 引用次數}，作為反向索引
+    - mentions / cited_by：每個來源的引用次數與引用者
+    - total：加入的證據總數（含重複），unique 數即 len(items)
+    """
+
+    items: Dict[str, Evidence] = Field(default_factory=dict)
+    claims: Dict[str, Dict[str, int]] = Field(default_factory=dict)
+    claim_text: Dict[str, str] = Field(default_factory=dict)
+    mentions: Dict[str, int] = Field(default_factory=dict)
+    cited_by: Dict[str, List[str]] = Field(default_factory=dict)
+    ingested: Dict[str, str] = Field(default_factory=dict)
+    total: int = 0
+
+    @property
+    def unique_count(self) -> int:
+        return len(self.items)
+
+    def add(self, evidence, origin: Optional[str] = None) -> bool:
+        """加入一筆證據，回傳是否為新的來源（O(1) 去重）"""
+        if not isinstance(evidence, Evidence):
+            evidence = Evidence.model_validate(evidence)
+        key = canonical_source(evidence.source) or claim_key(evidence.claim)
+        if not key:
+            return False
+        self.total += 1
+        is_new = key not in self.items
+        if is_new:
+            self.items[key] = evidence
+        self.mentions[key] = self.mentions.get(key, 0) + 1
+        if origin:
+            origins = self.cited_by.setdefault(key, [])
+            if origin not in origins:
+                origins.append(origin)
+        ck = claim_key(evidence.claim)
+        if ck:
+            self.claim_text.setdefault(ck, evidence.claim)
+            index = self.claims.setdefault(ck, {})
+            index[key] = index.get(key, 0) + 1
+        return is_new
+
+    def add_many(self, items, origin: Optional[str] = None) -> int:
+        """加入多筆證據，回傳新增的相異來源數"""
+        added = 0
+        for item in items or []:
+            try:
+                added += self.add(item, origin)
+            except ValueError:
+                continue
+        return added
+
+    def for_claim(self, claim: str) -> List[Evidence]:
+        return [self.items[key] for key in self.claims.get(claim_key(claim), {})]
+
+    def ranked(self) -> List[str]:
+        """依引用次數（多者優先）排序的來源鍵；同次數維持先出現者在前"""
+        order = {key: i for i, key in enumerate(self.items)}
+        return sorted(self.items, key=lambda key: (-self.mentions.get(key, 0), order[key]))
+
+    def stats(self) -> dict:
+        return {
+            "unique": self.unique_count,
+            "total": self.total,
+            "duplicates": self.total - self.unique_count,
+            "claims": len(self.claims),
+        }
+
+
+def get_evidence_store(state) -> EvidenceStore:
+    """取得 state 中的證據庫；若為序列化後的 dict 則還原，不存在時由 state['evidence'] 建立"""
+    store = state.get("evidence_store")
+    if isinstance(store, EvidenceStore):
+        return store
+    if isinstance(store, dict):
+        store = EvidenceStore.model_validate(store)
+    else:
+        store = EvidenceStore()
+        store.add_many(state.get("evidence") or [])
+    return store
+
+
+def record_evidence(state, items, origin: Optional[str] = None) -> int:
+    """將證據加入 state 中的證據庫並更新 evidence_unique_count，回傳新增的相異來源數
+
+    以重新指定鍵值的方式寫回，確保 ADK State 會記錄此變更。
+    """
+    store = get_evidence_store(state)
+    added = store.add_many(items, origin)
+    state["evidence_store"] = store
+    state["evidence_unique_count"] = store.unique_count
+    return added
+
+
+def ingest_once(state, key: str, items, origin: Optional[str] = None) -> int:
+    """同一個 state 鍵的內容只匯入一次（供多個代理讀取同一份查核結果時避免重複計數）"""
+    store = get_evidence_store(state)
+    fingerprint = hashlib.sha256(
+        json.dumps(items, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+    if store.ingested.get(key) == fingerprint:
+        return 0
+    store.ingested[key] = fingerprint
+    state["evidence_store"] = store
+    return record_evidence(state, items, origin)
+
+
+def unique_evidence_count(state) -> int:
+    """相異證據來源數：優先使用證據庫，否則對 state['evidence'] 去重計算"""
+    store = state.get("evidence_store")
+    if isinstance(store, EvidenceStore):
+        return store.unique_count
+    if isinstance(store, dict):
+        return len(store.get("items") or {})
+    keys = set()
+    for ev in state.get("evidence") or []:
+        source = ev.source if isinstance(ev, Evidence) else (ev or {}).get("source", "")
+        claim = ev.claim if isinstance(ev, Evidence) else (ev or {}).get("claim", "")
+        keys.add(canonical_source(source) or claim_key(claim))
+    keys.discard("")
+    return len(keys)
+
+
+def _checked_evidence(checked) -> list:
+    """由 EvidenceCheckOutput（checked_claims[].evidences）取出證據"""
+    if hasattr(checked, "model_dump"):
+        checked = checked.model_dump()
+    if not isinstance(checked, dict):
+        return []
+    return [ev for item in checked.get("checked_claims") or [] if isinstance(item, dict) for ev in item.get("evidences") or []]
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(str(text or "").split())
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+def build_evidence_digest(store: EvidenceStore, limit: int = DIGEST_LIMIT, budget: Optional[int] = None) -> str:
+    """去重後的證據摘要：依引用次數取前 limit 個來源，每個來源一行，並受 token 預算限制"""
+    from .context import estimate_tokens
+
+    lines: List[str] = []
+    used = 0
+    for key in store.ranked()[:limit]:
+        ev = store.items[key]
+        origins = ",".join(store.cited_by.get(key, []))
+        meta = f"x{store.mentions.get(key, 1)}" + (f" {origins}" if origins else "")
+        line = f"- [{meta}] {_clip(ev.claim, 60)} — {_clip(ev.warrant, DIGEST_LINE_CHARS - 60)} ({ev.source})"
+        cost = estimate_tokens(line)
+        if budget is not None and used + cost > budget:
+            break
+        lines.append(line)
+        used += cost
+    omitted = store.unique_count - len(lines)
+    if omitted > 0:
+        lines.append(f"- （另有 {omitted} 個來源未列出）")
+    return "\n".join(lines)
+
+
+def evidence_digest_key(agent_name: str) -> str:
+    return f"evidence_digest_{agent_name}"
+
+
+def make_evidence_digest_callback(agent_name: str, include_checked: bool = False, limit: int = DIGEST_LIMIT):
+    """before_agent_callback：寫入 state['evidence_digest_<代理>']
+
+    include_checked 時先匯入 Evidence 查核代理的 state['evidence_checked']。
+    """
+    budget = DIGEST_BUDGETS.get(agent_name)
+
+    def _callback(callback_context=None, **_):
+        if callback_context is None:
+            return None
+        state = callback_context.state
+        if include_checked and state.get("evidence_checked") is not None:
+            ingest_once(state, "evidence_checked", _checked_evidence(state.get("evidence_checked")), "evidence")
+        store = get_evidence_store(state)
+        state[evidence_digest_key(agent_name)] = build_evidence_digest(store, limit, budget) or "（無）"
+        state["evidence_stats"] = store.stats()
+        return None
+
+    return _callback
@@ -1,7 +1,10 @@
 from __future__ import annotations
 from pathlib import Path
+import base64
+import gzip
 import json
-from typing import Any
+import os
+from typing import IO, Any, Iterable, Iterator, Optional
 
 
 def ensure_parent_dir(path: str) -> None:
@@ -9,9 +12,96 @@ def ensure_parent_dir(path: str) -> None:
     p.parent.mkdir(parents=True, exist_ok=True)
 
 
-def write_json_file(path: str, data: Any) -> None:
+def is_gzip_path(path: str) -> bool:
+    return str(path).endswith(".gz")
+
+
+def open_text(path: str, mode: str = "r", compress: Optional[bool] = None) -> IO[str]:
+    """以 UTF-8 文字模式開檔；compress 未指定時依副檔名 .gz 判斷是否使用 gzip"""
+    if compress is None:
+        compress = is_gzip_path(path)
+    if compress:
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def json_default(value: Any) -> Any:
+    """json.dump 無法直接序列化的值：pydantic 模型、集合與 bytes"""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode("ascii")
+    return str(value)
+
+
+def dumps_line(record: Any) -> str:
+    """單行緊湊 JSON（JSON Lines 使用）"""
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=json_default)
+
+
+def _tmp_path(p: Path) -> Path:
+    return p.with_name(f".{p.name}.{os.getpid()}.tmp")
+
+
+def _replace_atomic(path: str, write) -> None:
+    """先寫入同目錄暫存檔再 os.replace，讀取端不會看到寫到一半的檔案"""
     ensure_parent_dir(path)
     p = Path(path)
-    with p.open("w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    tmp = _tmp_path(p)
+    try:
+        write(tmp)
+        os.replace(tmp, p)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def write_json_file(
+    path: str, data: Any, compact: bool = False, compress: Optional[bool] = None
+) -> None:
+    """寫入 JSON 檔（原子替換）；compact 時不縮排，compress 時以 gzip 壓縮"""
+
+    def _write(tmp: Path) -> None:
+        with open_text(str(tmp), "w", compress=is_gzip_path(path) if compress is None else compress) as f:
+            if compact:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"), default=json_default)
+            else:
+                json.dump(data, f, ensure_ascii=False, indent=2, default=json_default)
+
+    _replace_atomic(path, _write)
+
+
+def append_jsonl(path: str, records: Iterable[Any], compress: Optional[bool] = None) -> int:
+    """逐筆附加到 JSON Lines 檔，回傳寫入筆數
+
+    gzip 以附加新 member 的方式寫入，gzip.open 讀取時會自動串接。
+    """
+    ensure_parent_dir(path)
+    count = 0
+    with open_text(path, "a", compress=compress) as f:
+        for record in records:
+            f.write(dumps_line(record))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def write_jsonl(path: str, records: Iterable[Any], compress: Optional[bool] = None) -> int:
+    """重寫整個 JSON Lines 檔（原子替換），回傳寫入筆數"""
+    count = 0
+
+    def _write(tmp: Path) -> None:
+        nonlocal count
+        count = append_jsonl(str(tmp), records, compress=is_gzip_path(path) if compress is None else compress)
+
+    _replace_atomic(path, _write)
+    return count
+
 
+def read_jsonl(path: str, compress: Optional[bool] = None) -> Iterator[Any]:
+    with open_text(path, "r", compress=compress) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
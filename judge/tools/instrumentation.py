@@ -0,0 +1,409 @@
+"""執行量測：以 before/after 回呼記錄各代理、工具、模型呼叫與迴圈回合的耗時、token 與成本。
+
+`install_instrumentation(root_agent)` 走訪代理樹（含 AgentTool 包裝的代理），在既有
+回呼（make_record_callback、log_tool_output 等）旁加入量測回呼；未安裝時完全沒有額外開銷。
+一次執行中的量測集中於 Collector（以 contextvar 在並行階段與 AgentTool 子執行間共享），
+根代理結束時將摘要寫入 state['instrumentation']。span 以 invocation id 與代理為鍵，
+同一代理物件在不同 Session 或 AgentTool 子執行中同時執行時不會配錯；模型 span 的成本
+以 judge.agents.budget 的預設單價計算。
+
+匯出格式：
+- summary()：JSON 摘要（各代理/工具耗時、token、成本、搜尋次數、重試次數、迴圈回合）
+- to_prometheus(summary)：Prometheus 文字格式
+- write_otel_spans(path)：OpenTelemetry（OTLP JSON）spans，每次執行附加一行
+
+環境變數：
+- JUDGE_INSTRUMENTATION：設為 1 時，judge.agent 會為 root_agent 安裝量測
+- JUDGE_OTEL_SPANS：設定時，每次執行結束將 spans 附加寫入此檔案
+"""
+
+from __future__ import annotations
+
+import contextvars
+import json
+import os
+import secrets
+import time
+from collections import defaultdict
+from typing import Any, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent, LoopAgent
+from google.adk.tools.agent_tool import AgentTool
+
+from judge.agents.budget import DEFAULT_INPUT_PRICE, DEFAULT_OUTPUT_PRICE
+
+from .file_io import ensure_parent_dir
+
+
+SEARCH_TOOL_NAMES = {"search_web", "google_search"}
+
+_CURRENT: contextvars.ContextVar[Optional["Collector"]] = contextvars.ContextVar(
+    "judge_instrumentation", default=None
+)
+_LAST: dict[str, "Collector"] = {}
+
+
+class Span:
+    __slots__ = ("name", "kind", "span_id", "parent_id", "start", "end", "attributes")
+
+    def __init__(self, name: str, kind: str, parent_id: Optional[str], attributes: Optional[dict] = None):
+        self.name = name
+        self.kind = kind
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start = time.time_ns()
+        self.end: Optional[int] = None
+        self.attributes = attributes or {}
+
+    @property
+    def seconds(self) -> float:
+        return ((self.end or time.time_ns()) - self.start) / 1e9
+
+
+class Collector:
+    """單次執行（一個 Session 的一次 root_agent 執行）的量測資料"""
+
+    def __init__(self, session_id: str = "") -> None:
+        self.session_id = session_id
+        self.trace_id = secrets.token_hex(16)
+        self.spans: list[Span] = []
+        self._open: dict[tuple, list[Span]] = defaultdict(list)
+        self.search_calls = 0
+        self.retries = 0
+        self.loop_iterations: dict[str, list[float]] = defaultdict(list)
+        self._loop_started: dict[str, float] = {}
+
+    def _parent(self, parent_keys: tuple) -> Optional[str]:
+        # 由近至遠找第一個仍在執行的上層（被 DagPipelineAgent 攤平的容器不會執行）
+        for k in parent_keys:
+            if self._open.get(k):
+                return self._open[k][-1].span_id
+        # AgentTool 的子執行有自己的 invocation id：改找任一 invocation 中最近開始的同一上層
+        for k in parent_keys:
+            stacks = [s for other, s in self._open.items() if s and other[0] == k[0] and other[2:] == k[2:]]
+            if stacks:
+                return max((s[-1] for s in stacks), key=lambda span: span.start).span_id
+        return None
+
+    def begin(self, key: tuple, name: str, kind: str, parent_keys: tuple = (), **attributes) -> Span:
+        span = Span(name, kind, self._parent(parent_keys), attributes)
+        self._open[key].append(span)
+        self.spans.append(span)
+        return span
+
+    def finish(self, key: tuple, **attributes) -> Optional[Span]:
+        stack = self._open.get(key)
+        if not stack:
+            return None
+        span = stack.pop()
+        span.end = time.time_ns()
+        span.attributes.update(attributes)
+        return span
+
+    def loop_tick(self, loop_name: str, final: bool = False) -> None:
+        now = time.perf_counter()
+        started = self._loop_started.pop(loop_name, None)
+        if started is not None:
+            self.loop_iterations[loop_name].append(now - started)
+        if not final:
+            self._loop_started[loop_name] = now
+
+    def summary(self) -> dict:
+        agents: dict[str, dict] = {}
+        tools: dict[str, dict] = {}
+        for span in self.spans:
+            if span.end is None:
+                continue
+            if span.kind == "tool":
+                entry = tools.setdefault(span.name, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0})
+                entry["calls"] += 1
+                entry["seconds"] += span.seconds
+                entry["max_seconds"] = max(entry["max_seconds"], span.seconds)
+                continue
+            agent = span.attributes.get("agent", span.name)
+            entry = agents.setdefault(
+                agent,
+                {"runs": 0, "seconds": 0.0, "max_seconds": 0.0, "model_calls": 0, "model_seconds": 0.0,
+                 "input_tokens": 0, "output_tokens": 0, "cost": 0.0},
+            )
+            if span.kind == "agent":
+                entry["runs"] += 1
+                entry["seconds"] += span.seconds
+                entry["max_seconds"] = max(entry["max_seconds"], span.seconds)
+            elif span.kind == "model":
+                entry["model_calls"] += 1
+                entry["model_seconds"] += span.seconds
+                entry["input_tokens"] += span.attributes.get("input_tokens", 0)
+                entry["output_tokens"] += span.attributes.get("output_tokens", 0)
+                entry["cost"] += span.attributes.get("cost", 0.0)
+        ends = [s.end for s in self.spans if s.end is not None]
+        return {
+            "session_id": self.session_id,
+            "wall_seconds": (max(ends) - min(s.start for s in self.spans)) / 1e9 if ends else 0.0,
+            "input_tokens": sum(a["input_tokens"] for a in agents.values()),
+            "output_tokens": sum(a["output_tokens"] for a in agents.values()),
+            "cost": round(sum(a["cost"] for a in agents.values()), 6),
+            "search_calls": self.search_calls,
+            "retries": self.retries,
+            "agents": agents,
+            "tools": tools,
+            "loops": {
+                name: {"iterations": len(durations), "seconds": durations}
+                for name, durations in self.loop_iterations.items()
+            },
+        }
+
+    def otel_payload(self) -> dict:
+        """OTLP JSON（ExportTraceServiceRequest）格式"""
+
+        def attr(key: str, value: Any) -> dict:
+            if isinstance(value, bool):
+                return {"key": key, "value": {"boolValue": value}}
+            if isinstance(value, int):
+                return {"key": key, "value": {"intValue": str(value)}}
+            if isinstance(value, float):
+                return {"key": key, "value": {"doubleValue": value}}
+            return {"key": key, "value": {"stringValue": str(value)}}
+
+        spans = [
+            {
+                "traceId": self.trace_id,
+                "spanId": s.span_id,
+                **({"parentSpanId": s.parent_id} if s.parent_id else {}),
+                "name": f"{s.kind} {s.name}",
+                "kind": 1,
+                "startTimeUnixNano": str(s.start),
+                "endTimeUnixNano": str(s.end or s.start),
+                "attributes": [attr("judge.kind", s.kind)]
+                + [attr(f"judge.{k}", v) for k, v in s.attributes.items()],
+            }
+            for s in self.spans
+        ]
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [attr("service.name", "agent_judge"), attr("session.id", self.session_id)]},
+                    "scopeSpans": [{"scope": {"name": "judge.tools.instrumentation"}, "spans": spans}],
+                }
+            ]
+        }
+
+
+def current_collector(callback_context=None) -> Collector:
+    collector = _CURRENT.get()
+    if collector is None:
+        session = getattr(getattr(callback_context, "_invocation_context", None), "session", None)
+        collector = Collector(getattr(session, "id", ""))
+        _CURRENT.set(collector)
+    return collector
+
+
+def last_summary(session_id: Optional[str] = None) -> Optional[dict]:
+    """回傳最近一次（或指定 Session）完成執行的摘要"""
+    if session_id is not None:
+        collector = _LAST.get(session_id)
+    else:
+        collector = next(reversed(_LAST.values()), None)
+    return collector.summary() if collector else None
+
+
+def to_prometheus(summary: dict, prefix: str = "judge") -> str:
+    """將摘要轉為 Prometheus 文字格式"""
+    lines: list[str] = []
+
+    def metric(name: str, kind: str, help_text: str, samples: list[tuple[dict, float]]) -> None:
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        for labels, value in samples:
+            label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+            lines.append(f"{prefix}_{name}{{{label_text}}} {value}" if label_text else f"{prefix}_{name} {value}")
+
+    agents = summary.get("agents", {})
+    metric("agent_runs_total", "counter", "Agent runs.", [({"agent": a}, v["runs"]) for a, v in agents.items()])
+    metric("agent_seconds_total", "counter", "Agent wall time in seconds.",
+           [({"agent": a}, round(v["seconds"], 6)) for a, v in agents.items()])
+    metric("model_calls_total", "counter", "Model calls.", [({"agent": a}, v["model_calls"]) for a, v in agents.items()])
+    metric("model_seconds_total", "counter", "Model call time in seconds.",
+           [({"agent": a}, round(v["model_seconds"], 6)) for a, v in agents.items()])
+    metric("tokens_total", "counter", "Model tokens.",
+           [({"agent": a, "direction": "input"}, v["input_tokens"]) for a, v in agents.items()]
+           + [({"agent": a, "direction": "output"}, v["output_tokens"]) for a, v in agents.items()])
+    metric("cost_usd_total", "counter", "Estimated model cost in USD.",
+           [({"agent": a}, round(v.get("cost", 0.0), 6)) for a, v in agents.items()])
+    tools = summary.get("tools", {})
+    metric("tool_calls_total", "counter", "Tool calls.", [({"tool": t}, v["calls"]) for t, v in tools.items()])
+    metric("tool_seconds_total", "counter", "Tool time in seconds.",
+           [({"tool": t}, round(v["seconds"], 6)) for t, v in tools.items()])
+    metric("loop_iterations_total", "counter", "Loop iterations.",
+           [({"loop": l}, v["iterations"]) for l, v in summary.get("loops", {}).items()])
+    metric("search_calls_total", "counter", "Search tool calls.", [({}, summary.get("search_calls", 0))])
+    metric("retries_total", "counter", "Schema repair retries.", [({}, summary.get("retries", 0))])
+    metric("wall_seconds", "gauge", "Pipeline wall time in seconds.", [({}, round(summary.get("wall_seconds", 0.0), 6))])
+    return "\n".join(lines) + "\n"
+
+
+def write_otel_spans(path: str, collector: Collector) -> None:
+    """以 OTLP JSON Lines 格式附加寫入一次執行的 spans"""
+    ensure_parent_dir(path)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(collector.otel_payload(), ensure_ascii=False) + "\n")
+
+
+# --------------------------- 回呼安裝 ---------------------------
+
+_MARK = "_judge_instrumentation"
+
+
+def _marked(fn):
+    setattr(fn, _MARK, True)
+    return fn
+
+
+def _prepend(existing, callback):
+    callbacks = existing if isinstance(existing, list) else ([existing] if existing else [])
+    return [callback] + [cb for cb in callbacks if not getattr(cb, _MARK, False)]
+
+
+def _invocation(context) -> str:
+    return getattr(context, "invocation_id", None) or ""
+
+
+def model_cost(input_tokens: int, output_tokens: int) -> float:
+    """以預設單價（美元 / 1K tokens）估算一次模型呼叫的成本"""
+    return (input_tokens * DEFAULT_INPUT_PRICE + output_tokens * DEFAULT_OUTPUT_PRICE) / 1000
+
+
+def _agent_callbacks(agent: BaseAgent, ancestors: tuple, is_root: bool, retry: bool,
+                     loop: Optional[BaseAgent]):
+    def keys(callback_context) -> tuple[tuple, tuple]:
+        invocation = _invocation(callback_context)
+        return ("agent", invocation, id(agent)), tuple(("agent", invocation, id(a)) for a in reversed(ancestors))
+
+    def before(callback_context=None, **_):
+        if is_root:
+            session = getattr(getattr(callback_context, "_invocation_context", None), "session", None)
+            _CURRENT.set(Collector(getattr(session, "id", "")))
+        collector = current_collector(callback_context)
+        if retry:
+            collector.retries += 1
+        if loop is not None:
+            collector.loop_tick(loop.name)
+        key, parent_keys = keys(callback_context)
+        collector.begin(key, agent.name, "agent", parent_keys, agent=agent.name)
+        return None
+
+    def after(callback_context=None, **_):
+        collector = current_collector(callback_context)
+        collector.finish(keys(callback_context)[0])
+        if isinstance(agent, LoopAgent):
+            collector.loop_tick(agent.name, final=True)
+        if is_root and callback_context is not None:
+            summary = collector.summary()
+            callback_context.state["instrumentation"] = summary
+            _LAST[collector.session_id] = collector
+            while len(_LAST) > 64:
+                _LAST.pop(next(iter(_LAST)))
+            path = os.getenv("JUDGE_OTEL_SPANS")
+            if path:
+                write_otel_spans(path, collector)
+        return None
+
+    return _marked(before), _marked(after)
+
+
+def _model_callbacks(agent: LlmAgent):
+    def before(callback_context=None, llm_request=None, **_):
+        invocation = _invocation(callback_context)
+        current_collector(callback_context).begin(
+            ("model", invocation, id(agent)), agent.name, "model", (("agent", invocation, id(agent)),), agent=agent.name
+        )
+        return None
+
+    def after(callback_context=None, llm_response=None, **_):
+        usage = getattr(llm_response, "usage_metadata", None)
+        input_tokens = getattr(usage, "prompt_token_count", None) or 0
+        output_tokens = getattr(usage, "candidates_token_count", None) or 0
+        current_collector(callback_context).finish(
+            ("model", _invocation(callback_context), id(agent)),
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cost=round(model_cost(input_tokens, output_tokens), 8),
+        )
+        return None
+
+    return _marked(before), _marked(after)
+
+
+def _tool_callbacks(agent: BaseAgent):
+    def key(tool, tool_context) -> tuple:
+        # 同一次模型回應可平行呼叫多個工具：再以 function_call_id 區分
+        call_id = getattr(tool_context, "function_call_id", None) or ""
+        return ("tool", _invocation(tool_context), id(agent), tool.name, call_id)
+
+    def before(tool=None, args=None, tool_context=None, **_):
+        collector = current_collector(tool_context)
+        if tool.name in SEARCH_TOOL_NAMES:
+            collector.search_calls += 1
+        parent_keys = (("agent", _invocation(tool_context), id(agent)),)
+        collector.begin(key(tool, tool_context), tool.name, "tool", parent_keys, agent=agent.name)
+        return None
+
+    def after(tool=None, args=None, tool_context=None, **_):
+        current_collector(tool_context).finish(key(tool, tool_context))
+        return None
+
+    return _marked(before), _marked(after)
+
+
+def install_instrumentation(root: BaseAgent) -> int:
+    """為代理樹安裝量測回呼（可重複呼叫，不會重複安裝），回傳安裝的代理數
+
+    需在其他程式改寫回呼（如 bind_session）之後再次呼叫，以保留量測回呼。
+    """
+    from judge.agents.structured import StructuredToolAgent
+
+    stack: list[tuple[BaseAgent, tuple, bool]] = [(root, (), False)]
+    seen: set[int] = set()
+    while stack:
+        agent, ancestors, retry = stack.pop()
+        if id(agent) in seen:
+            continue
+        seen.add(id(agent))
+        parent = ancestors[-1] if ancestors else None
+        loop = parent if isinstance(parent, LoopAgent) and parent.sub_agents[0] is agent else None
+        before, after = _agent_callbacks(agent, ancestors, agent is root, retry, loop)
+        lineage = ancestors + (agent,)
+        agent.before_agent_callback = _prepend(agent.before_agent_callback, before)
+        # after 回呼遇到非 None 回傳值即停止，量測回呼放在最前面以確保執行
+        agent.after_agent_callback = _prepend(agent.after_agent_callback, after)
+        if isinstance(agent, LlmAgent):
+            before, after = _model_callbacks(agent)
+            agent.before_model_callback = _prepend(agent.before_model_callback, before)
+            agent.after_model_callback = _prepend(agent.after_model_callback, after)
+        # 工具回呼與 AgentTool 也適用於非 LLM 的工具代理（如 DirectExecutor）
+        tools = getattr(agent, "tools", None) or []
+        if tools and hasattr(agent, "after_tool_callback"):
+            before, after = _tool_callbacks(agent)
+            agent.before_tool_callback = _prepend(agent.before_tool_callback, before)
+            agent.after_tool_callback = _prepend(agent.after_tool_callback, after)
+        stack.extend((t.agent, lineage, False) for t in tools if isinstance(t, AgentTool))
+        for index, sub in enumerate(agent.sub_agents):
+            # StructuredToolAgent 的第二個子代理（schema 驗證者）僅在本地驗證失敗時執行，計為重試
+            stack.append((sub, lineage, isinstance(agent, StructuredToolAgent) and index == 1))
+    return len(seen)
+
+
+def instrumentation_enabled() -> bool:
+    return os.getenv("JUDGE_INSTRUMENTATION", "").lower() in ("1", "true", "yes")
+
+
+__all__ = [
+    "Collector",
+    "current_collector",
+    "install_instrumentation",
+    "instrumentation_enabled",
+    "last_summary",
+    "model_cost",
+    "to_prometheus",
+    "write_otel_spans",
+]
@@ -0,0 +1,269 @@
+"""可替換的模型後端：離線、可重現的 FakeLlm 與套用到整棵代理樹的安裝函式。
+
+各代理建構時固定使用 "gemini-2.5-flash"；`install_model_backend` 會走訪代理樹
+（含 AgentTool 包裝的代理），以工廠函式為每個 LlmAgent 換上指定的模型實例。
+
+- FakeLlm：依 output_schema 產生通過驗證的輸出（或回傳預錄內容），可注入延遲；
+  有工具可用時先發出一次函式呼叫，收到回應後再輸出最終結果
+- StructuredToolAgent 的工具執行者會沿用驗證者的 schema，使本地驗證路徑可被量測
+
+環境變數：
+- JUDGE_MODEL_BACKEND：設為 fake 時，judge.agent 會將 root_agent 換上 FakeLlm
+- JUDGE_FAKE_LATENCY / JUDGE_FAKE_JITTER：每次模型呼叫注入的延遲秒數與抖動
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+from typing import Any, AsyncGenerator, Callable, Optional, Type
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.tools.agent_tool import AgentTool
+from google.genai import types
+from pydantic import BaseModel, Field, PrivateAttr
+
+
+def _resolve_ref(schema: dict, root: dict) -> dict:
+    ref = schema.get("$ref")
+    if not ref:
+        return schema
+    node: Any = root
+    for part in ref.lstrip("#/").split("/"):
+        node = node[part]
+    return node
+
+
+def fake_value(schema: dict, rng: random.Random, root: Optional[dict] = None, label: str = "value") -> Any:
+    """依 JSON Schema 產生一個符合條件的值（物件會填滿所有欄位）"""
+    root = root if root is not None else schema
+    schema = _resolve_ref(schema, root)
+    if "const" in schema:
+        return schema["const"]
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            options = [s for s in schema[key] if _resolve_ref(s, root).get("type") != "null"]
+            return fake_value((options or schema[key])[0], rng, root, label)
+
+    kind = schema.get("type", "string")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if kind == "object":
+        return {
+            name: fake_value(sub, rng, root, sub.get("title") or name)
+            for name, sub in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        count = max(schema.get("minItems", 0), min(schema.get("maxItems", 3), rng.randint(1, 3)))
+        item_label = label.rstrip("s") or label
+        return [
+            fake_value(schema.get("items", {}), rng, root, f"{item_label} {i + 1}") for i in range(count)
+        ]
+    if kind in ("integer", "number"):
+        low = schema.get("minimum", schema.get("exclusiveMinimum", 0))
+        high = schema.get("maximum", schema.get("exclusiveMaximum", low + 100 if kind == "integer" else 1))
+        return rng.randint(int(low), int(high)) if kind == "integer" else round(rng.uniform(low, high), 3)
+    if kind == "boolean":
+        return rng.random() < 0.5
+    if kind == "null":
+        return None
+    text = f"{label} #{rng.randint(1, 9999)}"
+    return text.ljust(schema.get("minLength", 0), "x")
+
+
+def fake_instance(schema: Type[BaseModel], rng: Optional[random.Random] = None) -> dict:
+    """產生可通過 schema.model_validate 的資料"""
+    rng = rng or random.Random(0)
+    spec = schema.model_json_schema()
+    data = fake_value(spec, rng, spec, schema.__name__)
+    schema.model_validate(data)
+    return data
+
+
+def _declaration_args(tool, rng: random.Random) -> dict:
+    declaration = tool._get_declaration()
+    params = getattr(declaration, "parameters", None) if declaration else None
+    if params is None or not params.properties:
+        return {}
+    args = {}
+    for name, prop in params.properties.items():
+        kind = (prop.type or types.Type.STRING).value.lower()
+        args[name] = fake_value({"type": kind}, rng, label=name)
+    return args
+
+
+class FakeLlm(BaseLlm):
+    """離線模型：輸出通過 output_schema 驗證的資料或預錄回應，可注入延遲"""
+
+    model: str = "fake"
+    agent_name: str = ""
+    output_schema: Optional[Type[BaseModel]] = None
+    """若設定，最終輸出依此 schema 產生（優先於請求中的 response_schema）。"""
+
+    responses: list[Any] = Field(default_factory=list)
+    """預錄回應（dict/str），依呼叫次數循環使用；有設定時直接作為最終輸出，不呼叫工具。"""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    seed: int = 0
+
+    _calls: int = PrivateAttr(default=0)
+    _slept: float = PrivateAttr(default=0.0)
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return [r"fake.*"]
+
+    @property
+    def stats(self) -> dict:
+        return {"calls": self._calls, "latency_seconds": self._slept}
+
+    def _rng(self) -> random.Random:
+        digest = hashlib.sha256(f"{self.seed}:{self.agent_name}:{self._calls}".encode()).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    def _final_text(self, llm_request: LlmRequest, rng: random.Random) -> str:
+        if self.responses:
+            value = self.responses[(self._calls - 1) % len(self.responses)]
+        else:
+            schema = self.output_schema or llm_request.config.response_schema
+            if isinstance(schema, type) and issubclass(schema, BaseModel):
+                value = fake_instance(schema, rng)
+            else:
+                value = f"{self.agent_name or 'fake'} response #{self._calls}"
+        return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self._calls += 1
+        rng = self._rng()
+        if self.latency or self.jitter:
+            delay = max(0.0, self.latency + rng.uniform(-self.jitter, self.jitter))
+            self._slept += delay
+            await asyncio.sleep(delay)
+
+        last = llm_request.contents[-1] if llm_request.contents else None
+        answered = bool(last and any(p.function_response for p in last.parts or []))
+        if llm_request.tools_dict and not answered and not self.responses:
+            # 依呼叫次數輪流選擇工具，產生一次函式呼叫
+            names = sorted(llm_request.tools_dict)
+            name = names[(self._calls - 1) % len(names)]
+            part = types.Part(
+                function_call=types.FunctionCall(
+                    name=name, args=_declaration_args(llm_request.tools_dict[name], rng)
+                )
+            )
+        else:
+            part = types.Part(text=self._final_text(llm_request, rng))
+
+        prompt_chars = sum(len(p.text or "") for c in llm_request.contents for p in c.parts or [])
+        if llm_request.config and llm_request.config.system_instruction:
+            prompt_chars += len(str(llm_request.config.system_instruction))
+        output_chars = len(part.text or "") if part.text else 16
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[part]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_chars // 4,
+                candidates_token_count=output_chars // 4,
+                total_token_count=(prompt_chars + output_chars) // 4,
+            ),
+        )
+
+
+def walk_llm_agents(agent: BaseAgent):
+    """走訪代理樹（含 AgentTool 包裝的代理），依序產生 (LlmAgent, 所屬結構化代理)"""
+    from judge.agents.structured import StructuredToolAgent
+
+    stack: list[tuple[BaseAgent, Optional[BaseAgent]]] = [(agent, None)]
+    seen: set[int] = set()
+    while stack:
+        current, parent = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        if isinstance(current, LlmAgent):
+            yield current, parent
+        stack.extend((t.agent, None) for t in getattr(current, "tools", None) or [] if isinstance(t, AgentTool))
+        owner = current if isinstance(current, StructuredToolAgent) else None
+        stack.extend((sub, owner) for sub in current.sub_agents)
+
+
+def install_model_backend(agent: BaseAgent, factory: Callable[[LlmAgent, Optional[Type[BaseModel]]], Any]) -> list[LlmAgent]:
+    """以 factory(agent, schema) 的回傳值取代代理樹中每個 LlmAgent 的 model
+
+    schema 為該代理應輸出的結構：自身的 output_schema，或 StructuredToolAgent
+    中工具執行者對應的驗證者 schema。回傳被替換的代理清單。
+    """
+    replaced = []
+    for llm_agent, owner in walk_llm_agents(agent):
+        schema = llm_agent.output_schema
+        if schema is None and owner is not None and llm_agent is owner.sub_agents[0]:
+            schema = owner.sub_agents[1].output_schema
+        llm_agent.model = factory(llm_agent, schema)
+        replaced.append(llm_agent)
+    return replaced
+
+
+def install_fake_llm(
+    agent: BaseAgent,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    responses: Optional[dict[str, list[Any]]] = None,
+    seed: int = 0,
+) -> dict[str, FakeLlm]:
+    """為代理樹中每個 LlmAgent 安裝獨立的 FakeLlm，回傳 {代理名稱: FakeLlm}"""
+    responses = responses or {}
+    models: dict[str, FakeLlm] = {}
+
+    def factory(llm_agent: LlmAgent, schema: Optional[Type[BaseModel]]) -> FakeLlm:
+        fake = FakeLlm(
+            agent_name=llm_agent.name,
+            output_schema=schema,
+            responses=list(responses.get(llm_agent.name, [])),
+            latency=latency,
+            jitter=jitter,
+            seed=seed,
+        )
+        # 同名代理（如兩組社群模擬）以流水號區分
+        key = llm_agent.name
+        while key in models:
+            key += "'"
+        models[key] = fake
+        return fake
+
+    install_model_backend(agent, factory)
+    return models
+
+
+def install_model_backend_from_env(agent: BaseAgent) -> Optional[dict[str, FakeLlm]]:
+    """依 JUDGE_MODEL_BACKEND 設定模型後端；gemini（預設）時不變更"""
+    backend = (os.getenv("JUDGE_MODEL_BACKEND") or "gemini").lower()
+    if backend == "gemini":
+        return None
+    if backend != "fake":
+        raise ValueError(f"Unknown model backend: {backend}")
+    return install_fake_llm(
+        agent,
+        latency=float(os.getenv("JUDGE_FAKE_LATENCY") or 0.0),
+        jitter=float(os.getenv("JUDGE_FAKE_JITTER") or 0.0),
+    )
+
+
+__all__ = [
+    "FakeLlm",
+    "fake_instance",
+    "fake_value",
+    "walk_llm_agents",
+    "install_model_backend",
+    "install_fake_llm",
+    "install_model_backend_from_env",
+]
@@ -0,0 +1,393 @@
+"""近似重複主張索引（MinHash + LSH，NumPy）。
+
+換句話說的謠言無法命中以主張文字為鍵的結果快取；此索引以 MinHash 簽章估計
+Jaccard 相似度，找出最相近的已查核主張：
+
+- 文字先經 `normalize_query` 正規化，以字（中文）/詞的相鄰二元組為 shingle；每組
+  排列以不同種子對 shingle 的 64 位元雜湊做 splitmix64 混合，近似彼此獨立的排列
+- 每筆保存主張與 Curator 摘要兩組簽章；查詢時以主張簽章的 LSH 分段找候選，
+  兩組皆有時以加權平均排序
+- LSH 每個 band 為排序後的雜湊陣列，以 searchsorted 查詢；新加入的項目先放在
+  小緩衝區，累積 merge_every 筆才併入排序陣列，數十萬筆時單次查詢仍在毫秒以下
+- 以 np.savez 保存簽章與 band 陣列（原子替換），程序結束時自動寫回；雜湊方式不同的
+  舊索引載入時以保存的主張文字重新計算簽章（摘要簽章捨棄）
+- reuse_compatible：否定用語或數字不同的主張（「全面免費」與「並非全面免費」、
+  不同年份）即使相似度高也不可沿用彼此的結論
+
+環境變數：
+- JUDGE_NEAR_DUP：設為 0 停用（預設啟用）
+- JUDGE_NEAR_DUP_INDEX：索引檔路徑（.npz；未設定則僅存於記憶體）
+- JUDGE_NEAR_DUP_REUSE：沿用先前 FinalReport 的相似度門檻（未設定則不沿用，只併入證據；
+  建議值 0.85）
+- JUDGE_NEAR_DUP_SEED：以先前證據作為辯論起點的相似度門檻（預設 0.5）
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Iterable, NamedTuple, Optional
+
+import numpy as np
+
+from .evidence import normalize_claim
+from .file_io import _replace_atomic
+from .search import normalize_query
+
+
+_TOKEN_RE = re.compile(r"[\u3400-\u9fff]|[^\W_\u3400-\u9fff]+")
+# 簽章計算方式的版本；載入的索引版本不同時重新計算簽章
+HASH_VERSION = 2
+DEFAULT_REUSE_THRESHOLD = 0.85
+
+# 否定用語：中文逐字比對（寧可多擋），英文以單字邊界比對
+_NEGATION_RE = re.compile(r"[不沒没未非無无否別别勿莫]|\b(?:not|no|never|none|nor|neither|without|cannot)\b|n['’]t\b")
+_NUMBER_RE = re.compile(r"\d+(?:[.,:/\-]\d+)*%?|[零〇一二三四五六七八九十兩两百千萬万億亿]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """正規化後切成字詞：中文逐字，其他文字依非文字字元分隔"""
+    return _TOKEN_RE.findall(normalize_query(text))
+
+
+def text_shingles(text: str) -> set[str]:
+    """相鄰二元組的集合；只有一個字詞時退回單字詞"""
+    tokens = tokenize(text)
+    if len(tokens) < 2:
+        return set(tokens)
+    return {f"{a} {b}" for a, b in zip(tokens, tokens[1:])}
+
+
+class NearDuplicate(NamedTuple):
+    session_id: str
+    claim: str
+    score: float
+    claim_similarity: float
+    source_similarity: Optional[float]
+
+    def to_dict(self) -> dict:
+        return self._asdict()
+
+
+def _shingle_hash(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _mix64(x: np.ndarray) -> np.ndarray:
+    """splitmix64 的最終混合（uint64 乘法依 2^64 取模）"""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+class MinHasher:
+    """以 num_perm 組種子混合 shingle 的 64 位元雜湊，計算 MinHash 簽章（取最小值的低 32 位元）"""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1) -> None:
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._seeds = rng.integers(0, np.iinfo(np.uint64).max, size=(num_perm, 1), dtype=np.uint64, endpoint=True)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        shingles = text_shingles(text)
+        if not shingles:
+            return None
+        hashes = np.fromiter((_shingle_hash(s) for s in shingles), dtype=np.uint64, count=len(shingles))
+        with np.errstate(over="ignore"):
+            values = _mix64(hashes[None, :] ^ self._seeds)
+        return (values.min(axis=1) & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+
+def _negations(text: str) -> list[str]:
+    return sorted(_NEGATION_RE.findall(unicodedata.normalize("NFKC", text or "").casefold()))
+
+
+def _numbers(text: str) -> list[str]:
+    return sorted(_NUMBER_RE.findall(normalize_claim(text)))
+
+
+def reuse_compatible(claim: str, other: str) -> bool:
+    """兩個主張的否定用語與數字（含中文數字）皆相同時，才可沿用彼此的查核結論"""
+    return _negations(claim) == _negations(other) and _numbers(claim) == _numbers(other)
+
+
+class NearDuplicateIndex:
+    """主張近似重複索引：add 記錄已查核的主張，query 回傳最相近的一筆"""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        num_perm: int = 128,
+        bands: int = 32,
+        claim_weight: float = 0.7,
+        merge_every: int = 4096,
+        seed: int = 1,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.path = path
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.claim_weight = claim_weight
+        self.merge_every = merge_every
+        self.hasher = MinHasher(num_perm, seed)
+        self._lock = threading.Lock()
+        self._claim_sigs = np.zeros((0, num_perm), dtype=np.uint32)
+        self._source_sigs = np.zeros((0, num_perm), dtype=np.uint32)
+        self._has_sources = np.zeros(0, dtype=bool)
+        self._size = 0
+        self._meta: list[tuple[str, str]] = []
+        # 每個 band：排序後的雜湊與對應列號；_pending 為尚未併入的 (band 雜湊, 列號)
+        self._band_keys = np.zeros((bands, 0), dtype=np.uint64)
+        self._band_rows = np.zeros((bands, 0), dtype=np.int64)
+        self._pending: dict[tuple[int, int], list[int]] = {}
+        self._pending_rows: list[int] = []
+        self._dirty = False
+        if path and Path(path).exists():
+            self.load(path)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _band_hashes(self, signatures: np.ndarray) -> np.ndarray:
+        """(n, num_perm) 簽章 → (bands, n) 的 64 位元 band 雜湊"""
+        n = signatures.shape[0]
+        parts = signatures.reshape(n, self.bands, self.rows).astype(np.uint64)
+        keys = np.zeros((n, self.bands), dtype=np.uint64)
+        for i in range(self.rows):
+            keys = (keys * np.uint64(0x100000001B3)) ^ parts[:, :, i]
+        return keys.T
+
+    def _source_text(self, snippets: Iterable[str]) -> str:
+        return " ".join(s for s in snippets if s)
+
+    def _grow(self) -> None:
+        capacity = max(1024, 2 * self._claim_sigs.shape[0])
+        for name in ("_claim_sigs", "_source_sigs"):
+            old = getattr(self, name)
+            new = np.zeros((capacity, old.shape[1]), dtype=np.uint32)
+            new[: self._size] = old[: self._size]
+            setattr(self, name, new)
+        has_sources = np.zeros(capacity, dtype=bool)
+        has_sources[: self._size] = self._has_sources[: self._size]
+        self._has_sources = has_sources
+
+    def _rebuild_bands(self) -> None:
+        keys = self._band_hashes(self._claim_sigs[: self._size])
+        order = np.argsort(keys, axis=1, kind="stable")
+        self._band_keys = np.take_along_axis(keys, order, axis=1)
+        self._band_rows = order
+        self._pending.clear()
+        self._pending_rows.clear()
+
+    def _merge_pending(self) -> None:
+        """將緩衝區的項目以 searchsorted + insert 併入各 band 的排序陣列"""
+        if not self._pending_rows:
+            return
+        rows = np.asarray(self._pending_rows, dtype=np.int64)
+        keys = self._band_hashes(self._claim_sigs[rows])
+        band_keys, band_rows = [], []
+        for band in range(self.bands):
+            order = np.argsort(keys[band], kind="stable")
+            new_keys = keys[band][order]
+            positions = np.searchsorted(self._band_keys[band], new_keys, side="right")
+            band_keys.append(np.insert(self._band_keys[band], positions, new_keys))
+            band_rows.append(np.insert(self._band_rows[band], positions, rows[order]))
+        self._band_keys = np.stack(band_keys)
+        self._band_rows = np.stack(band_rows)
+        self._pending.clear()
+        self._pending_rows.clear()
+
+    def add(self, session_id: str, claim: str, snippets: Iterable[str] = ()) -> Optional[int]:
+        """加入一筆已查核的主張，回傳列號；主張文字沒有可用字詞時回傳 None"""
+        claim_sig = self.hasher.signature(claim)
+        if claim_sig is None:
+            return None
+        source_sig = self.hasher.signature(self._source_text(snippets))
+        with self._lock:
+            if self._size == self._claim_sigs.shape[0]:
+                self._grow()
+            row = self._size
+            self._claim_sigs[row] = claim_sig
+            if source_sig is not None:
+                self._source_sigs[row] = source_sig
+                self._has_sources[row] = True
+            self._meta.append((str(session_id), claim))
+            self._size += 1
+            for band, key in enumerate(self._band_hashes(claim_sig[None, :])[:, 0].tolist()):
+                self._pending.setdefault((band, key), []).append(row)
+            self._pending_rows.append(row)
+            if len(self._pending_rows) >= self.merge_every:
+                self._merge_pending()
+            self._dirty = True
+        return row
+
+    def _candidates(self, keys: np.ndarray) -> np.ndarray:
+        found = []
+        pending_keys = keys.tolist() if self._pending else ()
+        for band in range(self.bands):
+            sorted_keys = self._band_keys[band]
+            if sorted_keys.size:
+                lo = np.searchsorted(sorted_keys, keys[band], side="left")
+                hi = np.searchsorted(sorted_keys, keys[band], side="right")
+                if hi > lo:
+                    found.append(self._band_rows[band, lo:hi])
+            pending = self._pending.get((band, pending_keys[band])) if self._pending else None
+            if pending:
+                found.append(np.asarray(pending, dtype=np.int64))
+        if not found:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(found))
+
+    def query(
+        self,
+        claim: str,
+        snippets: Iterable[str] = (),
+        min_score: float = 0.0,
+        exclude: Optional[str] = None,
+    ) -> Optional[NearDuplicate]:
+        """回傳最相近的已查核主張（分數低於 min_score 或沒有 LSH 候選時為 None）"""
+        claim_sig = self.hasher.signature(claim)
+        if claim_sig is None:
+            return None
+        source_sig = self.hasher.signature(self._source_text(snippets))
+        with self._lock:
+            rows = self._candidates(self._band_hashes(claim_sig[None, :])[:, 0])
+            if exclude is not None:
+                rows = np.array([r for r in rows if self._meta[r][0] != exclude], dtype=np.int64)
+            if not rows.size:
+                return None
+            claim_sim = (self._claim_sigs[rows] == claim_sig).mean(axis=1)
+            scores = claim_sim
+            source_sim = None
+            if source_sig is not None:
+                source_sim = (self._source_sigs[rows] == source_sig).mean(axis=1)
+                both = self._has_sources[rows]
+                scores = np.where(
+                    both, self.claim_weight * claim_sim + (1 - self.claim_weight) * source_sim, claim_sim
+                )
+            best = int(np.argmax(scores))
+            row = int(rows[best])
+            session_id, matched = self._meta[row]
+            has_sources = bool(self._has_sources[row])
+        score = float(scores[best])
+        if score < min_score:
+            return None
+        return NearDuplicate(
+            session_id=session_id,
+            claim=matched,
+            score=round(score, 4),
+            claim_similarity=round(float(claim_sim[best]), 4),
+            source_similarity=round(float(source_sim[best]), 4) if source_sim is not None and has_sources else None,
+        )
+
+    def save(self, path: Optional[str] = None) -> None:
+        path = path or self.path
+        if not path:
+            return
+        with self._lock:
+            self._merge_pending()
+            meta = json.dumps(
+                {"bands": self.bands, "rows": self.rows, "hash_version": HASH_VERSION, "entries": self._meta},
+                ensure_ascii=False,
+            )
+            arrays = {
+                "claim_sigs": self._claim_sigs[: self._size],
+                "source_sigs": self._source_sigs[: self._size],
+                "has_sources": self._has_sources[: self._size],
+                "band_keys": self._band_keys,
+                "band_rows": self._band_rows,
+                "meta": np.array(meta),
+            }
+
+            def _write(tmp: Path) -> None:
+                with open(tmp, "wb") as f:
+                    np.savez(f, **arrays)
+
+            _replace_atomic(path, _write)
+            self._dirty = False
+
+    def load(self, path: str) -> None:
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if (meta["bands"], meta["rows"]) != (self.bands, self.rows):
+                raise ValueError(f"{path}: index built with {meta['bands']}x{meta['rows']} bands")
+            claim_sigs = data["claim_sigs"]
+            source_sigs = data["source_sigs"]
+            has_sources = data["has_sources"]
+            bands = (data["band_keys"], data["band_rows"]) if "band_keys" in data.files else None
+        entries = [tuple(entry) for entry in meta["entries"]]
+        rehashed = meta.get("hash_version") != HASH_VERSION
+        if rehashed:
+            # 舊版雜湊：以主張文字重新計算簽章；摘要文字未保存，摘要簽章無法重建
+            claim_sigs = np.stack(
+                [self.hasher.signature(claim) for _, claim in entries]
+            ) if entries else np.zeros((0, self.hasher.num_perm), dtype=np.uint32)
+            source_sigs = np.zeros_like(claim_sigs)
+            has_sources = np.zeros(len(entries), dtype=bool)
+        with self._lock:
+            self._size = claim_sigs.shape[0]
+            self._claim_sigs = claim_sigs.copy()
+            self._source_sigs = source_sigs.copy()
+            self._has_sources = has_sources.copy()
+            self._meta = entries
+            if not rehashed and bands is not None and bands[0].shape == (self.bands, self._size):
+                self._band_keys, self._band_rows = bands
+                self._pending.clear()
+                self._pending_rows.clear()
+            else:
+                self._rebuild_bands()
+            self._dirty = rehashed
+
+    def flush(self) -> None:
+        if self._dirty:
+            self.save()
+
+
+def near_duplicate_enabled() -> bool:
+    return (os.getenv("JUDGE_NEAR_DUP") or "1").lower() not in ("0", "false", "no")
+
+
+def reuse_threshold() -> Optional[float]:
+    """沿用 FinalReport 的門檻；未設定時為 None（不沿用，只併入證據）"""
+    value = os.getenv("JUDGE_NEAR_DUP_REUSE")
+    return float(value) if value else None
+
+
+def seed_threshold() -> float:
+    return float(os.getenv("JUDGE_NEAR_DUP_SEED") or 0.5)
+
+
+def curation_snippets(curation) -> list[str]:
+    """CuratorOutput 中各結果的標題與摘要"""
+    if hasattr(curation, "model_dump"):
+        curation = curation.model_dump()
+    results = curation.get("results") if isinstance(curation, dict) else None
+    return [
+        f"{r.get('title', '')} {r.get('snippet', '')}".strip()
+        for r in results or []
+        if isinstance(r, dict)
+    ]
+
+
+near_duplicate_index = NearDuplicateIndex(path=os.getenv("JUDGE_NEAR_DUP_INDEX") or None)
+atexit.register(near_duplicate_index.flush)
+
+
+__all__ = [
+    "MinHasher",
+    "NearDuplicate",
+    "NearDuplicateIndex",
+    "curation_snippets",
+    "near_duplicate_enabled",
+    "near_duplicate_index",
+    "reuse_compatible",
+    "text_shingles",
+    "tokenize",
+]
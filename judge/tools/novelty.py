@@ -0,0 +1,158 @@
+"""辯論發言的新穎度（ROUGE-N 重疊，NumPy 向量化）。
+
+每次辯手發言後，將其論點（key_points / challenges / attack_points）與先前所有
+發言的論點比對：
+
+- 每個論點的 n-gram 集合以 LRU 快取，同一論點只切詞一次
+- 以 n-gram 詞彙表建立 0/1 矩陣，一次矩陣乘法取得所有論點對的重疊數，
+  再換算為 ROUGE-1 與 ROUGE-2 的 F1（以集合計算）並取平均
+- 每個新論點取與先前論點的最高相似度作為重複度；novelty_score = 1 - 平均重複度
+
+rouge-score 的預設 tokenizer 會濾掉中文，且一次只比較一對文字，因此不直接使用；
+以 CJK 逐字切詞後，結果與 RougeScorer 的 ROUGE-N F1 相同（論點內無重複 n-gram 時）。
+
+結果寫入 state['novelty_score'] 與 state['novelty']（最近一輪的重複論點與歷史），
+供規則式停止判斷與主持人決策使用。
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Sequence
+
+import numpy as np
+
+from .near_duplicate import tokenize
+
+
+POINT_FIELDS = ("key_points", "challenges", "attack_points")
+ROUGE_ORDERS = (1, 2)
+# 重複度達此值的論點視為重述先前的論點
+REPEAT_THRESHOLD = 0.6
+MAX_REPORTED = 3
+REPORT_CHARS = 60
+
+
+@lru_cache(maxsize=8192)
+def ngram_set(text: str, n: int) -> frozenset:
+    tokens = tokenize(text)
+    return frozenset(tuple(tokens[i : i + n]) for i in range(len(tokens) - n + 1))
+
+
+def payload_points(payload: Any) -> list[str]:
+    """辯手輸出中的論點；沒有論點欄位時退回主張/內容文字"""
+    if hasattr(payload, "model_dump"):
+        payload = payload.model_dump()
+    if not isinstance(payload, dict):
+        return [str(payload)] if payload else []
+    points = [
+        str(p) for field in POINT_FIELDS for p in payload.get(field) or [] if isinstance(p, str) and p.strip()
+    ]
+    if points:
+        return points
+    text = payload.get("thesis") or payload.get("counter_thesis") or payload.get("stance") or payload.get("text")
+    return [str(text)] if text else []
+
+
+def message_points(message: Any) -> list[str]:
+    if not isinstance(message, dict):
+        return payload_points(message)
+    return payload_points(message.get("data")) or payload_points(message.get("claim") or message.get("content"))
+
+
+def _rouge_f1(new: Sequence[str], prior: Sequence[str], n: int) -> np.ndarray:
+    new_sets = [ngram_set(t, n) for t in new]
+    prior_sets = [ngram_set(t, n) for t in prior]
+    vocab: dict = {}
+    for grams in (*new_sets, *prior_sets):
+        for gram in grams:
+            vocab.setdefault(gram, len(vocab))
+    if not vocab:
+        return np.zeros((len(new), len(prior)), dtype=np.float32)
+
+    def matrix(sets) -> np.ndarray:
+        m = np.zeros((len(sets), len(vocab)), dtype=np.float32)
+        for row, grams in enumerate(sets):
+            if grams:
+                m[row, [vocab[g] for g in grams]] = 1.0
+        return m
+
+    a, b = matrix(new_sets), matrix(prior_sets)
+    overlap = a @ b.T
+    sizes = a.sum(axis=1)[:, None] + b.sum(axis=1)[None, :]
+    # F1 = 2PR/(P+R) = 2·重疊 / (|a| + |b|)
+    return np.divide(2 * overlap, sizes, out=np.zeros_like(overlap), where=sizes > 0)
+
+
+def similarity_matrix(new: Sequence[str], prior: Sequence[str]) -> np.ndarray:
+    """(len(new), len(prior)) 的 ROUGE-1/ROUGE-2 F1 平均"""
+    if not new or not prior:
+        return np.zeros((len(new), len(prior)), dtype=np.float32)
+    return sum(_rouge_f1(new, prior, n) for n in ROUGE_ORDERS) / len(ROUGE_ORDERS)
+
+
+def score_points(new: Sequence[str], prior: Sequence[str], threshold: float = REPEAT_THRESHOLD) -> dict:
+    """新論點相對先前論點的新穎度與重複的論點
+
+    沒有任何論點（空白或解析失敗的輸出）時 score 為 None：無從判斷是否重述，
+    不應被視為重複而結束辯論。
+    """
+    if not new:
+        return {"score": None, "points": 0, "repeated": []}
+    if not prior:
+        return {"score": 1.0, "points": len(new), "repeated": []}
+    sim = similarity_matrix(new, prior)
+    best = sim.argmax(axis=1)
+    redundancy = sim[np.arange(len(new)), best]
+    repeated = [
+        {
+            "point": new[i][:REPORT_CHARS],
+            "similar_to": prior[best[i]][:REPORT_CHARS],
+            "similarity": round(float(redundancy[i]), 3),
+        }
+        for i in np.argsort(-redundancy)
+        if redundancy[i] >= threshold
+    ]
+    return {
+        "score": round(float(1.0 - redundancy.mean()), 4),
+        "points": len(new),
+        "repeated": repeated[:MAX_REPORTED],
+        "repeated_count": len(repeated),
+    }
+
+
+def update_novelty(state, threshold: float = REPEAT_THRESHOLD) -> dict:
+    """比對最後一則發言與先前所有發言，寫入 state['novelty_score'] 與 state['novelty']
+
+    最後一則發言沒有論點時 novelty_score 為 None，is_repetitive 不會將其視為重述。
+    """
+    messages = state.get("debate_messages") or []
+    if not messages:
+        return {}
+    prior = [p for m in messages[:-1] for p in message_points(m)]
+    result = score_points(message_points(messages[-1]), prior, threshold)
+    last = messages[-1]
+    previous = state.get("novelty") or {}
+    history = list(previous.get("history") or [])
+    history.append(result["score"])
+    novelty = {
+        "score": result["score"],
+        "speaker": last.get("speaker") if isinstance(last, dict) else None,
+        "points": result["points"],
+        "repeated": result["repeated"],
+        "repeated_count": result.get("repeated_count", 0),
+        "history": history,
+    }
+    state["novelty_score"] = result["score"]
+    state["novelty"] = novelty
+    return novelty
+
+
+__all__ = [
+    "message_points",
+    "ngram_set",
+    "payload_points",
+    "score_points",
+    "similarity_matrix",
+    "update_novelty",
+]
@@ -0,0 +1,317 @@
+"""模型與搜尋呼叫的錄製/重播，讓整條 pipeline 可重現且不需網路。
+
+- record：照常呼叫模型與搜尋後端，並把每次的回應寫入 ReplayStore
+- replay：只從 ReplayStore 取回回應，不呼叫任何模型或後端；找不到時拋出 ReplayMiss
+
+鍵為代理名稱、模型、請求內容（contents，去除 ADK 每次隨機產生的函式呼叫 id）、
+生成設定與輸出 schema、可用工具名稱的 SHA-256。相同請求在同一次執行中重複出現時
+以序號區分（如循環中的同一提示）；序號於每次執行開始時歸零（install_replay 在根代理
+前置回呼，各 Session 的執行各自計數）。重播時只接受序號完全相同的回應：執行比錄製時
+多呼叫模型（如多跑一回合）即拋出 ReplayMiss，不會以舊回應掩蓋行為變化。
+搜尋以正規化後的查詢為鍵。
+
+ReplayStore 為單一 SQLite 檔，回應以 zlib 壓縮的 JSON 保存。
+
+環境變數：
+- JUDGE_REPLAY：record 或 replay（未設定則停用）
+- JUDGE_REPLAY_DB：錄製檔路徑（預設 .cache/replay.sqlite）
+"""
+
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
+from functools import lru_cache
+from typing import Any, AsyncGenerator, Optional, Type
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.tools.tool_context import ToolContext
+from pydantic import BaseModel
+
+from .file_io import ensure_parent_dir
+from .models import install_model_backend
+from .search import normalize_query, search_service
+
+
+MODES = ("record", "replay")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    key TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    agent TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (key, seq)
+)
+"""
+
+# 本次執行（一個 Session 的一次根代理執行）中各鍵的出現次數；未設定時使用 ReplayStore 自身的計數
+_RUN_SEEN: contextvars.ContextVar[Optional[Counter]] = contextvars.ContextVar("judge_replay_seen", default=None)
+_MARK = "_judge_replay_run"
+
+# 生成設定中不影響回應、或另行處理的欄位
+_CONFIG_EXCLUDE = {"response_schema", "response_json_schema", "tools", "http_options", "labels"}
+
+
+class ReplayMiss(LookupError):
+    """重播模式下找不到對應的錄製回應"""
+
+
+def _digest(payload: dict) -> str:
+    data = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=256)
+def _schema_fingerprint(schema: Type[BaseModel]) -> str:
+    return _digest(schema.model_json_schema())
+
+
+def _content(content) -> dict:
+    data = content.model_dump(mode="json", exclude_none=True)
+    # ADK 為每次函式呼叫產生隨機 id（adk-<uuid>），不納入鍵
+    for part in data.get("parts") or []:
+        for field in ("function_call", "function_response"):
+            if field in part:
+                part[field].pop("id", None)
+    return data
+
+
+def request_key(agent_name: str, llm_request: LlmRequest) -> str:
+    config = llm_request.config
+    schema = getattr(config, "response_schema", None) if config else None
+    if isinstance(schema, type) and issubclass(schema, BaseModel):
+        schema = _schema_fingerprint(schema)
+    return _digest(
+        {
+            "agent": agent_name,
+            "model": llm_request.model,
+            "contents": [_content(c) for c in llm_request.contents],
+            "config": config.model_dump(mode="json", exclude_none=True, exclude=_CONFIG_EXCLUDE) if config else None,
+            "schema": schema,
+            "tools": sorted(llm_request.tools_dict),
+        }
+    )
+
+
+def search_key(query: str) -> str:
+    return _digest({"search": normalize_query(query)})
+
+
+class ReplayStore:
+    """錄製的回應（SQLite）；stats 記錄錄製、重播與未命中次數"""
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path or ":memory:"
+        if path:
+            ensure_parent_dir(path)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        if path:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._seen: Counter = Counter()
+        self.stats = {"recorded": 0, "replayed": 0, "misses": 0}
+
+    def next_seq(self, key: str) -> int:
+        """本次執行中此鍵第幾次出現（從 0 起算）"""
+        run_seen = _RUN_SEEN.get()
+        with self._lock:
+            seen = run_seen if run_seen is not None else self._seen
+            seq = seen[key]
+            seen[key] += 1
+        return seq
+
+    def reset(self) -> None:
+        """重設未經 install_replay 根代理回呼計數時使用的出現次數"""
+        with self._lock:
+            self._seen.clear()
+
+    def get(self, key: str, seq: int = 0) -> Optional[Any]:
+        """序號 seq 的回應；沒有錄製此序號時回傳 None"""
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM calls WHERE key = ? AND seq = ?", (key, seq)).fetchone()
+        if row is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["replayed"] += 1
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key: str, seq: int, kind: str, agent: str, value: Any) -> None:
+        data = zlib.compress(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO calls (key, seq, kind, agent, payload, created) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, seq, kind, agent, data, time.time()),
+            )
+            self._conn.commit()
+        self.stats["recorded"] += 1
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM calls").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class RecordReplayLlm(BaseLlm):
+    """包裝代理原本的模型：record 時呼叫並錄製，replay 時只讀取錄製內容"""
+
+    agent_name: str = ""
+    mode: str = "replay"
+    inner: Any = None
+    """原本的模型（BaseLlm 或模型名稱字串）；replay 模式不會使用。"""
+
+    store: Any = None
+    """ReplayStore；未設定時使用 replay_store()。"""
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return []
+
+    def _inner(self) -> BaseLlm:
+        if isinstance(self.inner, str):
+            from google.adk.models.registry import LLMRegistry
+
+            self.inner = LLMRegistry.new_llm(self.inner)
+        if self.inner is None:
+            raise ValueError(f"{self.agent_name}: record mode requires the wrapped model")
+        return self.inner
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        store = self.store if self.store is not None else replay_store()
+        key = request_key(self.agent_name, llm_request)
+        seq = store.next_seq(key)
+        if self.mode == "replay":
+            recorded = store.get(key, seq)
+            if recorded is None:
+                raise ReplayMiss(f"no recorded response for {self.agent_name} (key {key[:12]}, call {seq})")
+            for response in recorded:
+                yield LlmResponse.model_validate(response)
+            return
+
+        recorded = []
+        async for response in self._inner().generate_content_async(llm_request, stream):
+            recorded.append(response.model_dump(mode="json", exclude_none=True))
+            # ADK 取得最終回應後不一定會再推進產生器，因此在交出回應前先寫入
+            store.put(key, seq, "llm", self.agent_name, recorded)
+            yield response
+
+
+class ReplaySearchBackend:
+    """包裝搜尋後端：record 時呼叫並錄製，replay 時只讀取錄製的結果"""
+
+    def __init__(self, inner: Any, mode: str = "replay", store: Optional[ReplayStore] = None) -> None:
+        self.inner = inner
+        self.mode = mode
+        self.store = store
+
+    async def search(self, query: str, tool_context: Optional[ToolContext] = None) -> Any:
+        store = self.store if self.store is not None else replay_store()
+        key = search_key(query)
+        if self.mode == "replay":
+            recorded = store.get(key)
+            if recorded is None:
+                raise ReplayMiss(f"no recorded search results for {query!r}")
+            return recorded
+        results = await self.inner.search(query, tool_context)
+        store.put(key, 0, "search", "search_web", results)
+        return results
+
+
+_store: Optional[ReplayStore] = None
+
+
+def replay_store() -> ReplayStore:
+    """共用的 ReplayStore（JUDGE_REPLAY_DB，第一次使用時開啟）"""
+    global _store
+    if _store is None:
+        _store = ReplayStore(os.getenv("JUDGE_REPLAY_DB") or ".cache/replay.sqlite")
+    return _store
+
+
+def _begin_run(callback_context=None, **_):
+    """根代理開始執行時為本次執行建立新的序號計數"""
+    _RUN_SEEN.set(Counter())
+    return None
+
+
+setattr(_begin_run, _MARK, True)
+
+
+def install_replay(
+    agent: BaseAgent, mode: str, store: Optional[ReplayStore] = None, search: bool = True
+) -> dict[str, RecordReplayLlm]:
+    """為代理樹中每個 LlmAgent（與共用搜尋後端）安裝錄製/重播包裝，回傳 {代理名稱: 包裝}
+
+    agent 應為每次執行的根代理：其 before_agent_callback 會於每次執行開始時重設序號。
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown replay mode: {mode}")
+    models: dict[str, RecordReplayLlm] = {}
+
+    def factory(llm_agent: LlmAgent, schema) -> RecordReplayLlm:
+        inner = llm_agent.model
+        if isinstance(inner, RecordReplayLlm):
+            inner = inner.inner
+        wrapped = RecordReplayLlm(
+            model=inner if isinstance(inner, str) else getattr(inner, "model", "replay"),
+            agent_name=llm_agent.name,
+            mode=mode,
+            inner=inner,
+            store=store,
+        )
+        key = llm_agent.name
+        while key in models:
+            key += "'"
+        models[key] = wrapped
+        return wrapped
+
+    install_model_backend(agent, factory)
+    existing = agent.before_agent_callback
+    callbacks = existing if isinstance(existing, list) else ([existing] if existing else [])
+    if not any(getattr(cb, _MARK, False) for cb in callbacks):
+        agent.before_agent_callback = [_begin_run] + callbacks
+    if search:
+        backend = search_service.backend
+        if isinstance(backend, ReplaySearchBackend):
+            backend = backend.inner
+        search_service.backend = ReplaySearchBackend(backend, mode, store)
+    return models
+
+
+def install_replay_from_env(agent: BaseAgent) -> Optional[dict[str, RecordReplayLlm]]:
+    """依 JUDGE_REPLAY 安裝錄製/重播；未設定時不變更"""
+    mode = (os.getenv("JUDGE_REPLAY") or "").lower()
+    if not mode or mode in ("0", "off", "false", "no"):
+        return None
+    return install_replay(agent, mode)
+
+
+__all__ = [
+    "RecordReplayLlm",
+    "ReplayMiss",
+    "ReplaySearchBackend",
+    "ReplayStore",
+    "install_replay",
+    "install_replay_from_env",
+    "replay_store",
+    "request_key",
+    "search_key",
+]
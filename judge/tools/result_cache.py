@@ -0,0 +1,216 @@
+"""主張層級的結果快取（SQLite）。
+
+- 鍵：正規化後的主張文字；每筆另存 curation 指紋（正規化來源網址排序後的雜湊）
+- 完全命中：主張與指紋皆相同，直接提供先前的 final_report_json、jury_result 與辯論紀錄
+- 部分命中：主張相同但來源已變動，僅沿用 historian 等與來源無關的輸出，辯論重新執行
+- TTL 到期即失效；超過 max_entries 時依最近存取時間淘汰（LRU）；invalidate 可明確清除
+
+環境變數：
+- JUDGE_RESULT_CACHE：設為 0 停用（預設啟用）
+- JUDGE_RESULT_CACHE_DB：SQLite 檔案路徑（未設定則僅存於記憶體，程序結束即清空）
+- JUDGE_RESULT_CACHE_TTL：有效秒數（預設 86400，0 表示不過期）
+- JUDGE_RESULT_CACHE_SIZE：最多保留筆數（預設 1024）
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from .evidence import canonical_source, normalize_claim
+from .file_io import ensure_parent_dir, json_default
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    claim_key TEXT PRIMARY KEY,
+    claim TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+)
+"""
+
+# 完全命中時還原的 state 鍵
+RESULT_KEYS = (
+    "final_report_json",
+    "jury_result",
+    "debate_messages",
+    "debate_log",
+    "debate_metrics",
+    "evidence_store",
+    "history",
+)
+
+# 部分命中（來源變動）時仍可沿用的 state 鍵
+PARTIAL_KEYS = ("history",)
+
+
+def claim_key(claim: str) -> str:
+    """正規化主張文字（見 evidence.normalize_claim）"""
+    return normalize_claim(claim)
+
+
+def curation_fingerprint(curation) -> str:
+    """CuratorOutput 的來源指紋：正規化網址去重排序後取 SHA-256"""
+    if hasattr(curation, "model_dump"):
+        curation = curation.model_dump()
+    results = curation.get("results") if isinstance(curation, dict) else None
+    urls = sorted(
+        {canonical_source(r.get("url", "")) for r in results or [] if isinstance(r, dict) and r.get("url")}
+    )
+    return hashlib.sha256("\n".join(urls).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """以 SQLite 保存主張層級的結果，支援 TTL、LRU 淘汰與明確失效"""
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 86400.0, max_entries: int = 1024) -> None:
+        self.path = path or ":memory:"
+        self.ttl = ttl
+        self.max_entries = max_entries
+        if path:
+            ensure_parent_dir(path)
+        # 單一連線加鎖即可：每筆操作只有一兩個小查詢
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        if path:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "partial_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def _fresh(self, created: float) -> bool:
+        return self.ttl <= 0 or time.time() - created <= self.ttl
+
+    def lookup(self, claim: str, fingerprint: str) -> tuple[str, Optional[dict]]:
+        """回傳 ("hit" | "partial" | "miss", payload)；過期的項目會直接刪除"""
+        key = claim_key(claim)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint, payload, created FROM results WHERE claim_key = ?", (key,)
+            ).fetchone()
+            if row is None or not self._fresh(row[2]):
+                if row is not None:
+                    self._conn.execute("DELETE FROM results WHERE claim_key = ?", (key,))
+                    self._conn.commit()
+                self.stats["misses"] += 1
+                return "miss", None
+            self._conn.execute("UPDATE results SET accessed = ? WHERE claim_key = ?", (time.time(), key))
+            self._conn.commit()
+        payload = json.loads(row[1])
+        payload["cached_at"] = row[2]
+        if row[0] == fingerprint:
+            self.stats["hits"] += 1
+            return "hit", payload
+        self.stats["partial_hits"] += 1
+        return "partial", payload
+
+    def get(self, claim: str) -> Optional[dict]:
+        """不比對指紋，直接取出主張的快取內容（近似重複主張沿用先前結果時使用）"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created FROM results WHERE claim_key = ?", (claim_key(claim),)
+            ).fetchone()
+        if row is None or not self._fresh(row[1]):
+            return None
+        payload = json.loads(row[0])
+        payload["cached_at"] = row[1]
+        return payload
+
+    def put(self, claim: str, fingerprint: str, payload: dict) -> None:
+        now = time.time()
+        data = json.dumps(payload, ensure_ascii=False, default=json_default)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (claim_key, claim, fingerprint, payload, created, accessed)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (claim_key(claim), claim, fingerprint, data, now, now),
+            )
+            evicted = self._evict()
+            self._conn.commit()
+        self.stats["stores"] += 1
+        self.stats["evictions"] += evicted
+
+    def _evict(self) -> int:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()
+        excess = count - self.max_entries
+        if excess <= 0:
+            return 0
+        self._conn.execute(
+            "DELETE FROM results WHERE claim_key IN"
+            " (SELECT claim_key FROM results ORDER BY accessed ASC LIMIT ?)",
+            (excess,),
+        )
+        return excess
+
+    def invalidate(self, claim: Optional[str] = None) -> int:
+        """刪除指定主張的快取；未指定時清空全部，回傳刪除筆數"""
+        with self._lock:
+            if claim is None:
+                cursor = self._conn.execute("DELETE FROM results")
+            else:
+                cursor = self._conn.execute("DELETE FROM results WHERE claim_key = ?", (claim_key(claim),))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def purge_expired(self) -> int:
+        if self.ttl <= 0:
+            return 0
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM results WHERE created < ?", (time.time() - self.ttl,))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _default_cache() -> ResultCache:
+    return ResultCache(
+        path=os.getenv("JUDGE_RESULT_CACHE_DB") or None,
+        ttl=float(os.getenv("JUDGE_RESULT_CACHE_TTL") or 86400),
+        max_entries=int(os.getenv("JUDGE_RESULT_CACHE_SIZE") or 1024),
+    )
+
+
+result_cache: ResultCache = _default_cache()
+
+
+def result_cache_enabled() -> bool:
+    return (os.getenv("JUDGE_RESULT_CACHE") or "1").lower() not in ("0", "false", "no")
+
+
+def result_cache_stats() -> dict:
+    stats = dict(result_cache.stats)
+    lookups = stats["hits"] + stats["partial_hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+    stats["entries"] = len(result_cache)
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="主張結果快取維護")
+    parser.add_argument("--invalidate", metavar="CLAIM", help="刪除指定主張的快取")
+    parser.add_argument("--clear", action="store_true", help="清空全部快取")
+    parser.add_argument("--purge", action="store_true", help="刪除已過期的項目")
+    args = parser.parse_args()
+    if args.clear:
+        print(f"removed {result_cache.invalidate()}")
+    elif args.invalidate:
+        print(f"removed {result_cache.invalidate(args.invalidate)}")
+    elif args.purge:
+        print(f"removed {result_cache.purge_expired()}")
+    print(json.dumps(result_cache_stats(), ensure_ascii=False))
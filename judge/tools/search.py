@@ -0,0 +1,262 @@
+"""共用搜尋層：查詢正規化、記憶體 LRU + 磁碟快取（TTL）、同查詢合併與命中統計。
+
+GoogleSearchTool 為模型內建工具，結果不經過本地程式碼，無法快取；因此各代理改用
+`search_web` 函式工具，由可替換的搜尋後端取得結果，並透過 SearchCache 於
+Curator、Advocate、Skeptic、Devil 與 Evidence 之間共用。
+
+- GroundedSearchBackend：預設後端，以掛載 GoogleSearchTool 的代理執行實際搜尋
+- FixtureSearchBackend：讀取錄製好的 JSON 結果，測試時不需網路
+
+環境變數：
+- JUDGE_SEARCH_FIXTURES：指定 fixture 檔案時改用 FixtureSearchBackend
+- JUDGE_SEARCH_CACHE_DIR：磁碟快取目錄（未設定則僅使用記憶體快取）
+- JUDGE_SEARCH_TTL：快取有效秒數（預設 86400）
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+from google.adk.tools.function_tool import FunctionTool
+from google.adk.tools.tool_context import ToolContext
+
+from .evidence import normalize_claim
+from .file_io import ensure_parent_dir
+
+
+def normalize_query(query: str) -> str:
+    """正規化查詢字串：沿用 `normalize_claim` 的規則（全半形統一、忽略大小寫、移除標點並
+    壓縮空白，但保留數字內的小數點、分隔符號與 %），「5.0%」與「50%」不會共用快取鍵
+    """
+    return normalize_claim(query)
+
+
+class SearchCache:
+    """查詢結果快取：記憶體 LRU、可選的磁碟快取（TTL），並合併進行中的相同查詢"""
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        cache_dir: Optional[str] = None,
+        ttl: float = 86400.0,
+    ) -> None:
+        self.max_entries = max_entries
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.ttl = ttl
+        self._memory: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0}
+
+    def _fresh(self, created: float) -> bool:
+        return self.ttl <= 0 or time.time() - created <= self.ttl
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{digest}.json"
+
+    def _remember(self, key: str, created: float, value: Any) -> None:
+        self._memory[key] = (created, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, key: str) -> tuple[bool, Any]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            if self._fresh(entry[0]):
+                self._memory.move_to_end(key)
+                self.stats["hits"] += 1
+                return True, entry[1]
+            del self._memory[key]
+        path = self._disk_path(key)
+        if path is not None and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                data = None
+            if data is not None and self._fresh(data.get("created", 0.0)):
+                self._remember(key, data["created"], data["value"])
+                self.stats["disk_hits"] += 1
+                return True, data["value"]
+            path.unlink(missing_ok=True)
+        return False, None
+
+    def _store(self, key: str, value: Any) -> None:
+        created = time.time()
+        self._remember(key, created, value)
+        path = self._disk_path(key)
+        if path is None:
+            return
+        ensure_parent_dir(str(path))
+        tmp = path.with_suffix(".tmp")
+        try:
+            tmp.write_text(
+                json.dumps({"query": key, "created": created, "value": value}, ensure_ascii=False),
+                encoding="utf-8",
+            )
+            os.replace(tmp, path)
+        except (OSError, TypeError, ValueError):
+            # 無法序列化的結果僅保留在記憶體
+            tmp.unlink(missing_ok=True)
+
+    async def get_or_fetch(self, query: str, fetch: Callable[[str], Awaitable[Any]]) -> Any:
+        key = normalize_query(query)
+        while True:
+            found, value = self._lookup(key)
+            if found:
+                return value
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+            self.stats["coalesced"] += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if not pending.cancelled() or (task is not None and task.cancelling()):
+                    raise
+                # 發起查詢的任務被取消（而非本等待者）：重新查詢，第一個恢復的等待者成為新的發起者
+
+        self.stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await fetch(query)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # 標記已讀取，避免沒有等待者時出現警告
+            raise
+        else:
+            self._store(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        self._memory.clear()
+        if self.cache_dir is not None and self.cache_dir.exists():
+            for path in self.cache_dir.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+
+class GroundedSearchBackend:
+    """以掛載 GoogleSearchTool 的 LlmAgent 執行實際搜尋（延遲建立代理）"""
+
+    def __init__(self, model: str = "gemini-2.5-flash") -> None:
+        self.model = model
+        self._tool = None
+
+    def _agent_tool(self):
+        if self._tool is None:
+            from google.adk.agents import LlmAgent
+            from google.adk.tools.agent_tool import AgentTool
+            from google.adk.tools.google_search_tool import GoogleSearchTool
+
+            agent = LlmAgent(
+                name="search_backend",
+                model=self.model,
+                instruction=(
+                    "你是搜尋執行者：使用 GoogleSearchTool 搜尋使用者的查詢，"
+                    "逐筆列出結果的標題、網址與摘要，不要加入評論。"
+                ),
+                tools=[GoogleSearchTool()],
+            )
+            self._tool = AgentTool(agent)
+        return self._tool
+
+    async def search(self, query: str, tool_context: Optional[ToolContext] = None) -> Any:
+        if tool_context is None:
+            raise ValueError("GroundedSearchBackend requires a tool_context")
+        return await self._agent_tool().run_async(args={"request": query}, tool_context=tool_context)
+
+
+class FixtureSearchBackend:
+    """讀取錄製的搜尋結果（JSON：正規化查詢 → 結果），不需網路
+
+    fixtures 可為 JSON 檔路徑或已載入的 dict。
+    """
+
+    def __init__(self, fixtures: str | dict) -> None:
+        if isinstance(fixtures, dict):
+            raw = fixtures
+        else:
+            with open(fixtures, encoding="utf-8") as f:
+                raw = json.load(f)
+        self.fixtures = {normalize_query(k): v for k, v in raw.items()}
+
+    async def search(self, query: str, tool_context: Optional[ToolContext] = None) -> Any:
+        return self.fixtures.get(normalize_query(query), [])
+
+
+class SearchService:
+    """搜尋後端 + 快取的組合，供 search_web 工具與測試共用"""
+
+    def __init__(self, backend: Any, cache: Optional[SearchCache] = None) -> None:
+        self.backend = backend
+        self.cache = cache or SearchCache()
+
+    async def search(self, query: str, tool_context: Optional[ToolContext] = None) -> Any:
+        return await self.cache.get_or_fetch(
+            query, lambda q: self.backend.search(q, tool_context)
+        )
+
+
+def _default_service() -> SearchService:
+    fixtures = os.getenv("JUDGE_SEARCH_FIXTURES")
+    backend = FixtureSearchBackend(fixtures) if fixtures else GroundedSearchBackend()
+    cache = SearchCache(
+        cache_dir=os.getenv("JUDGE_SEARCH_CACHE_DIR") or None,
+        ttl=float(os.getenv("JUDGE_SEARCH_TTL") or 86400),
+    )
+    return SearchService(backend, cache)
+
+
+search_service: SearchService = _default_service()
+
+
+def search_stats() -> dict:
+    """回傳共用搜尋快取的命中/未命中統計"""
+    stats = dict(search_service.cache.stats)
+    lookups = stats["hits"] + stats["disk_hits"] + stats["misses"] + stats["coalesced"]
+    stats["hit_rate"] = (lookups - stats["misses"]) / lookups if lookups else 0.0
+    return stats
+
+
+async def search_web(query: str, tool_context: ToolContext) -> dict:
+    """使用 Google 搜尋查詢網路資料，回傳標題、網址與摘要。
+
+    Args:
+        query: 搜尋關鍵字或問題。
+    """
+    results = await search_service.search(query, tool_context)
+    return {"query": query, "results": results}
+
+
+# 各代理共用同一個工具實例
+search_tool = FunctionTool(search_web)
+
+
+__all__ = [
+    "normalize_query",
+    "SearchCache",
+    "GroundedSearchBackend",
+    "FixtureSearchBackend",
+    "SearchService",
+    "search_service",
+    "search_stats",
+    "search_web",
+    "search_tool",
+]
@@ -1,6 +1,28 @@
-"""Global SessionService singleton within tools namespace."""
+"""Global SessionService singleton within tools namespace.
 
+The backend is selected with ``JUDGE_SESSION_BACKEND`` (``memory`` by default,
+or ``sqlite`` with the database path taken from ``JUDGE_SESSION_DB``).
+"""
+
+import os
+from typing import Optional
+
+from google.adk.sessions.base_session_service import BaseSessionService
 from google.adk.sessions.in_memory_session_service import InMemorySessionService
 
-session_service: InMemorySessionService = InMemorySessionService()
+from .sqlite_session_service import SqliteSessionService
+
+
+def create_session_service(
+    backend: Optional[str] = None, path: Optional[str] = None
+) -> BaseSessionService:
+    """依設定建立 SessionService（memory 或 sqlite）"""
+    backend = (backend or os.getenv("JUDGE_SESSION_BACKEND") or "memory").lower()
+    if backend == "sqlite":
+        return SqliteSessionService(path or os.getenv("JUDGE_SESSION_DB") or "sessions.db")
+    if backend != "memory":
+        raise ValueError(f"Unknown session backend: {backend}")
+    return InMemorySessionService()
+
 
+session_service: BaseSessionService = create_session_service()
@@ -0,0 +1,418 @@
+"""以 SQLite 為後端的 SessionService，可取代全域 InMemorySessionService。
+
+- WAL 模式與連線池：讀寫可並行，避免每次操作重新開檔
+- 事件批次寫入：append_event 先進緩衝區，累積 batch_size 筆或讀取前才一次寫入
+- 熱門 Session LRU：僅在記憶體保留最近使用的 Session，其餘需要時再從 SQLite 載入
+"""
+
+from __future__ import annotations
+
+import atexit
+import copy
+import json
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from google.adk.events.event import Event
+from google.adk.sessions.base_session_service import (
+    BaseSessionService,
+    GetSessionConfig,
+    ListSessionsResponse,
+)
+from google.adk.sessions.session import Session
+from google.adk.sessions.state import State
+
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS sessions (
+        app_name TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        id TEXT NOT NULL,
+        state TEXT NOT NULL,
+        last_update_time REAL NOT NULL,
+        PRIMARY KEY (app_name, user_id, id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS events (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        app_name TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        session_id TEXT NOT NULL,
+        data TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_events_session ON events (app_name, user_id, session_id, seq)",
+    "CREATE TABLE IF NOT EXISTS app_states (app_name TEXT PRIMARY KEY, state TEXT NOT NULL)",
+    """
+    CREATE TABLE IF NOT EXISTS user_states (
+        app_name TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        state TEXT NOT NULL,
+        PRIMARY KEY (app_name, user_id)
+    )
+    """,
+)
+
+
+def _json_default(value: Any):
+    """state 中可能存放 pydantic 模型（如 Turn、DebateMetrics）或 set"""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    return str(value)
+
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=False, default=_json_default)
+
+
+def _split_state(state: dict) -> tuple[dict, dict, dict]:
+    """拆出 app:/user: 前綴的共享狀態，並捨棄 temp: 暫存鍵"""
+    app_state: dict = {}
+    user_state: dict = {}
+    session_state: dict = {}
+    for key, value in (state or {}).items():
+        if key.startswith(State.APP_PREFIX):
+            app_state[key.removeprefix(State.APP_PREFIX)] = value
+        elif key.startswith(State.USER_PREFIX):
+            user_state[key.removeprefix(State.USER_PREFIX)] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session_state[key] = value
+    return app_state, user_state, session_state
+
+
+class _ConnectionPool:
+    """固定大小的 sqlite3 連線池（連線可跨執行緒使用）"""
+
+    def __init__(self, path: str, size: int) -> None:
+        self._path = path
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=size)
+        for _ in range(size):
+            self._pool.put(self._connect())
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def close(self) -> None:
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+
+class SqliteSessionService(BaseSessionService):
+    """持久化的 SessionService：Session 與事件存於 SQLite，可在重啟後繼續檢視或續跑
+
+    Args:
+        path:               SQLite 檔案路徑
+        pool_size:          連線池大小
+        batch_size:         事件緩衝達到此筆數時寫入
+        max_cached_sessions: 記憶體中保留的熱門 Session 數量上限
+    """
+
+    def __init__(
+        self,
+        path: str = "sessions.db",
+        pool_size: int = 4,
+        batch_size: int = 32,
+        max_cached_sessions: int = 64,
+    ) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.max_cached_sessions = max_cached_sessions
+        self._pool = _ConnectionPool(path, pool_size)
+        self._lock = threading.RLock()
+        self._cache: "OrderedDict[tuple, Session]" = OrderedDict()
+        self._pending_events: list[tuple] = []
+        self._dirty_sessions: set[tuple] = set()
+        self._dirty_app: set[str] = set()
+        self._dirty_user: set[tuple] = set()
+        self._app_state: dict[str, dict] = {}
+        self._user_state: dict[tuple, dict] = {}
+        self._closed = False
+        with self._pool.connection() as conn:
+            for stmt in _SCHEMA:
+                conn.execute(stmt)
+            conn.commit()
+        atexit.register(self.close)
+
+    # ---- 共享狀態（app:/user:） ----
+    def _load_app_state(self, app_name: str) -> dict:
+        if app_name not in self._app_state:
+            with self._pool.connection() as conn:
+                row = conn.execute(
+                    "SELECT state FROM app_states WHERE app_name = ?", (app_name,)
+                ).fetchone()
+            self._app_state[app_name] = json.loads(row[0]) if row else {}
+        return self._app_state[app_name]
+
+    def _load_user_state(self, app_name: str, user_id: str) -> dict:
+        key = (app_name, user_id)
+        if key not in self._user_state:
+            with self._pool.connection() as conn:
+                row = conn.execute(
+                    "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?", key
+                ).fetchone()
+            self._user_state[key] = json.loads(row[0]) if row else {}
+        return self._user_state[key]
+
+    def _apply_shared_delta(self, app_name: str, user_id: str, app_delta: dict, user_delta: dict) -> None:
+        if app_delta:
+            self._load_app_state(app_name).update(app_delta)
+            self._dirty_app.add(app_name)
+        if user_delta:
+            self._load_user_state(app_name, user_id).update(user_delta)
+            self._dirty_user.add((app_name, user_id))
+
+    def _merge_state(self, session: Session) -> Session:
+        for key, value in self._load_app_state(session.app_name).items():
+            session.state[State.APP_PREFIX + key] = value
+        for key, value in self._load_user_state(session.app_name, session.user_id).items():
+            session.state[State.USER_PREFIX + key] = value
+        return session
+
+    # ---- 熱門 Session LRU ----
+    def _remember(self, key: tuple, session: Session) -> None:
+        self._cache[key] = session
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.max_cached_sessions:
+            # 逐出前先落盤，確保被逐出的 Session 可從 SQLite 完整還原
+            self._flush_locked()
+            while len(self._cache) > self.max_cached_sessions:
+                self._cache.popitem(last=False)
+
+    def _load(self, key: tuple) -> Optional[Session]:
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+        self._flush_locked()
+        with self._pool.connection() as conn:
+            row = conn.execute(
+                "SELECT state, last_update_time FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                key,
+            ).fetchone()
+            if row is None:
+                return None
+            rows = conn.execute(
+                "SELECT data FROM events WHERE app_name = ? AND user_id = ? AND session_id = ? ORDER BY seq",
+                key,
+            ).fetchall()
+        session = Session(
+            app_name=key[0],
+            user_id=key[1],
+            id=key[2],
+            state=json.loads(row[0]),
+            events=[Event.model_validate_json(r[0]) for r in rows],
+            last_update_time=row[1],
+        )
+        self._remember(key, session)
+        return session
+
+    # ---- 批次寫入 ----
+    def _flush_locked(self) -> None:
+        if not (self._pending_events or self._dirty_sessions or self._dirty_app or self._dirty_user):
+            return
+        with self._pool.connection() as conn:
+            with conn:
+                if self._pending_events:
+                    conn.executemany(
+                        "INSERT INTO events (app_name, user_id, session_id, data) VALUES (?, ?, ?, ?)",
+                        self._pending_events,
+                    )
+                for key in self._dirty_sessions:
+                    session = self._cache.get(key)
+                    if session is None:
+                        continue
+                    conn.execute(
+                        "UPDATE sessions SET state = ?, last_update_time = ? WHERE app_name = ? AND user_id = ? AND id = ?",
+                        (_dumps(session.state), session.last_update_time, *key),
+                    )
+                for app_name in self._dirty_app:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO app_states (app_name, state) VALUES (?, ?)",
+                        (app_name, _dumps(self._app_state[app_name])),
+                    )
+                for app_name, user_id in self._dirty_user:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO user_states (app_name, user_id, state) VALUES (?, ?, ?)",
+                        (app_name, user_id, _dumps(self._user_state[(app_name, user_id)])),
+                    )
+        self._pending_events.clear()
+        self._dirty_sessions.clear()
+        self._dirty_app.clear()
+        self._dirty_user.clear()
+
+    def flush(self) -> None:
+        """將緩衝中的事件與狀態寫入 SQLite"""
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        """寫入剩餘緩衝並關閉連線池（程序結束時亦會自動呼叫）"""
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_locked()
+            self._pool.close()
+            self._closed = True
+
+    # ---- BaseSessionService 介面 ----
+    def create_session_sync(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = session_id.strip() if session_id and session_id.strip() else str(uuid.uuid4())
+        app_delta, user_delta, session_state = _split_state(state or {})
+        session = Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=session_id,
+            state=session_state,
+            last_update_time=time.time(),
+        )
+        key = (app_name, user_id, session_id)
+        with self._lock:
+            self._apply_shared_delta(app_name, user_id, app_delta, user_delta)
+            with self._pool.connection() as conn:
+                with conn:
+                    conn.execute(
+                        "INSERT INTO sessions (app_name, user_id, id, state, last_update_time) VALUES (?, ?, ?, ?, ?)",
+                        (*key, _dumps(session_state), session.last_update_time),
+                    )
+            self._remember(key, session)
+            return self._merge_state(copy.deepcopy(session))
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        return self.create_session_sync(
+            app_name=app_name, user_id=user_id, state=state, session_id=session_id
+        )
+
+    def get_session_sync(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        with self._lock:
+            session = self._load((app_name, user_id, session_id))
+            if session is None:
+                return None
+            copied = copy.deepcopy(session)
+            if config:
+                if config.num_recent_events:
+                    copied.events = copied.events[-config.num_recent_events:]
+                if config.after_timestamp:
+                    copied.events = [e for e in copied.events if e.timestamp >= config.after_timestamp]
+            return self._merge_state(copied)
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        return self.get_session_sync(
+            app_name=app_name, user_id=user_id, session_id=session_id, config=config
+        )
+
+    def list_sessions_sync(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        with self._lock:
+            self._flush_locked()
+            with self._pool.connection() as conn:
+                rows = conn.execute(
+                    "SELECT id, state, last_update_time FROM sessions WHERE app_name = ? AND user_id = ?",
+                    (app_name, user_id),
+                ).fetchall()
+            sessions = [
+                self._merge_state(
+                    Session(
+                        app_name=app_name,
+                        user_id=user_id,
+                        id=sid,
+                        state=json.loads(state),
+                        last_update_time=updated,
+                    )
+                )
+                for sid, state, updated in rows
+            ]
+        return ListSessionsResponse(sessions=sessions)
+
+    async def list_sessions(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        return self.list_sessions_sync(app_name=app_name, user_id=user_id)
+
+    def delete_session_sync(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        key = (app_name, user_id, session_id)
+        with self._lock:
+            self._flush_locked()
+            self._cache.pop(key, None)
+            with self._pool.connection() as conn:
+                with conn:
+                    conn.execute("DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?", key)
+                    conn.execute(
+                        "DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?", key
+                    )
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        self.delete_session_sync(app_name=app_name, user_id=user_id, session_id=session_id)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        # 先更新呼叫端持有的 Session 物件
+        await super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+
+        key = (session.app_name, session.user_id, session.id)
+        with self._lock:
+            storage = self._load(key)
+            if storage is None:
+                return event
+            if event.actions and event.actions.state_delta:
+                app_delta, user_delta, session_delta = _split_state(event.actions.state_delta)
+                self._apply_shared_delta(session.app_name, session.user_id, app_delta, user_delta)
+                storage.state.update(session_delta)
+            if storage is not session:
+                storage.events.append(event)
+            storage.last_update_time = event.timestamp
+            self._dirty_sessions.add(key)
+            self._pending_events.append((*key, event.model_dump_json(fallback=_json_default)))
+            if len(self._pending_events) >= self.batch_size:
+                self._flush_locked()
+        return event
+
+
+__all__ = ["SqliteSessionService"]
@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from judge.agent import root_agent
+from judge.agents import result_cache_gate, result_cache_store, triage_agent
+from judge.batch import APP_NAME, _prepare_agents
+from judge.tools.models import install_fake_llm
+from judge.tools.search import FixtureSearchBackend, search_service
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """以 FakeLlm 執行完整 pipeline；預設關閉結果快取與近似重複，回傳 run(claim) -> Session"""
+    monkeypatch.setattr(search_service, "backend", FixtureSearchBackend({}))
+    for agent, flag in (
+        (result_cache_gate, "enabled"),
+        (result_cache_store, "enabled"),
+        (result_cache_store, "index_enabled"),
+        (triage_agent, "near_duplicates"),
+    ):
+        monkeypatch.setattr(agent, flag, False)
+    service = InMemorySessionService()
+
+    def setup(responses=None, **kwargs):
+        models = install_fake_llm(root_agent, responses=responses, **kwargs)
+        _prepare_agents()
+        runner = Runner(app_name=APP_NAME, agent=root_agent, session_service=service)
+
+        async def run_async(claim: str):
+            session = await service.create_session(
+                app_name=APP_NAME, user_id="u", state={"debate_messages": [], "agents": []}
+            )
+            message = types.Content(role="user", parts=[types.Part(text=claim)])
+            async for _ in runner.run_async(user_id="u", session_id=session.id, new_message=message):
+                pass
+            return await service.get_session(app_name=APP_NAME, user_id="u", session_id=session.id)
+
+        def run(claim: str):
+            return asyncio.run(run_async(claim))
+
+        run.models = models
+        run.run_async = run_async
+        return run
+
+    return setup
@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+from google.adk.sessions import InMemorySessionService
+
+import judge.batch as batch
+from judge.agent import root_agent
+from judge.agents import result_cache_store
+from judge.tools.near_duplicate import NearDuplicateIndex
+from judge.tools.result_cache import ResultCache
+
+
+@pytest.fixture
+def reuse_runner(pipeline, monkeypatch):
+    pipeline({"moderator_decider": [{"next_speaker": "end", "rationale": "r"}]})
+    cache, index = ResultCache(), NearDuplicateIndex()
+    monkeypatch.setattr(batch, "result_cache", cache)
+    monkeypatch.setattr(batch, "near_duplicate_index", index)
+    for flag in ("enabled", "index_enabled"):
+        monkeypatch.setattr(result_cache_store, flag, True)
+    monkeypatch.setattr(result_cache_store, "cache", cache)
+    monkeypatch.setattr(result_cache_store, "index", index)
+    return batch.BatchRunner(agent=root_agent, service=InMemorySessionService(), reuse_threshold=0.5)
+
+
+def test_reused_record_has_cached_metrics_and_no_session(reuse_runner):
+    async def main():
+        first = await reuse_runner.run_claim({"id": "1", "claim": "衛福部宣布營養午餐明年全面免費"})
+        second = await reuse_runner.run_claim({"id": "2", "claim": "衛福部宣布 營養午餐明年全面免費！"})
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert "reused_from" not in first
+    assert second["reused_from"]["session_id"] == first["session_id"]
+    assert "session_id" not in second
+    assert second["final_report"] == first["final_report"]
+    assert second["metrics"]["stop_reason"] == first["metrics"]["stop_reason"]
+    assert second["metrics"]["model_calls"] == 0
+    assert second["metrics"]["wall_seconds"] is None
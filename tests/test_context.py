@@ -0,0 +1,27 @@
+import json
+
+from judge.tools.context import estimate_tokens, make_context_callback
+
+
+class _Ctx:
+    def __init__(self, state):
+        self.state = state
+
+
+def test_context_stats_measure_raw_and_digested_sizes():
+    messages = [
+        {"speaker": "advocate" if i % 2 else "skeptic", "content": f"第 {i} 則發言，" + "論點內容" * 40}
+        for i in range(12)
+    ]
+    state = {"debate_messages": messages}
+    callback = make_context_callback("jury", budget=300)
+    callback(callback_context=_Ctx(state))
+    callback(callback_context=_Ctx(state))
+
+    stats = state["debate_context_stats"]["jury"]
+    raw = estimate_tokens(json.dumps(messages, ensure_ascii=False))
+    assert stats["calls"] == 2
+    assert stats["raw_tokens"] == 2 * raw
+    assert stats["context_tokens"] == 2 * estimate_tokens(state["debate_context_jury"])
+    assert stats["context_tokens"] < stats["raw_tokens"]
+    assert stats["saved_tokens"] == stats["raw_tokens"] - stats["context_tokens"]
@@ -0,0 +1,73 @@
+import random
+
+from judge.tools.debate_log import (
+    DebateMetrics,
+    Turn,
+    append_turn,
+    initialize_debate_state,
+    recalculate_metrics,
+    verify_metrics,
+)
+from judge.tools.evidence import Evidence
+
+
+def _turn(rng: random.Random, i: int) -> Turn:
+    return Turn(
+        speaker=rng.choice(["advocate", "skeptic", "devil"]),
+        content=f"turn {i}",
+        claim=rng.choice([None, "a", "b", "c", f"claim {i % 7}"]),
+        confidence=rng.choice([None, rng.random()]),
+        evidence=[
+            Evidence(source=f"https://example.com/{rng.randint(0, 5)}", claim="c", warrant="w")
+            for _ in range(rng.randint(0, 2))
+        ],
+    )
+
+
+def test_incremental_metrics_match_full_recompute():
+    rng = random.Random(0)
+    state: dict = {}
+    initialize_debate_state(state)
+    for i in range(50):
+        append_turn(state, _turn(rng, i))
+        assert verify_metrics(state)
+    expected = recalculate_metrics(state["debate_log"])
+    assert state["dispute_points"] == expected["dispute_points"]
+    assert state["evidence_count"] == len(expected["evidence"])
+
+
+def test_verify_metrics_detects_drift():
+    state: dict = {}
+    initialize_debate_state(state)
+    append_turn(state, Turn(speaker="advocate", content="x", claim="a", confidence=0.5))
+    state["debate_metrics"].confidence_sum += 1.0
+    assert not verify_metrics(state)
+
+
+def test_as_state_does_not_expose_evidence_list():
+    metrics = DebateMetrics()
+    metrics.add_turn(Turn(speaker="a", content="x", evidence=[Evidence(source="s", claim="c", warrant="w")]))
+    exposed = metrics.as_state()
+    assert exposed["evidence_count"] == 1
+    assert "evidence" not in exposed
+
+
+def test_clone_is_copy_on_write():
+    metrics = DebateMetrics()
+    metrics.add_turn(Turn(speaker="a", content="x", claim="b"))
+    clone = metrics.clone()
+    clone.add_turn(Turn(speaker="a", content="y", claim="a", evidence=[Evidence(source="s", claim="c", warrant="w")]))
+    assert metrics.claims == ["b"] and metrics.evidence == []
+    metrics.add_turn(Turn(speaker="a", content="z", claim="c"))
+    assert clone.claims == ["b", "a"]
+    assert len(clone.evidence) == 1
+
+
+def test_claims_are_sorted_only_when_serialized():
+    metrics = DebateMetrics()
+    for claim in ("c", "a", "b", "a"):
+        metrics.add_turn(Turn(speaker="a", content="x", claim=claim))
+    assert metrics.claims == ["c", "a", "b"]
+    dumped = metrics.model_dump()
+    assert dumped["claims"] == ["a", "b", "c"]
+    assert DebateMetrics.model_validate(dumped).as_state()["dispute_points"] == 3
@@ -0,0 +1,27 @@
+from judge.agents.moderator.dispatch import decided_speaker
+from judge.agents.moderator.tools import evaluate_stop
+
+
+def test_executor_and_stop_check_share_speaker_normalization():
+    state = {"next_decision": {"next_speaker": " End ", "rationale": "r"}, "debate_messages": []}
+    assert decided_speaker(state) == "end"
+    verdict, reason, _ = evaluate_stop(state)
+    assert (verdict, reason) == ("stop", "decision_end")
+
+
+def test_end_clears_executor_output(pipeline):
+    run = pipeline(
+        {
+            "moderator_decider": [
+                {"next_speaker": "advocate", "rationale": "r"},
+                {"next_speaker": "End", "rationale": "r"},
+            ],
+            # 規則無法判斷時的 LLM 備援不呼叫 exit_loop，讓迴圈進入下一輪
+            "stop_checker_llm": ["continue"],
+        }
+    )
+    session = run("網傳營養午餐全面免費")
+    speakers = [m["speaker"] for m in session.state["debate_messages"] if isinstance(m, dict)]
+    assert speakers.count("advocate") == 1
+    assert session.state["stop_reason"] == "decision_end"
+    assert session.state["orchestrator_exec"] == ""
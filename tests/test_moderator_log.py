@@ -0,0 +1,31 @@
+import asyncio
+from types import SimpleNamespace
+
+from google.adk.events.event import Event
+from google.adk.events.event_actions import EventActions
+from google.adk.sessions.state import State
+
+from judge.agents.moderator.tools import log_tool_output
+from judge.tools.debate_log import append_event_update, initialize_debate_state
+
+
+def test_batch_mode_delta_carries_turn_payload():
+    payload = {
+        "thesis": "營養午餐全面免費",
+        "confidence": 0.8,
+        "evidence": [{"source": "https://example.com/a", "claim": "c", "warrant": "w"}],
+    }
+    value: dict = {"advocacy": payload}
+    initialize_debate_state(value)
+    delta: dict = {}
+    # 辯手輸出在先前的事件寫入，不在本次工具回應的 state_delta 中
+    state = State(value, delta)
+    tool = SimpleNamespace(name="call_advocate")
+    asyncio.run(log_tool_output(tool, tool_context=SimpleNamespace(state=state), tool_response={}))
+
+    replayed: dict = {}
+    initialize_debate_state(replayed)
+    append_event_update(replayed, Event(author="advocate", actions=EventActions(state_delta=dict(delta))))
+    turn = replayed["debate_log"][0]
+    assert turn.confidence == 0.8
+    assert len(turn.evidence) == 1
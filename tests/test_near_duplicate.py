@@ -0,0 +1,57 @@
+import pytest
+
+from judge.agents.knowledge.triage.agent import TriageAgent
+from judge.tools.near_duplicate import NearDuplicateIndex, reuse_compatible
+
+CLAIM = "衛福部宣布營養午餐明年全面免費"
+REPORT = {"final_report_json": {"topic": CLAIM, "jury_score": 80}, "jury_result": {"verdict": "true"}}
+
+
+@pytest.mark.parametrize(
+    "other, compatible",
+    [
+        ("衛福部宣布，營養午餐明年起全面免費", True),
+        ("衛福部宣布營養午餐明年不會全面免費", False),
+        ("失業率上升到 5.0%", False),
+        ("失業率上升到五成", False),
+    ],
+)
+def test_reuse_compatible_guards_negations_and_numbers(other, compatible):
+    base = CLAIM if "失業率" not in other else "失業率上升到 50%"
+    assert reuse_compatible(base, other) is compatible
+
+
+def test_index_finds_paraphrase_and_excludes_own_session():
+    index = NearDuplicateIndex()
+    index.add("s1", CLAIM, ["營養午餐政策說明"])
+    index.add("s2", "某品牌飲料被驗出塑化劑", [])
+    match = index.query("衛福部宣布 營養午餐明年起全面免費", ["營養午餐政策說明"], min_score=0.5)
+    assert match is not None and match.session_id == "s1"
+    assert index.query(CLAIM, min_score=0.5, exclude="s1") is None
+    assert index.query("颱風明天登陸花蓮", min_score=0.5) is None
+
+
+def _match(query: str, score: float = 0.9) -> dict:
+    return {"session_id": "s1", "claim": CLAIM, "score": score, "query": query}
+
+
+def test_triage_reuses_only_compatible_paraphrases():
+    triage = TriageAgent(name="triage_test", reuse_threshold=0.85)
+    state: dict = {}
+
+    result = {"fast_track": False}
+    delta = triage._reuse_delta(result, _match("衛福部宣布，營養午餐明年起全面免費"), REPORT, state)
+    assert result["reused_from"] == "s1"
+    assert delta["final_report_json"]["fast_tracked"] is True
+    assert delta["jury_result"] == REPORT["jury_result"]
+
+    for query, score in (("衛福部宣布營養午餐明年不會全面免費", 0.9), ("衛福部宣布，營養午餐明年起全面免費", 0.6)):
+        result = {"fast_track": False}
+        assert triage._reuse_delta(result, _match(query, score), REPORT, state) == {}
+        assert "reused_from" not in result
+
+
+def test_triage_does_not_reuse_by_default():
+    result = {"fast_track": False}
+    assert TriageAgent(name="triage_test")._reuse_delta(result, _match("衛福部宣布，營養午餐明年起全面免費"), REPORT, {}) == {}
+    assert "reused_from" not in result
@@ -0,0 +1,51 @@
+import pytest
+
+from judge.agents.moderator.tools import is_repetitive
+from judge.tools.novelty import score_points, similarity_matrix, update_novelty
+
+
+def _turn(speaker: str, points: list[str]) -> dict:
+    return {"speaker": speaker, "data": {"key_points": points}}
+
+
+def test_restated_points_score_low_and_count_as_repetitive():
+    state = {
+        "debate_messages": [
+            _turn("advocate", ["營養午餐全面免費可減輕家庭負擔"]),
+            _turn("skeptic", ["財源不足將排擠其他教育預算"]),
+            _turn("advocate", ["營養午餐全面免費可減輕家庭負擔"]),
+        ]
+    }
+    novelty = update_novelty(state)
+    assert state["novelty_score"] == 0.0
+    assert novelty["repeated_count"] == 1
+    assert novelty["speaker"] == "advocate"
+    assert is_repetitive(state)
+
+
+def test_new_points_score_high():
+    state = {"debate_messages": [_turn("advocate", ["營養午餐全面免費"]), _turn("skeptic", ["颱風造成停班停課"])]}
+    update_novelty(state)
+    assert state["novelty_score"] == 1.0
+    assert not is_repetitive(state)
+    assert state["novelty"]["history"] == [1.0]
+
+
+def test_turn_without_points_is_unknown_not_repetitive():
+    state = {"debate_messages": [_turn("advocate", ["營養午餐全面免費"]), {"speaker": "devil", "data": {}}]}
+    update_novelty(state)
+    assert state["novelty_score"] is None
+    assert not is_repetitive(state)
+    assert score_points([], ["x"])["score"] is None
+
+
+def test_similarity_matches_rouge_score():
+    rouge_scorer = pytest.importorskip("rouge_score.rouge_scorer")
+    scorer = rouge_scorer.RougeScorer(["rouge1", "rouge2"])
+    new = ["school lunch becomes free for every student"]
+    prior = ["free lunch for every student next year", "typhoon closes offices"]
+    sim = similarity_matrix(new, prior)
+    for j, text in enumerate(prior):
+        scores = scorer.score(text, new[0])
+        expected = (scores["rouge1"].fmeasure + scores["rouge2"].fmeasure) / 2
+        assert sim[0, j] == pytest.approx(expected, abs=1e-6)
@@ -0,0 +1,63 @@
+import pytest
+
+from judge.agent import root_agent
+from judge.tools.models import FakeLlm
+
+
+@pytest.fixture
+def requests(monkeypatch):
+    """記錄每個代理送給模型的 contents"""
+    seen: dict[str, list] = {}
+    original = FakeLlm.generate_content_async
+
+    def record(self, llm_request, stream=False):
+        seen.setdefault(self.agent_name, []).append(list(llm_request.contents))
+        return original(self, llm_request, stream)
+
+    monkeypatch.setattr(FakeLlm, "generate_content_async", record)
+    return seen
+
+
+def test_dependencies_follow_state_io():
+    deps = root_agent.dependencies()
+    assert "init_session" in deps["curator"]
+    assert "curator" in deps["triage"]
+    assert "debate_referee_loop" in deps["jury"]
+    assert "jury" in deps["synthesizer"]
+    unordered = root_agent.unordered_stages(deps)
+    assert "historian" in unordered["debate_referee_loop"]
+    assert "historian" in unordered["synthesizer"]
+
+
+def test_stages_start_after_dependencies(pipeline):
+    session = pipeline()("網傳營養午餐全面免費")
+    timing = session.state["pipeline_timing"]
+    stages = timing["stages"]
+    assert {"curator", "historian", "debate_referee_loop", "jury", "synthesizer"} <= set(stages)
+    for name, span in stages.items():
+        for dep in span["depends_on"]:
+            if dep in stages:
+                assert span["start"] >= stages[dep]["end"], (name, dep)
+
+
+def test_only_overlapping_stages_get_branches(pipeline, requests):
+    session = pipeline()("網傳營養午餐全面免費")
+    branches: dict[str, set] = {}
+    for event in session.events:
+        branches.setdefault(event.author, set()).add(event.branch)
+    # Historian 與辯論迴圈同時啟動，各自在獨立的 branch 上執行
+    assert branches["historian_schema_agent"] == {"root_pipeline.historian"}
+    assert branches["moderator_decider"] == {"root_pipeline.debate_referee_loop"}
+    # Jury 與整合者啟動時 Historian 已結束，不必隔離，可看見辯論、證據與陪審的輸出
+    assert branches["jury"] == {None}
+    assert branches["synthesizer"] == {None}
+    seen = {
+        agent: " ".join(
+            part.text or "" for content in requests[agent][0] for part in content.parts or []
+        )
+        for agent in ("jury", "synthesizer")
+    }
+    for author in ("moderator_decider", "evidence_agent", "social_aggregator"):
+        assert f"[{author}]" in seen["jury"]
+        assert f"[{author}]" in seen["synthesizer"]
+    assert "[jury]" in seen["synthesizer"]
@@ -0,0 +1,61 @@
+import asyncio
+from collections import Counter
+
+import pytest
+
+from judge.agent import root_agent
+from judge.tools.replay import _RUN_SEEN, ReplayMiss, ReplayStore, install_replay
+
+
+def test_sequence_numbers_count_per_run():
+    store = ReplayStore()
+    _RUN_SEEN.set(Counter())
+    assert [store.next_seq("k"), store.next_seq("k"), store.next_seq("j")] == [0, 1, 0]
+    _RUN_SEEN.set(Counter())
+    assert store.next_seq("k") == 0
+
+
+def test_replay_requires_the_exact_sequence_number():
+    store = ReplayStore()
+    store.put("k", 0, "llm", "a", [{"x": 1}])
+    assert store.get("k", 0) == [{"x": 1}]
+    assert store.get("k", 1) is None
+    assert store.stats["misses"] == 1
+
+
+@pytest.fixture
+def replay_pipeline(pipeline, monkeypatch):
+    monkeypatch.setattr(root_agent, "before_agent_callback", root_agent.before_agent_callback)
+    run = pipeline()
+    store = ReplayStore()
+    return run, store
+
+
+def test_replayed_runs_are_deterministic(replay_pipeline):
+    run, store = replay_pipeline
+    install_replay(root_agent, "record", store)
+    recorded = run("網傳營養午餐全面免費")
+    assert store.stats["recorded"] > 0
+
+    install_replay(root_agent, "replay", store)
+    store.stats.update(recorded=0, replayed=0, misses=0)
+    sequential = [run("網傳營養午餐全面免費") for _ in range(2)]
+
+    async def concurrent():
+        return await asyncio.gather(*(run.run_async("網傳營養午餐全面免費") for _ in range(3)))
+
+    sessions = sequential + asyncio.run(concurrent())
+    assert store.stats["misses"] == 0
+    assert store.stats["recorded"] == 0
+    for session in sessions:
+        assert session.state["final_report_json"] == recorded.state["final_report_json"]
+        assert session.state["debate_messages"] == recorded.state["debate_messages"]
+
+
+def test_replay_misses_on_unrecorded_request(replay_pipeline):
+    run, store = replay_pipeline
+    install_replay(root_agent, "record", store)
+    run("網傳營養午餐全面免費")
+    install_replay(root_agent, "replay", store)
+    with pytest.raises(ReplayMiss):
+        run("完全不同的主張")
@@ -0,0 +1,52 @@
+import pytest
+
+from judge.agents import result_cache_gate, result_cache_store
+from judge.tools.result_cache import ResultCache
+
+CLAIM = "喝飲料會致癌？"
+A = [{"title": "新聞", "url": "https://news.example.com/a", "snippet": "某品牌飲料被檢驗"}]
+B = A + [{"title": "新聞2", "url": "https://news.example.com/b", "snippet": "另一篇"}]
+
+
+@pytest.fixture
+def cached_pipeline(pipeline, monkeypatch):
+    cache = ResultCache()
+    for agent in (result_cache_gate, result_cache_store):
+        monkeypatch.setattr(agent, "enabled", True)
+        monkeypatch.setattr(agent, "cache", cache)
+
+    def setup(results):
+        responses = {
+            "curator_tool_runner": [{"query": "q", "results": results}],
+            "moderator_decider": [{"next_speaker": "end", "rationale": "r"}],
+        }
+        return pipeline(responses)
+
+    return setup
+
+
+def test_gate_waits_for_curator():
+    from judge.agent import root_agent
+
+    assert "curator" in root_agent.dependencies()["result_cache_gate"]
+
+
+def test_hit_partial_and_miss(cached_pipeline):
+    run = cached_pipeline(A)
+    first = run(CLAIM)
+    assert first.state["result_cache"]["status"] == "miss"
+    assert first.state["result_cache"]["stored"] is True
+
+    second = run(CLAIM)
+    assert second.state["result_cache"]["status"] == "hit"
+    assert "debate_referee_loop" in second.state["pipeline_timing"]["skipped"]
+    assert second.state["final_report_json"] == first.state["final_report_json"]
+
+    # 同一主張但 Curator 的來源不同：只沿用與來源無關的輸出
+    third = cached_pipeline(B)(CLAIM)
+    assert third.state["result_cache"]["status"] == "partial"
+    assert third.state["pipeline_timing"]["skipped"] == ["historian"]
+    assert third.state["history"] == first.state["history"]
+
+    other = run("完全不同的主張")
+    assert other.state["result_cache"]["status"] == "miss"
@@ -0,0 +1,24 @@
+import asyncio
+
+from judge.tools.replay import search_key
+from judge.tools.search import FixtureSearchBackend, SearchCache, normalize_query
+
+
+def test_normalize_query_keeps_numbers_apart():
+    assert normalize_query("失業率 5.0%") != normalize_query("失業率 50%")
+    assert normalize_query("預算 2.3 千萬") != normalize_query("預算 23 千萬")
+    assert normalize_query("ＧＤＰ，成長？") == normalize_query("gdp 成長")
+
+
+def test_search_cache_and_replay_keys_distinguish_numbers():
+    backend = FixtureSearchBackend({"rate 5.0%": ["five"], "rate 50%": ["fifty"]})
+    cache = SearchCache()
+
+    async def run():
+        a = await cache.get_or_fetch("rate 5.0%", backend.search)
+        b = await cache.get_or_fetch("rate 50%", backend.search)
+        return a, b
+
+    assert asyncio.run(run()) == (["five"], ["fifty"])
+    assert cache.stats["misses"] == 2
+    assert search_key("rate 5.0%") != search_key("rate 50%")
@@ -0,0 +1,58 @@
+import asyncio
+
+from google.adk.agents import LlmAgent
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.adk.tools.function_tool import FunctionTool
+from google.genai import types
+
+from judge.agents.moderator.dispatch import DirectExecutor, debater_request
+from judge.agents.moderator.speculative import SpeculativeOrchestrator
+from judge.agents.moderator.tools import NextTurnDecision
+from judge.tools.models import FakeLlm
+
+
+def _orchestrator(requests: list[str], speaker: str) -> SpeculativeOrchestrator:
+    def call_advocate(request: str) -> str:
+        requests.append(request)
+        return f"advocate turn {len(requests)}"
+
+    decision = LlmAgent(
+        name="decider",
+        model=FakeLlm(responses=[{"next_speaker": speaker, "rationale": "正方尚未回應數據"}]),
+        output_schema=NextTurnDecision,
+        output_key="next_decision",
+    )
+    executor = DirectExecutor(name="executor", tools=[FunctionTool(call_advocate)], output_key="orchestrator_exec")
+    return SpeculativeOrchestrator(name="orchestrator", sub_agents=[decision, executor])
+
+
+def _run(agent):
+    async def main():
+        service = InMemorySessionService()
+        runner = Runner(app_name="t", agent=agent, session_service=service)
+        session = await service.create_session(app_name="t", user_id="u", state={"debate_messages": []})
+        message = types.Content(role="user", parts=[types.Part(text="主張")])
+        events = [e async for e in runner.run_async(user_id="u", session_id=session.id, new_message=message)]
+        return events, await service.get_session(app_name="t", user_id="u", session_id=session.id)
+
+    return asyncio.run(main())
+
+
+def test_hit_reuses_the_speculative_request_without_rationale():
+    requests: list[str] = []
+    events, session = _run(_orchestrator(requests, "advocate"))
+
+    # 只比對發言者：命中後不會附上 rationale 重新呼叫
+    assert requests == [debater_request("advocate")["request"]]
+    assert session.state["speculation_stats"]["hits"] == 1
+    assert session.state["orchestrator_exec"] == "advocate turn 1"
+    calls = [p.function_call for e in events for p in (e.content.parts if e.content else []) if p.function_call]
+    assert [c.args for c in calls] == [debater_request("advocate")]
+
+
+def test_end_discards_speculation_and_clears_output():
+    requests: list[str] = []
+    _, session = _run(_orchestrator(requests, "end"))
+    assert session.state["speculation_stats"]["wasted"] == 1
+    assert session.state["orchestrator_exec"] == ""
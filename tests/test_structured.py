@@ -0,0 +1,29 @@
+import pytest
+
+from judge.agents.knowledge.curator.agent import curator_agent
+from judge.agents.structured import structured_output_stats
+
+VALID = {"query": "q", "results": [{"title": "t", "url": "https://example.com/a", "snippet": "s"}]}
+
+
+@pytest.mark.parametrize(
+    "combined, response, outcome",
+    [(True, VALID, "local"), (True, "無法解析的文字", "repaired"), (False, VALID, "sequential")],
+)
+def test_outcome_counted_only_when_validation_ran(pipeline, monkeypatch, combined, response, outcome):
+    monkeypatch.setattr(curator_agent, "combined", combined)
+    before = structured_output_stats()
+    run = pipeline({"curator_tool_runner": [response]})
+    session = run("網傳營養午餐全面免費")
+
+    counts = session.state["structured_output_stats"]["curator"]
+    assert counts == {"local": 0, "repaired": 0, "sequential": 0, outcome: 1}
+    after = structured_output_stats()
+    assert after[outcome] > before[outcome]
+    # 只有本地驗證成功才省下往返
+    saved = after["saved_round_trips"] - before["saved_round_trips"]
+    assert saved == after["local"] - before["local"]
+    if outcome == "local":
+        assert run.models["curator_schema_validator"].stats["calls"] == 0
+    else:
+        assert run.models["curator_schema_validator"].stats["calls"] == 1